@@ -1,11 +1,27 @@
+import os
+import shlex
 import logging
 from subprocess import Popen, PIPE
 from pathlib import Path
 import sys
 import argparse
+import cProfile
 import json
 
 from lemonspotter.core.runtime import Runtime
+from lemonspotter.core.journal import Journal
+from lemonspotter.core.runstore import RunStore
+from lemonspotter.core.baseline import BaselineStore
+from lemonspotter.core.benchmark import BenchmarkSuite
+from lemonspotter.core.profiler import Profiler
+from lemonspotter.executors.batch import BatchExecutor
+from lemonspotter.executors.buildcache import BuildCache
+from lemonspotter.executors.distributed import DistributedExecutor, Worker
+from lemonspotter.executors.mpiexecutor import MPIExecutor
+from lemonspotter.executors.toolchain import Toolchain
+from lemonspotter.generators.performance import PerformanceGenerator
+from lemonspotter.generators.sweep import SweepGenerator
+from lemonspotter.parsers.mpiparser import MPIParser
 
 
 def parse_arguments():
@@ -28,7 +44,12 @@ def parse_arguments():
 
     parser.add_argument('--keep',
                         action='store_true',
-                        help='Keep C source filesafter tests.')
+                        help='Keep the C sources and executables of the tests after the run.')
+
+    parser.add_argument('--in-memory',
+                        action='store_true',
+                        help='Pass C sources to the compiler on its standard input and place '
+                             'executables on a memory backed file system.')
 
     parser.add_argument('--dry-run',
                         action='store_true',
@@ -45,11 +66,274 @@ def parse_arguments():
                         type=str,
                         help='Use specific mpiexec.')
 
+    parser.add_argument('-j', '--jobs',
+                        default=os.cpu_count() or 1,
+                        type=int,
+                        help='Number of tests built concurrently, defaults to the CPU count.')
+
+    parser.add_argument('--cores',
+                        default=os.cpu_count() or 1,
+                        type=int,
+                        help='Number of cores test processes are packed onto, defaults to the '
+                             'CPU count.')
+
+    parser.add_argument('--no-pch',
+                        action='store_false',
+                        dest='pch',
+                        help='Do not use a precompiled header of the standard test frame.')
+
+    parser.add_argument('--pipeline',
+                        action='store_true',
+                        help='Start the tests of a function as soon as its presence is known, '
+                             'instead of testing in phases.')
+
+    parser.add_argument('--resident',
+                        action='store_true',
+                        help='Execute single process tests, which call no MPI function, as '
+                             'shared objects in a resident runner process.')
+
+    # limit flags
+    parser.add_argument('--build-timeout',
+                        type=float,
+                        help='Wall clock seconds after which a test build is killed.')
+
+    parser.add_argument('--run-timeout',
+                        type=float,
+                        help='Wall clock seconds after which a test run is killed.')
+
+    parser.add_argument('--cpu-limit',
+                        type=int,
+                        help='CPU seconds each build and run process may use.')
+
+    parser.add_argument('--memory-limit',
+                        type=int,
+                        help='Address space in MiB each build and run process may use.')
+
+    # build cache flags
+    parser.add_argument('--no-cache',
+                        action='store_false',
+                        dest='cache',
+                        help='Always build tests, do not use the build cache.')
+
+    parser.add_argument('--cache-directory',
+                        default='build_cache',
+                        type=str,
+                        help='Directory of the persistent build cache.')
+
+    parser.add_argument('--cache-size',
+                        default=1024,
+                        type=int,
+                        help='Maximum size of the build cache in MiB.')
+
+    # journal flags
+    parser.add_argument('--journal',
+                        nargs='?',
+                        const='logs/journal.jsonl',
+                        default=None,
+                        type=str,
+                        help='Record the outcome of every build and run in a journal, by default '
+                             'logs/journal.jsonl, so that an interrupted run can be resumed.')
+
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='Resume from the journal, tests it holds outcomes of are not '
+                             'executed again. Implies --journal.')
+
+    parser.add_argument('--reuse',
+                        action='store_true',
+                        help='Reuse the outcomes of previous runs against the same MPI library '
+                             'and database, only new or changed tests are executed.')
+
+    parser.add_argument('--run-store',
+                        default='runs',
+                        type=str,
+                        help='Directory the outcomes of runs are stored in for --reuse.')
+
+    # profiling flags
+    parser.add_argument('--profile',
+                        action='store_true',
+                        help='Time every phase of the run and print a table of the phases.')
+
+    parser.add_argument('--profile-output',
+                        default='logs/profile.json',
+                        type=str,
+                        help='File the phase timings of --profile are written to.')
+
+    parser.add_argument('--cprofile',
+                        default=None,
+                        type=str,
+                        help='File a cProfile dump of the Python side of the run is written to.')
+
+    # benchmark flags
+    parser.add_argument('--benchmark',
+                        action='store_true',
+                        help='Benchmark LemonSpotter itself on synthetic databases, no MPI '
+                             'library is needed. Exits with 1 if a stage regressed since the '
+                             'last run.')
+
+    parser.add_argument('--benchmark-scales',
+                        default='100,1000,10000',
+                        type=str,
+                        help='Comma separated numbers of functions of the synthetic databases.')
+
+    parser.add_argument('--benchmark-repetitions',
+                        default=1,
+                        type=int,
+                        help='Times every scale is benchmarked, the fastest time is kept.')
+
+    parser.add_argument('--benchmark-history',
+                        default='logs/benchmarks.jsonl',
+                        type=str,
+                        help='File the results of every benchmark are appended to.')
+
+    parser.add_argument('--benchmark-threshold',
+                        default=0.5,
+                        type=float,
+                        help='Relative slowdown of a stage since the last benchmark reported as '
+                             'a regression.')
+
+    # batch flags
+    parser.add_argument('--batch',
+                        action='store_true',
+                        help='Run the tests of every phase packed into a single batch job, '
+                             'allocating the given number of cores.')
+
+    parser.add_argument('--batch-submit',
+                        default='sbatch --wait',
+                        type=str,
+                        help='Command the job script is submitted with, it has to return once '
+                             'the job is finished. "sh" runs the job script locally.')
+
+    parser.add_argument('--batch-directive',
+                        action='append',
+                        dest='batch_directives',
+                        type=str,
+                        help='Line placed at the start of the job script, {name} and {cores} '
+                             'are replaced. Defaults to the Slurm job name and task count.')
+
+    # distributed flags
+    parser.add_argument('--coordinator',
+                        type=str,
+                        metavar='ADDRESS',
+                        help='Hand the tests out to workers connecting to host:port or '
+                             'unix:path, instead of executing them locally.')
+
+    parser.add_argument('--worker',
+                        type=str,
+                        metavar='ADDRESS',
+                        help='Execute the tests handed out by the coordinator at host:port or '
+                             'unix:path.')
+
+    parser.add_argument('--local-workers',
+                        default=0,
+                        type=int,
+                        help='Number of workers the coordinator starts on this host, the jobs '
+                             'and cores are divided among them.')
+
+    parser.add_argument('--worker-timeout',
+                        default=300,
+                        type=float,
+                        help='Seconds the coordinator waits without any connected worker before '
+                             'it gives up.')
+
     # test flags
     parser.add_argument('--tests',
                         type=str,
                         help='Comma separated list of generators.')
 
+    parser.add_argument('--constant-batch',
+                        default=1,
+                        type=int,
+                        help='Number of constants tested by a single program, failing batches '
+                             'are bisected.')
+
+    parser.add_argument('--group-tests',
+                        default='1',
+                        type=str,
+                        help='Number of independent tests emitted as a single program, or '
+                             '"function" to group all tests of a function.')
+
+    parser.add_argument('--symbol-presence',
+                        action='store_true',
+                        help='Find present functions in the symbol tables of the MPI libraries, '
+                             'only compile tests for the remaining functions.')
+
+    parser.add_argument('--header-introspection',
+                        action='store_true',
+                        help='Resolve constants from a single preprocessor pass over mpi.h, only '
+                             'build and run tests for constants requiring runtime evaluation.')
+
+    parser.add_argument('--performance',
+                        action='store_true',
+                        help='Time the calls of present independent functions and report their '
+                             'latency.')
+
+    parser.add_argument('--warmup',
+                        default=10,
+                        type=int,
+                        help='Number of untimed calls before the timed calls of a function.')
+
+    parser.add_argument('--repetitions',
+                        default=100,
+                        type=int,
+                        help='Number of timed calls of a function, at most 4096.')
+
+    parser.add_argument('--confidence',
+                        default=0.95,
+                        type=float,
+                        help='Confidence level of the latency intervals, noisy functions are '
+                             'timed again until their interval is narrow enough.')
+
+    parser.add_argument('--latency-limit',
+                        default=None,
+                        type=float,
+                        help='Flag functions as lemons whose latency in seconds is significantly '
+                             'above this limit.')
+
+    parser.add_argument('--save-baseline',
+                        action='store_true',
+                        help='Store the performance results as the baseline of the MPI library.')
+
+    parser.add_argument('--compare-baseline',
+                        nargs='?',
+                        const='',
+                        default=None,
+                        metavar='FINGERPRINT',
+                        help='Compare the latencies with the baseline of the MPI library, or of '
+                             'another MPI library given by its fingerprint or a prefix of it.')
+
+    parser.add_argument('--regression-threshold',
+                        default=0.1,
+                        type=float,
+                        help='Flag functions as lemons whose latency is significantly more than '
+                             'this fraction above the baseline.')
+
+    parser.add_argument('--baseline-store',
+                        default='baselines',
+                        type=str,
+                        help='Directory the baselines of MPI libraries are stored in.')
+
+    parser.add_argument('--point-to-point',
+                        action='store_true',
+                        help='Sweep the latency and bandwidth of the present send and receive '
+                             'functions over message sizes, with two ranks.')
+
+    parser.add_argument('--collectives',
+                        action='store_true',
+                        help='Measure the scaling of the present collective operations over the '
+                             'powers of two rank counts up to the cores and message sizes.')
+
+    parser.add_argument('--min-message-size',
+                        default=1,
+                        type=int,
+                        help='Smallest message size in bytes of the sweeps, a power of two.')
+
+    parser.add_argument('--max-message-size',
+                        type=int,
+                        help='Largest message size in bytes of the sweeps, a power of two. '
+                             'Defaults to 64 MiB for point-to-point and 1 MiB for collective '
+                             'operations.')
+
     parser.add_argument('--flake8',
                         action='store_true',
                         dest='flake',
@@ -93,6 +377,105 @@ def parse_arguments():
         parser.print_help()
         sys.exit(0)
 
+    if arguments.jobs < 1:
+        parser.error('--jobs needs to be at least 1')
+
+    if arguments.cores < 1:
+        parser.error('--cores needs to be at least 1')
+
+    if arguments.coordinator and arguments.pipeline:
+        parser.error('--pipeline cannot be combined with --coordinator')
+
+    if arguments.coordinator and arguments.resident:
+        parser.error('--resident cannot be combined with --coordinator')
+
+    # the pipeline launches tests one at a time, a runner per test is slower than none
+    if arguments.pipeline and arguments.resident:
+        parser.error('--resident cannot be combined with --pipeline')
+
+    if arguments.batch:
+        for flag in ('coordinator', 'pipeline', 'resident', 'in_memory'):
+            if getattr(arguments, flag):
+                parser.error(f'--{flag.replace("_", "-")} cannot be combined with --batch')
+
+    if arguments.warmup < 0:
+        parser.error('--warmup cannot be negative')
+
+    if not 1 <= arguments.repetitions <= PerformanceGenerator.max_repetitions:
+        parser.error(f'--repetitions needs to be between 1 and '
+                     f'{PerformanceGenerator.max_repetitions}')
+
+    if not 0 < arguments.confidence < 1:
+        parser.error('--confidence needs to be between 0 and 1')
+
+    if arguments.latency_limit is not None and not arguments.performance:
+        parser.error('--latency-limit requires --performance')
+
+    if arguments.compare_baseline is not None and not arguments.performance:
+        parser.error('--compare-baseline requires --performance')
+
+    if arguments.save_baseline and not (arguments.performance or arguments.point_to_point or
+                                        arguments.collectives):
+        parser.error('--save-baseline requires --performance, --point-to-point or --collectives')
+
+    if arguments.regression_threshold < 0:
+        parser.error('--regression-threshold cannot be negative')
+
+    for size in (arguments.min_message_size, arguments.max_message_size):
+        if size is not None and (size < 1 or size & (size - 1) or
+                                 size > SweepGenerator.max_message):
+            parser.error(f'message sizes need to be powers of two up to '
+                         f'{SweepGenerator.max_message}, not {size}')
+
+    if arguments.max_message_size is not None:
+        largest = [arguments.max_message_size]
+
+    else:
+        largest = [size for size, enabled in ((64 * 1024**2, arguments.point_to_point),
+                                              (1024**2, arguments.collectives)) if enabled]
+
+    if any(arguments.min_message_size > size for size in largest):
+        parser.error('--min-message-size cannot exceed the largest message size')
+
+    if arguments.local_workers and not arguments.coordinator:
+        parser.error('--local-workers requires --coordinator')
+
+    if arguments.worker_timeout <= 0:
+        parser.error('--worker-timeout needs to be positive')
+
+    if arguments.resume and arguments.journal is None:
+        arguments.journal = 'logs/journal.jsonl'
+
+    try:
+        arguments.benchmark_scales = [int(scale) for scale in
+                                      arguments.benchmark_scales.split(',')]
+
+    except ValueError:
+        parser.error(f'--benchmark-scales needs to be comma separated numbers, not '
+                     f'{arguments.benchmark_scales}')
+
+    if any(scale < 1 for scale in arguments.benchmark_scales):
+        parser.error('--benchmark-scales need to be at least 1')
+
+    if arguments.benchmark_repetitions < 1:
+        parser.error('--benchmark-repetitions needs to be at least 1')
+
+    if arguments.benchmark_threshold < 0:
+        parser.error('--benchmark-threshold cannot be negative')
+
+    if arguments.constant_batch < 1:
+        parser.error('--constant-batch needs to be at least 1')
+
+    if arguments.group_tests == 'function':
+        arguments.group_tests = None
+
+    elif not arguments.group_tests.isdigit() or int(arguments.group_tests) < 1:
+        parser.error(f'--group-tests needs to be "function" or at least 1, not '
+                     f'{arguments.group_tests}')
+
+    else:
+        arguments.group_tests = int(arguments.group_tests)
+
     return arguments
 
 
@@ -109,6 +492,69 @@ def set_logging_level(log_level: str):
     logging.basicConfig(level=numeric_level)
 
 
+def executor_options(arguments) -> dict:
+    """
+    Provides the options of the local executor given on the command line.
+    """
+
+    memory_limit = None
+    if arguments.memory_limit is not None:
+        memory_limit = arguments.memory_limit * 1024**2
+
+    cache = None
+    if arguments.cache:
+        cache = BuildCache(Path(arguments.cache_directory), arguments.cache_size * 1024**2)
+
+    return {'jobs': arguments.jobs,
+            'cores': arguments.cores,
+            'cache': cache,
+            'precompiled_header': arguments.pch,
+            'build_timeout': arguments.build_timeout,
+            'run_timeout': arguments.run_timeout,
+            'cpu_limit': arguments.cpu_limit,
+            'memory_limit': memory_limit,
+            'in_memory': arguments.in_memory,
+            'keep': arguments.keep}
+
+
+def start_local_workers(arguments, address: str) -> list:
+    """
+    Starts the local workers of the coordinator, the jobs and cores are divided among them.
+    """
+
+    count = arguments.local_workers
+
+    command = [sys.executable, '-m', 'lemonspotter',
+               '--worker', address,
+               '--log', arguments.log,
+               '--mpicc', arguments.mpicc,
+               '--mpiexec', arguments.mpiexec,
+               '--jobs', str(max(arguments.jobs // count, 1)),
+               '--cores', str(max(arguments.cores // count, 1)),
+               '--cache-directory', arguments.cache_directory,
+               '--cache-size', str(arguments.cache_size)]
+
+    for flag in ('build_timeout', 'run_timeout', 'cpu_limit', 'memory_limit'):
+        if getattr(arguments, flag) is not None:
+            command += ['--' + flag.replace('_', '-'), str(getattr(arguments, flag))]
+
+    if not arguments.cache:
+        command.append('--no-cache')
+
+    if not arguments.pch:
+        command.append('--no-pch')
+
+    if arguments.in_memory:
+        command.append('--in-memory')
+
+    if arguments.keep:
+        command.append('--keep')
+
+    logging.info('starting %i local workers with %s', count, ' '.join(command))
+
+    return [Popen(command) for _ in range(count)]
+
+
 def main() -> None:
     """
     This function is the workflow of LemonSpotter.
@@ -159,25 +605,174 @@ def main() -> None:
         if stderr:
             logging.error(stderr)
 
+    elif arguments.benchmark:
+        suite = BenchmarkSuite(arguments.benchmark_scales,
+                               arguments.benchmark_repetitions,
+                               arguments.benchmark_threshold)
+
+        results = suite.run()
+        print(suite.table(results))
+
+        regressions = suite.record(Path(arguments.benchmark_history), results)
+        for regression in regressions:
+            logging.warning('benchmark regression: %s', regression)
+
+        if regressions:
+            sys.exit(1)
+
     elif arguments.report:
         with open(arguments.specification) as report_file:
             report = json.load(report_file)
 
         print(json.dumps(report, indent=2))
 
+    elif arguments.worker:
+        # workers on the same host must not share their generated tests
+        executor = MPIExecutor(arguments.mpicc,
+                               arguments.mpiexec,
+                               test_directory=Path('generated_tests') / f'worker_{os.getpid()}',
+                               **executor_options(arguments))
+
+        Worker(arguments.worker, executor).run()
+
     elif not arguments.specification:
         logging.error("Database path not defined")
 
     else:
+        if arguments.profile:
+            Profiler().enable()
+
+        profile = None
+        if arguments.cprofile is not None:
+            profile = cProfile.Profile()
+            profile.enable()
+
+        journal = None
+        if arguments.journal is not None:
+            journal = Journal(Path(arguments.journal), resume=arguments.resume)
+
+        toolchain = Toolchain(arguments.mpicc, arguments.mpiexec)
+
+        store = None
+        if arguments.reuse and toolchain.fingerprint is None:
+            logging.warning('not reusing stored runs, the MPI library cannot be identified.')
+
+        elif arguments.reuse:
+            database = MPIParser.fingerprint(Path(arguments.specification))
+            fingerprint = RunStore.fingerprint(toolchain.fingerprint, database)  # type: ignore
+            logging.info('fingerprint of run is %s', fingerprint)
+
+            store = RunStore(Path(arguments.run_store)).open(fingerprint)
+
+        workers = []
+        if arguments.coordinator:
+            executor = DistributedExecutor(arguments.coordinator,
+                                           toolchain,
+                                           journal=journal,
+                                           store=store,
+                                           timeout=arguments.worker_timeout)
+
+            if arguments.local_workers:
+                workers = start_local_workers(arguments, executor.address)
+
+        elif arguments.batch:
+            executor = BatchExecutor(arguments.mpicc,
+                                     arguments.mpiexec,
+                                     submit=shlex.split(arguments.batch_submit),
+                                     directives=arguments.batch_directives,
+                                     journal=journal,
+                                     store=store,
+                                     **executor_options(arguments))
+
+        else:
+            executor = MPIExecutor(arguments.mpicc,
+                                   arguments.mpiexec,
+                                   resident=arguments.resident,
+                                   journal=journal,
+                                   store=store,
+                                   **executor_options(arguments))
+
         # initialize and load the database
-        runtime = Runtime(Path(arguments.specification), arguments.mpicc, arguments.mpiexec)
-        runtime.presence_testing()
-        runtime.independent_testing()
-        runtime.start_end_testing()
+        runtime = Runtime(Path(arguments.specification), executor)
+
+        if arguments.pipeline:
+            runtime.pipelined_testing(constant_batch=arguments.constant_batch,
+                                      symbol_presence=arguments.symbol_presence,
+                                      header_introspection=arguments.header_introspection,
+                                      group_size=arguments.group_tests)
+
+        else:
+            runtime.presence_testing(constant_batch=arguments.constant_batch,
+                                     symbol_presence=arguments.symbol_presence,
+                                     header_introspection=arguments.header_introspection)
+            runtime.independent_testing(group_size=arguments.group_tests)
+            runtime.start_end_testing()
+
+        if arguments.performance:
+            runtime.performance_testing(warmup=arguments.warmup,
+                                        repetitions=arguments.repetitions,
+                                        confidence=arguments.confidence,
+                                        latency_limit=arguments.latency_limit)
+
+        sweep = {'warmup': arguments.warmup,
+                 'repetitions': arguments.repetitions,
+                 'min_size': arguments.min_message_size}
+
+        if arguments.max_message_size is not None:
+            sweep['max_size'] = arguments.max_message_size
+
+        if arguments.point_to_point:
+            runtime.point_to_point_testing(**sweep)
+
+        if arguments.collectives:
+            runtime.collective_testing(**sweep)
+
+        baselines = BaselineStore(Path(arguments.baseline_store))
+
+        if arguments.compare_baseline is not None:
+            # the baseline of the MPI library in use, unless another is given
+            prefix = arguments.compare_baseline or toolchain.fingerprint
+            fingerprint = baselines.resolve(prefix) if prefix is not None else None
+            baseline = baselines.load(fingerprint) if fingerprint is not None else None
+
+            if baseline is None:
+                logging.error('no baseline to compare with in %s', baselines.directory)
+
+            else:
+                runtime.compare_performance(baseline,
+                                            threshold=arguments.regression_threshold,
+                                            confidence=arguments.confidence)
+
+        if arguments.save_baseline and toolchain.fingerprint is None:
+            logging.error('not saving a baseline, the MPI library cannot be identified.')
+
+        elif arguments.save_baseline:
+            version = toolchain.mpicc_version.splitlines()  # type: ignore
+            baselines.save(toolchain.fingerprint,  # type: ignore
+                           runtime.performance_results(),
+                           f'{toolchain.mpicc_path} {version[0] if version else ""}'.strip())
+
+        executor.close()
+        for worker in workers:
+            worker.wait()
+
+        if journal is not None:
+            journal.close()
+
+        if store is not None:
+            store.close()
 
         # Prints report and writes to file
         runtime.reporter.print_report()
 
+        if profile is not None:
+            profile.disable()
+            profile.dump_stats(arguments.cprofile)
+
+        if arguments.profile:
+            print(Profiler().table(), file=sys.stderr)
+            Profiler().write(Path(arguments.profile_output))
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,248 @@
+"""
+This module defines the Analysis class, which provides the statistics of the timing samples of
+performance tests.
+
+The samples of a test are first truncated by the marginal standard error rule, which detects
+the end of the warmup, and outliers are rejected by their distance from the median in median
+absolute deviations. Confidence intervals are bootstrapped from the remaining samples, since the
+durations of calls are not normally distributed.
+"""
+
+import math
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lemonspotter.core.profiler import profiled
+
+
+class Analysis:
+    """
+    This class analyses timing samples, the confidence level, number of bootstrap resamples and
+    outlier threshold are shared by all of its methods.
+    """
+
+    # percentiles provided by summarize
+    percentiles: Sequence[float] = (5, 25, 75, 95, 99)
+    # scale of the median absolute deviation to the standard deviation of a normal distribution
+    deviation_scale: float = 1.4826
+
+    def __init__(self,
+                 confidence: float = 0.95,
+                 resamples: int = 1000,
+                 outlier_threshold: float = 5.0,
+                 precision: float = 0.05,
+                 seed: Optional[int] = 0) -> None:
+        """
+        Constructs the analysis. Samples further than outlier_threshold scaled median absolute
+        deviations from the median are rejected. The precision is the half width of the
+        confidence interval of the median relative to the median, which further repetitions aim
+        for. Bootstrapping is reproducible unless the seed is None.
+        """
+
+        if not 0 < confidence < 1:
+            raise ValueError(f'Confidence needs to be between 0 and 1, not {confidence}.')
+
+        if resamples < 1:
+            raise ValueError(f'Number of resamples needs to be at least 1, not {resamples}.')
+
+        self._confidence = confidence
+        self._resamples = resamples
+        self._outlier_threshold = outlier_threshold
+        self._precision = precision
+        self._seed = seed
+
+    @property
+    def confidence(self) -> float:
+        """This property provides the confidence level of the intervals."""
+
+        return self._confidence
+
+    def _generator(self) -> np.random.Generator:
+        return np.random.default_rng(self._seed)
+
+    @staticmethod
+    def warmup(samples: Iterable[float]) -> int:
+        """
+        Provides the number of leading samples which belong to the warmup, by the marginal
+        standard error rule. The truncation minimizing the standard error of the mean of the
+        remaining samples is chosen, at most half of the samples are truncated.
+        """
+
+        values = np.asarray(samples, dtype=float)
+        count = len(values)
+
+        if count < 4:
+            return 0
+
+        # sums of the samples and their squares from every truncation to the end
+        sums = np.cumsum(values[::-1])[::-1]
+        squares = np.cumsum((values * values)[::-1])[::-1]
+        remaining = np.arange(count, 0, -1, dtype=float)
+
+        variance = squares / remaining - (sums / remaining)**2
+        errors = variance / remaining
+
+        return int(np.argmin(errors[:count // 2 + 1]))
+
+    def reject_outliers(self, samples: Iterable[float]) -> np.ndarray:
+        """
+        Provides the samples within the outlier threshold of the median, in their order.
+        """
+
+        values = np.asarray(samples, dtype=float)
+
+        if len(values) == 0:
+            return values
+
+        median = np.median(values)
+        deviation = self.deviation_scale * np.median(np.abs(values - median))
+
+        if deviation == 0:
+            return values
+
+        return values[np.abs(values - median) <= self._outlier_threshold * deviation]
+
+    def clean(self, samples: Iterable[float]) -> Tuple[np.ndarray, int, int]:
+        """
+        Provides the samples without warmup and outliers, with the number of samples dropped as
+        warmup and rejected as outliers.
+        """
+
+        values = np.asarray(samples, dtype=float)
+
+        warmup = self.warmup(values)
+        steady = values[warmup:]
+        cleaned = self.reject_outliers(steady)
+
+        return cleaned, warmup, len(steady) - len(cleaned)
+
+    def interval(self, samples: Iterable[float]) -> Tuple[float, float]:
+        """
+        Provides the bootstrapped confidence interval of the median of the samples.
+        """
+
+        values = np.asarray(samples, dtype=float)
+
+        if len(values) == 0:
+            raise ValueError('Confidence interval of no samples.')
+
+        indices = self._generator().integers(0, len(values), (self._resamples, len(values)))
+        medians = np.median(values[indices], axis=1)
+
+        tail = (1 - self._confidence) / 2 * 100
+
+        low, high = np.percentile(medians, (tail, 100 - tail))
+
+        return float(low), float(high)
+
+    def additional_repetitions(self, samples: Iterable[float]) -> int:
+        """
+        Provides the number of further samples needed for the confidence interval of the median
+        to reach the precision, assuming its width shrinks with the square root of the number of
+        samples.
+        """
+
+        values = np.asarray(samples, dtype=float)
+
+        if len(values) < 2:
+            return 0
+
+        median = float(np.median(values))
+        if median <= 0:
+            return 0
+
+        low, high = self.interval(values)
+        ratio = (high - low) / 2 / (self._precision * median)
+
+        return max(math.ceil(len(values) * ratio**2) - len(values), 0)
+
+    @profiled('analyse')
+    def summarize(self, samples: Iterable[float]) -> Optional[Dict[str, Any]]:
+        """
+        Provides the statistics of the samples without warmup and outliers, None if there are
+        no samples.
+        """
+
+        values = np.asarray(samples, dtype=float)
+
+        if len(values) == 0:
+            return None
+
+        cleaned, warmup, outliers = self.clean(values)
+        low, high = self.interval(cleaned)
+
+        summary: Dict[str, Any] = {
+            'median': float(np.median(cleaned)),
+            'mean': float(np.mean(cleaned)),
+            'minimum': float(np.min(cleaned)),
+            'maximum': float(np.max(cleaned)),
+            'stdev': float(np.std(cleaned, ddof=1)) if len(cleaned) > 1 else 0.0,
+            'interval': [low, high],
+            'confidence': self._confidence,
+            'samples': len(values),
+            'warmup': warmup,
+            'outliers': outliers,
+            'additional_repetitions': self.additional_repetitions(cleaned),
+        }
+
+        for percentile, value in zip(self.percentiles,
+                                     np.percentile(cleaned, self.percentiles)):
+            summary[f'p{percentile:g}'] = float(value)
+
+        return summary
+
+    @profiled('analyse')
+    def exceeds(self, samples: Iterable[float], limit: float) -> bool:
+        """
+        Checks whether the median of the samples, without warmup and outliers, is significantly
+        above the limit, the whole confidence interval lies above it.
+        """
+
+        cleaned, _, _ = self.clean(samples)
+
+        if len(cleaned) == 0:
+            return False
+
+        low, _ = self.interval(cleaned)
+
+        return low > limit
+
+    @profiled('analyse')
+    def compare(self,
+                reference: Iterable[float],
+                samples: Iterable[float]) -> Optional[Dict[str, Any]]:
+        """
+        Compares the median of the samples to the median of the reference samples, both without
+        warmup and outliers. The relative difference, its bootstrapped confidence interval and
+        whether the interval excludes no difference are provided, None if either has no samples.
+        """
+
+        first, _, _ = self.clean(reference)
+        second, _, _ = self.clean(samples)
+
+        if len(first) == 0 or len(second) == 0 or np.median(first) <= 0:
+            return None
+
+        generator = self._generator()
+        first_medians = np.median(first[generator.integers(0, len(first),
+                                                           (self._resamples, len(first)))],
+                                  axis=1)
+        second_medians = np.median(second[generator.integers(0, len(second),
+                                                             (self._resamples, len(second)))],
+                                   axis=1)
+
+        # resamples of the reference with a median of zero have no relative difference
+        valid = first_medians > 0
+        if not valid.any():
+            return None
+
+        ratios = second_medians[valid] / first_medians[valid] - 1
+
+        tail = (1 - self._confidence) / 2 * 100
+        low, high = np.percentile(ratios, (tail, 100 - tail))
+
+        return {'difference': float(np.median(second) / np.median(first) - 1),
+                'interval': [float(low), float(high)],
+                'confidence': self._confidence,
+                'significant': bool(low > 0 or high < 0)}
@@ -0,0 +1,101 @@
+"""
+This module contains the BaselineStore class, which keeps the performance results of the
+functions by the fingerprint of the MPI library, so that later runs against the same or another
+MPI library can be compared with them.
+"""
+
+import datetime
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+
+class BaselineStore:
+    """
+    This class stores the performance results of every MPI library as a JSON file named after
+    its fingerprint. Saving the results of a function replaces its previous results, the results
+    of other functions are kept.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        """This property provides the directory the baselines are stored in."""
+
+        return self._directory
+
+    @property
+    def fingerprints(self) -> Sequence[str]:
+        """This property provides the fingerprints of all stored baselines."""
+
+        if not self._directory.exists():
+            return ()
+
+        return tuple(sorted(path.stem for path in self._directory.glob('*.json')))
+
+    def resolve(self, prefix: str) -> Optional[str]:
+        """
+        Provides the fingerprint of the stored baseline starting with the prefix, None if there
+        is no such baseline or it is ambiguous.
+        """
+
+        matching = [fingerprint for fingerprint in self.fingerprints
+                    if fingerprint.startswith(prefix)]
+
+        if len(matching) > 1:
+            logging.warning('baseline %s is ambiguous, it matches %s', prefix, matching)
+            return None
+
+        if not matching:
+            logging.warning('no baseline %s in %s', prefix, self._directory)
+            return None
+
+        return matching[0]
+
+    def load(self, fingerprint: str) -> Optional[Mapping[str, Any]]:
+        """
+        Loads the baseline of the fingerprint, None if there is none.
+        """
+
+        path = self._directory / f'{fingerprint}.json'
+
+        if not path.exists():
+            return None
+
+        with path.open() as baseline:
+            return json.load(baseline)
+
+    def save(self,
+             fingerprint: str,
+             functions: Mapping[str, Mapping[str, Any]],
+             description: Optional[str] = None) -> Path:
+        """
+        Saves the performance results of the functions as the baseline of the fingerprint, the
+        description identifies the MPI library to the reader.
+        """
+
+        baseline: Dict[str, Any] = dict(self.load(fingerprint) or {'functions': {}})
+
+        baseline['fingerprint'] = fingerprint
+        baseline['updated'] = datetime.datetime.now().isoformat()
+        if description is not None:
+            baseline['description'] = description
+
+        baseline['functions'] = {**baseline['functions'], **functions}
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / f'{fingerprint}.json'
+
+        # an interrupted write does not lose the previous baseline
+        partial = path.with_suffix('.partial')
+        with partial.open('w') as output:
+            json.dump(baseline, output)
+
+        partial.replace(path)
+
+        logging.info('saved baseline of %i functions to %s', len(functions), path)
+
+        return path
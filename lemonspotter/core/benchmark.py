@@ -0,0 +1,378 @@
+"""
+This module contains the benchmarks of lemonspotter itself, which measure the hot paths of
+loading a database and generating tests on synthetic databases of increasing size.
+
+No test is built or executed, so no MPI library is needed. The results of every run of the
+suite are appended to a history file, a stage which became considerably slower than in the
+previous run is reported as a regression.
+"""
+
+import json
+import math
+import time
+import random
+import logging
+import datetime
+import platform
+import tempfile
+import subprocess
+from pathlib import Path
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Mapping, Optional, Sequence
+
+from lemonspotter.core.database import Database
+from lemonspotter.core.report import TestReport
+from lemonspotter.core.test import Test
+from lemonspotter.generators.independent import IndependentGenerator
+from lemonspotter.generators.startend import StartEndGenerator
+from lemonspotter.parsers.mpiparser import MPIParser
+from lemonspotter.samplers.valid import ValidSampler
+
+
+class SyntheticDatabase:
+    """
+    This class writes a database with the given number of types, constants and functions. A
+    share of the functions are initiators and finalizers, every initiator leads to every
+    finalizer, the other functions are independent with up to three parameters.
+    """
+
+    def __init__(self, scale: int, seed: int = 0) -> None:
+        if scale < 1:
+            raise ValueError(f'Scale needs to be at least 1, not {scale}.')
+
+        self._scale = scale
+        self._seed = seed
+
+    @property
+    def scale(self) -> int:
+        """This property provides the number of types, constants and functions."""
+
+        return self._scale
+
+    @property
+    def pairs(self) -> int:
+        """This property provides the number of initiators, which is that of finalizers."""
+
+        return max(1, math.ceil(math.sqrt(self._scale) / 2))
+
+    def types(self) -> List[Mapping[str, Any]]:
+        """
+        Provides the type definitions, every third type is partitioned by its constants and
+        the others by two literals.
+        """
+
+        # the arguments of main are always declared
+        types: List[Mapping[str, Any]] = [{'name': 'int',
+                                           'abstract_type': 'INT',
+                                           'base_type': True,
+                                           'language_type': 'int',
+                                           'print_specifier': 'd',
+                                           'partitions': [{'type': 'literal', 'value': '0'}]},
+                                          {'name': 'char**',
+                                           'abstract_type': 'CHAR_2PTR',
+                                           'base_type': True,
+                                           'language_type': 'char **'},
+                                          {'name': 'ERRORCODE',
+                                           'abstract_type': 'ERRORCODE',
+                                           'base_type': True,
+                                           'language_type': 'int',
+                                           'print_specifier': 'd',
+                                           'partitions': [{'type': 'literal', 'value': '0'}]}]
+
+        for index in range(self._scale):
+            if index % 3 == 0:
+                partitions = [{'type': 'constant'}]
+
+            else:
+                partitions = [{'type': 'literal', 'value': '0'},
+                              {'type': 'literal', 'value': '1'}]
+
+            types.append({'name': f'type_{index}',
+                          'abstract_type': f'TYPE_{index}',
+                          'base_type': True,
+                          'language_type': 'int',
+                          'print_specifier': 'd',
+                          'partitions': partitions})
+
+        return types
+
+    def constants(self) -> List[Mapping[str, Any]]:
+        """
+        Provides the constant definitions, spread evenly over the types.
+        """
+
+        constants: List[Mapping[str, Any]] = [{'name': 'MPI_SUCCESS',
+                                               'abstract_type': 'ERRORCODE',
+                                               'defined': {'operand': 'equal', 'value': '0'}}]
+
+        for index in range(self._scale):
+            constants.append({'name': f'CONSTANT_{index}',
+                              'abstract_type': f'TYPE_{index}'})
+
+        return constants
+
+    def functions(self) -> List[Mapping[str, Any]]:
+        """
+        Provides the function definitions, the initiators and finalizers come first.
+        """
+
+        generator = random.Random(self._seed)
+
+        starts = [f'START_{index}' for index in range(self.pairs)]
+        ends = [f'END_{index}' for index in range(self.pairs)]
+
+        def function(name: str, **dependencies: List[str]) -> Mapping[str, Any]:
+            # arguments are declared in the scope of main, their names are unique
+            parameters = [{'name': f'{name.lower()}_{index}',
+                           'abstract_type': f'TYPE_{generator.randrange(self._scale)}',
+                           'direction': generator.choice(('in', 'in', 'out'))}
+                          for index in range(generator.randrange(4))]
+
+            # every argument of the input parameters is allowed
+            sieve = {parameter['name']: {'value': 'any'} for parameter in parameters
+                     if parameter['direction'] == 'in'}
+
+            return {'name': name, 'return': 'ERRORCODE', 'parameters': parameters,
+                    'filters': [sieve], **dependencies}
+
+        functions = [function(name, leads_all=ends) for name in starts]
+        functions.extend(function(name, needs_all=starts) for name in ends)
+        functions.extend(function(f'FUNCTION_{index}')
+                         for index in range(max(0, self._scale - 2 * self.pairs)))
+
+        return functions
+
+    def write(self, directory: Path) -> None:
+        """
+        Writes the database into the directory, as read by the MPIParser.
+        """
+
+        (directory / 'functions').mkdir(parents=True, exist_ok=True)
+
+        (directory / 'types.json').write_text(json.dumps(self.types()))
+        (directory / 'constants.json').write_text(json.dumps(self.constants()))
+        (directory / 'defaults.json').write_text(json.dumps({'function': {'needs_any': [],
+                                                                          'needs_all': [],
+                                                                          'leads_any': [],
+                                                                          'leads_all': [],
+                                                                          'filters': [{}]},
+                                                             'parameter': {}}))
+
+        for function in self.functions():
+            (directory / 'functions' / f'{function["name"]}.json').write_text(
+                json.dumps(function))
+
+
+class BenchmarkSuite:
+    """
+    This class measures the stages of lemonspotter on a synthetic database of every scale. The
+    best time of the given number of repetitions is kept for every stage.
+    """
+
+    # stages in the order they are measured
+    stages: Sequence[str] = ('parse', 'sample', 'generate', 'express', 'report')
+    # stages faster than this are not reported as regressions
+    noise_floor: float = 0.01
+    # number of most recent history records the baseline is the best of
+    history_window: int = 5
+
+    def __init__(self,
+                 scales: Sequence[int] = (100, 1000, 10000),
+                 repetitions: int = 1,
+                 threshold: float = 0.5) -> None:
+        """
+        Constructs the suite. A stage is a regression if it became more than threshold slower,
+        relative to the best of the recent runs.
+        """
+
+        if repetitions < 1:
+            raise ValueError(f'Number of repetitions needs to be at least 1, not {repetitions}.')
+
+        self._scales = tuple(scales)
+        self._repetitions = repetitions
+        self._threshold = threshold
+
+    @staticmethod
+    def _time(stage: Callable[[], Any]) -> float:
+        start = time.perf_counter()
+        stage()
+
+        return time.perf_counter() - start
+
+    def run_scale(self, scale: int) -> Mapping[str, float]:
+        """
+        Measures every stage on the synthetic database of the scale. The database is cleared
+        before and after.
+        """
+
+        results: Dict[str, float] = {stage: math.inf for stage in self.stages}
+
+        with tempfile.TemporaryDirectory() as directory:
+            SyntheticDatabase(scale).write(Path(directory))
+
+            for _ in range(self._repetitions):
+                Database().clear()
+                measured = self._measure(Path(directory))
+
+                for stage, seconds in measured.items():
+                    results[stage] = min(results[stage], seconds)
+
+        Database().clear()
+
+        return results
+
+    def _measure(self, directory: Path) -> Mapping[str, float]:
+        """
+        Measures every stage once on the database in the directory.
+        """
+
+        measured: Dict[str, float] = {}
+
+        measured['parse'] = self._time(lambda: MPIParser()(directory))
+
+        # presence is assumed, as if all presence tests succeeded
+        for function in Database().get_functions():
+            function.properties['present'] = True
+
+        for constant in Database().get_constants():
+            constant.properties['present'] = True
+
+        sampler = ValidSampler()
+
+        def sample() -> None:
+            for function in Database().get_functions():
+                sampler.generate_samples(function)
+
+        measured['sample'] = self._time(sample)
+
+        tests: List[Test] = []
+        measured['generate'] = self._time(
+            lambda: tests.extend(StartEndGenerator().generate(sampler)))
+
+        tests.extend(IndependentGenerator().generate(sampler))
+
+        measured['express'] = self._time(lambda: [repr(test.source) for test in tests])
+
+        reporter = TestReport()
+        reporter.tests = tests
+        measured['report'] = self._time(reporter.generate_report)
+
+        return measured
+
+    def run(self) -> Mapping[str, Mapping[str, float]]:
+        """
+        Measures every stage at every scale.
+        """
+
+        results = {}
+        for scale in self._scales:
+            logging.info('benchmarking scale %i', scale)
+            results[str(scale)] = self.run_scale(scale)
+
+        return results
+
+    def regressions(self,
+                    previous: Mapping[str, Mapping[str, float]],
+                    results: Mapping[str, Mapping[str, float]]) -> List[str]:
+        """
+        Provides a description of every stage and scale which became more than the threshold
+        slower than in the previous results.
+        """
+
+        regressions = []
+
+        for scale, stages in results.items():
+            for stage, seconds in stages.items():
+                before = previous.get(scale, {}).get(stage)
+
+                if before is None or seconds < self.noise_floor:
+                    continue
+
+                if seconds > before * (1 + self._threshold):
+                    regressions.append(f'{stage} at scale {scale} took {seconds:.3f}s instead '
+                                       f'of {before:.3f}s')
+
+        return regressions
+
+    @staticmethod
+    def exponents(results: Mapping[str, Mapping[str, float]]) -> Mapping[str, float]:
+        """
+        Provides the growth exponent of every stage between the two largest scales, an exponent
+        of 1 is linear scaling.
+        """
+
+        scales = sorted(results, key=int)
+        if len(scales) < 2:
+            return {}
+
+        small, large = scales[-2:]
+        ratio = math.log(int(large) / int(small))
+
+        return {stage: math.log(results[large][stage] / results[small][stage]) / ratio
+                for stage in results[large]
+                if results[large][stage] > 0 and results[small][stage] > 0}
+
+    def table(self, results: Mapping[str, Mapping[str, float]]) -> str:
+        """
+        Provides the results as a table of the seconds of every stage at every scale.
+        """
+
+        scales = sorted(results, key=int)
+        exponents = self.exponents(results)
+
+        lines = [f'{"stage":<10}' + ''.join(f'{scale:>12}' for scale in scales) +
+                 f'{"exponent":>10}']
+
+        for stage in self.stages:
+            exponent = f'{exponents[stage]:>10.2f}' if stage in exponents else ''
+            lines.append(f'{stage:<10}' +
+                         ''.join(f'{results[scale][stage]:>12.4f}' for scale in scales) +
+                         exponent)
+
+        return '\n'.join(lines)
+
+    @staticmethod
+    def _commit() -> Optional[str]:
+        """
+        Provides the commit of the working directory, None if it is not a git repository.
+        """
+
+        try:
+            return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'],
+                                  capture_output=True, text=True,
+                                  check=True).stdout.strip()
+
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def record(self, history: Path, results: Mapping[str, Mapping[str, float]]) -> List[str]:
+        """
+        Appends the results to the history and provides the regressions against the best
+        time of every stage and scale in the last records of the history, so a single slow run
+        does not become the baseline.
+        """
+
+        recent: Deque[Mapping[str, Mapping[str, float]]] = deque(maxlen=self.history_window)
+
+        if history.exists():
+            with history.open() as records:
+                for line in records:
+                    if line.strip():
+                        recent.append(json.loads(line)['results'])
+
+        previous: Dict[str, Dict[str, float]] = {}
+        for record in recent:
+            for scale, stages in record.items():
+                best = previous.setdefault(scale, {})
+                for stage, seconds in stages.items():
+                    best[stage] = min(seconds, best.get(stage, math.inf))
+
+        history.parent.mkdir(parents=True, exist_ok=True)
+
+        with history.open('a') as records:
+            records.write(json.dumps({'date': datetime.datetime.now().isoformat(),
+                                      'commit': self._commit(),
+                                      'python': platform.python_version(),
+                                      'results': results}) + '\n')
+
+        return self.regressions(previous, results)
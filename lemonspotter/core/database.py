@@ -36,6 +36,20 @@ class Database(metaclass=_Singleton):
         self._constants_by_name: Dict[str, Constant] = {}
         self._type_by_abstract_type: Dict[str, Type] = {}
 
+    def clear(self) -> None:
+        """
+        Removes all functions, constants and types from the database.
+        """
+
+        self._functions.clear()
+        self._constants.clear()
+        self._types.clear()
+
+        self._functions_by_name.clear()
+        self._constants_by_abstract_type.clear()
+        self._constants_by_name.clear()
+        self._type_by_abstract_type.clear()
+
     def add_constant(self, constant: Constant) -> None:
         """
         Adds a constant to the database.
@@ -72,6 +86,11 @@ class Database(metaclass=_Singleton):
 
         return self._constants_by_name[name]
 
+    def has_constant(self, name: str) -> bool:
+        """Checks whether the database holds a constant of the given name."""
+
+        return name in self._constants_by_name
+
     def add_function(self, function: Function) -> None:
         """
         Adds a function to the database and adds it to the lookup by name.
@@ -97,7 +116,7 @@ class Database(metaclass=_Singleton):
         return self._functions_by_name[name]
 
     def has_function(self, name: str) -> bool:
-        """"""
+        """Checks whether the database holds a function of the given name."""
 
         return name in self._functions_by_name
 
@@ -0,0 +1,148 @@
+"""
+This module contains the Journal class, which records the outcome of every build and run as it
+happens, so that an interrupted run can be resumed.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Mapping, MutableMapping, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from lemonspotter.core.test import Test
+
+
+class Journal:
+    """
+    This class appends one JSON record per build and run outcome to a journal file. Records are
+    identified by the test name, the phase and a hash of the test source, a test is only
+    resumed if its source is unchanged. Records are synced to disk in batches.
+    """
+
+    # number of records written between syncs to disk
+    sync_interval: int = 64
+
+    # source hash of every test, shared by all journals, with the source it was computed from
+    _hashes: MutableMapping[Test, Tuple[Any, str]] = WeakKeyDictionary()
+
+    def __init__(self, path: Path, resume: bool = False) -> None:
+        """
+        Opens the journal. If resume is set, the records of an existing journal are loaded and
+        new records are appended, otherwise the journal is started empty.
+        """
+
+        self._path = path
+        self._lock = Lock()
+
+        self._records: Dict[Tuple[str, str, str], Mapping[str, Any]] = {}
+        self._unsynced = 0
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        if resume and self._path.exists():
+            self._load()
+
+        self._file = self._path.open('a' if resume else 'w')
+
+        # a record truncated by a crash is terminated, so that new records start on a new line
+        if resume and self._file.tell() > 0:
+            with self._path.open('rb') as journal:
+                journal.seek(-1, os.SEEK_END)
+
+                if journal.read(1) != b'\n':
+                    self._file.write('\n')
+
+    @property
+    def path(self) -> Path:
+        """This property provides the path of the journal file."""
+
+        return self._path
+
+    @classmethod
+    def source_hash(cls, test: Test) -> str:
+        """
+        Provides the hash of the source of the test. The hash is computed once per test, unless
+        the source of the test is replaced.
+        """
+
+        cached = cls._hashes.get(test)
+        if cached is not None and cached[0] is test.source:
+            return cached[1]
+
+        digest = hashlib.sha256(repr(test.source).encode()).hexdigest()
+        cls._hashes[test] = (test.source, digest)
+
+        return digest
+
+    def _load(self) -> None:
+        """
+        Loads the records of the journal file. A record truncated by a crash is ignored.
+        """
+
+        with self._path.open() as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+
+                except json.JSONDecodeError:
+                    logging.warning('ignoring incomplete journal record: %s', line.strip())
+                    continue
+
+                self._records[(record['test'], record['phase'], record['source'])] = record
+
+        logging.info('loaded %i records from journal %s', len(self._records), self._path)
+
+    def lookup(self, test: Test, phase: str) -> Optional[Mapping[str, Any]]:
+        """
+        Provides the record of the given phase of the test, None if the phase of the test with
+        its current source has not been recorded.
+        """
+
+        return self._records.get((test.name, phase, self.source_hash(test)))
+
+    def record(self, test: Test, phase: str, result: Mapping[str, Any]) -> None:
+        """
+        Appends the result of the given phase of the test to the journal, unless it has been
+        recorded already. The record is written when this method returns, and synced to disk
+        with every sync_interval records and on close.
+        """
+
+        key = (test.name, phase, self.source_hash(test))
+
+        with self._lock:
+            if key in self._records:
+                return
+
+            record = dict(result, test=test.name, phase=phase, source=key[2])
+            self._records[key] = record
+
+            self._file.write(json.dumps(record) + '\n')
+            self._file.flush()
+
+            self._unsynced += 1
+            if self._unsynced >= self.sync_interval:
+                self._sync()
+
+    def _sync(self) -> None:
+        """
+        Syncs the records written so far to disk.
+        """
+
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self) -> None:
+        """
+        Syncs and closes the journal file.
+        """
+
+        with self._lock:
+            if self._file.closed:
+                return
+
+            self._file.flush()
+            self._sync()
+            self._file.close()
@@ -0,0 +1,272 @@
+"""
+This module contains the Pipeline, which schedules presence, independent and start-end tests by
+their dependencies instead of in phases.
+
+Tests of a function are generated as soon as the presence of the function is known, start-end
+tests as soon as the presence of both functions is known. Builds and runs of all tests overlap.
+The run outcomes of independent and start-end tests are evaluated once all constant presence
+tests are evaluated, because their evaluators compare against constant values.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Dict, Iterable, List, Optional, MutableSet
+
+from lemonspotter.core.database import Database
+from lemonspotter.core.function import Function
+from lemonspotter.core.sampler import Sampler
+from lemonspotter.core.test import Test, TestOutcome
+from lemonspotter.executors.mpiexecutor import MPIExecutor, BuildResult
+from lemonspotter.generators.constantpresence import ConstantPresenceGenerator
+from lemonspotter.generators.functionpresence import FunctionPresenceGenerator
+from lemonspotter.generators.independent import IndependentGenerator
+from lemonspotter.generators.startend import StartEndGenerator
+
+
+class _CoreBudget:
+    """
+    This class hands out the cores test processes are packed onto.
+    """
+
+    def __init__(self, cores: int) -> None:
+        self._available = cores
+        self._condition = asyncio.Condition()
+
+    async def acquire(self, count: int) -> None:
+        """Waits until count cores are available and takes them."""
+
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._available >= count)
+            self._available -= count
+
+    async def release(self, count: int) -> None:
+        """Returns count cores."""
+
+        async with self._condition:
+            self._available += count
+            self._condition.notify_all()
+
+
+class Pipeline:
+    """
+    This class executes all tests of a run as a graph of dependent asyncio tasks, the compiler
+    and launcher invocations of the executor are performed in thread pools.
+    """
+
+    def __init__(self,
+                 executor: MPIExecutor,
+                 sampler: Sampler,
+                 group_size: Optional[int] = 1) -> None:
+        self._executor = executor
+        self._sampler = sampler
+
+        self._independent = IndependentGenerator(group_size)
+        self._start_end = StartEndGenerator()
+
+        self._tests: Dict[str, List[Test]] = {'constants': [],
+                                              'functions': [],
+                                              'independent': [],
+                                              'start_end': []}
+
+    @property
+    def tests(self) -> Dict[str, List[Test]]:
+        """
+        This property provides the executed tests, by the phase of the phased runtime they
+        belong to.
+        """
+
+        return self._tests
+
+    def execute(self,
+                constant_generator: ConstantPresenceGenerator,
+                function_generator: FunctionPresenceGenerator,
+                constant_batch: int = 1) -> None:
+        """
+        Executes all tests, starting with the presence tests of the given generators.
+        Constants are tested in batches of constant_batch constants if it is larger than one.
+        """
+
+        try:
+            asyncio.run(self._execute(constant_generator, function_generator, constant_batch))
+
+        except FileNotFoundError as error:
+            logging.error(error)
+            logging.error('Executing the pipeline failed.')
+
+        finally:
+            self._executor.prune_cache()
+
+    async def _execute(self,
+                       constant_generator: ConstantPresenceGenerator,
+                       function_generator: FunctionPresenceGenerator,
+                       constant_batch: int) -> None:
+        loop = asyncio.get_running_loop()
+
+        self._budget = _CoreBudget(self._executor.cores)
+        self._constants_evaluated = asyncio.Event()
+
+        self._builds: Dict[int, Awaitable[BuildResult]] = {}
+        self._spawned: List[asyncio.Future] = []
+        self._known: MutableSet[Function] = set()
+
+        with ThreadPoolExecutor(max_workers=self._executor.jobs) as build_pool, \
+                ThreadPoolExecutor(max_workers=self._executor.cores) as run_pool:
+            self._build_pool = build_pool
+            self._run_pool = run_pool
+
+            self._arguments = await loop.run_in_executor(build_pool, self._executor.prepare)
+
+            constants = asyncio.ensure_future(self._constants(constant_generator,
+                                                              constant_batch))
+
+            # functions which are known without a presence test start their tests right away
+            untested = {test.name: test for test in function_generator.generate()}
+            functions = []
+            for function in sorted(Database().get_functions(), key=lambda f: f.name):
+                test = untested.get(f'function_presence_{function.name}')
+                functions.append(self._function(function, test))
+
+            await asyncio.gather(constants, *functions)
+
+            while self._spawned:
+                spawned, self._spawned = self._spawned, []
+                await asyncio.gather(*spawned)
+
+    async def _constants(self, generator: ConstantPresenceGenerator, batch_size: int) -> None:
+        """
+        Executes the constant presence tests, bisecting failed batches.
+        """
+
+        try:
+            if batch_size > 1:
+                await asyncio.gather(*(self._batch(generator, batch)
+                                       for batch in generator.generate_batches(batch_size)))
+                self._tests['constants'].extend(generator.batched_tests)
+
+            else:
+                tests = generator.generate()
+                self._tests['constants'].extend(tests)
+
+                await asyncio.gather(*(self._test(test, dependent=False) for test in tests))
+
+        finally:
+            self._constants_evaluated.set()
+
+    async def _batch(self, generator: ConstantPresenceGenerator, batch: Test) -> None:
+        await self._test(batch, dependent=False)
+
+        if batch.outcome in (TestOutcome.FAILED, TestOutcome.TIMEOUT):
+            await asyncio.gather(*(self._batch(generator, half)
+                                   for half in generator.split_batch(batch)))
+
+    async def _function(self, function: Function, test: Optional[Test]) -> None:
+        """
+        Executes the presence test of the function, if it has one, and spawns the tests which
+        depend on the presence of the function.
+        """
+
+        if test is not None:
+            self._tests['functions'].append(test)
+            await self._test(test, dependent=False)
+
+        self._known.add(function)
+
+        if not function.present:
+            return
+
+        if IndependentGenerator.independent(function):
+            self._spawn('independent',
+                        self._independent.generate_function(function, self._sampler))
+
+        # the pair is generated once the presence of its second function is known
+        if StartEndGenerator.start(function):
+            for end in sorted(self._known, key=lambda f: f.name):
+                if StartEndGenerator.end(end) and end.present:
+                    self._spawn('start_end',
+                                self._start_end.generate_pair(function, end, self._sampler))
+
+        if StartEndGenerator.end(function):
+            for start in sorted(self._known, key=lambda f: f.name):
+                if StartEndGenerator.start(start) and start.present:
+                    self._spawn('start_end',
+                                self._start_end.generate_pair(start, function, self._sampler))
+
+    def _spawn(self, phase: str, tests: Iterable[Test]) -> None:
+        ordered = sorted(tests, key=lambda test: test.name)
+        self._tests[phase].extend(ordered)
+
+        for test in ordered:
+            self._spawned.append(asyncio.ensure_future(self._dependent(phase, test)))
+
+    async def _dependent(self, phase: str, test: Test) -> None:
+        """
+        Executes a dependent test. A group fails to build as a whole, so a grouped test which
+        failed to build is replaced by a test of its own.
+        """
+
+        await self._test(test, dependent=True)
+
+        if (self._independent.grouped(test) and
+                test.build_outcome in (TestOutcome.FAILED, TestOutcome.TIMEOUT)):
+            split = self._independent.split_group(test)
+
+            tests = self._tests[phase]
+            tests[tests.index(test)] = split
+
+            await self._test(split, dependent=True)
+
+    async def _test(self, test: Test, dependent: bool) -> None:
+        """
+        Builds and runs a single test. The run outcome of dependent tests is evaluated after
+        the constant presence tests.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        if self._executor.completed(test):
+            if dependent:
+                await self._constants_evaluated.wait()
+
+            self._executor.resume(test)
+            return
+
+        if test.build_outcome:
+            logging.critical('Test %s has build outcome.', test.name)
+            return
+
+        self._executor.evaluate_build(test, await self._build(test))
+
+        if not self._executor.runnable(test):
+            return
+
+        await self._budget.acquire(test.processes)
+        try:
+            result = await loop.run_in_executor(self._run_pool,
+                                                self._executor.launch, test, [])
+
+        finally:
+            await self._budget.release(test.processes)
+
+        if result is None:
+            return
+
+        if dependent:
+            await self._constants_evaluated.wait()
+
+        self._executor.evaluate_run(test, result)
+
+    def _build(self, test: Test) -> Awaitable[BuildResult]:
+        """
+        Provides the build of the test, tests sharing a source share a single build.
+        """
+
+        key = id(test.source)
+
+        if key not in self._builds:
+            loop = asyncio.get_running_loop()
+            future: Any = loop.run_in_executor(self._build_pool, self._executor.compile_test,
+                                               test, self._arguments)
+            self._builds[key] = future
+
+        return self._builds[key]
@@ -0,0 +1,163 @@
+"""
+This module contains the Profiler class, which measures the time lemonspotter spends in each
+phase of a run, such as parsing the database, generating, expressing and writing sources,
+building, running and reporting.
+
+Phases are timed by their wall clock time and may overlap, builds and runs are executed
+concurrently and their times are summed over all of their calls. The CPU time of lemonspotter
+itself is set apart from the CPU time of the compilers and launchers it waited for.
+"""
+
+import json
+import time
+import resource
+import functools
+from contextlib import contextmanager
+from pathlib import Path
+from threading import Lock, local
+from typing import Any, Callable, Dict, Iterator, Mapping, MutableMapping, Set, TypeVar
+
+from lemonspotter.core.database import _Singleton
+
+
+T = TypeVar('T', bound=Callable[..., Any])
+
+
+class Profiler(metaclass=_Singleton):
+    """
+    This class accumulates the number of calls and the wall clock time of every phase. It is
+    disabled until it is enabled, timing a phase of a disabled profiler does nothing.
+    """
+
+    def __init__(self) -> None:
+        self._enabled = False
+        self._started = time.perf_counter()
+
+        self._lock = Lock()
+        self._phases: MutableMapping[str, Dict[str, float]] = {}
+
+        # phases in progress on each thread, a phase nested in itself is timed once
+        self._active = local()
+
+    @property
+    def enabled(self) -> bool:
+        """This property provides whether phases are timed."""
+
+        return self._enabled
+
+    def enable(self) -> None:
+        """
+        Enables the profiler, the duration of the run is measured from now on.
+        """
+
+        with self._lock:
+            self._enabled = True
+            self._started = time.perf_counter()
+            self._phases = {}
+
+    def disable(self) -> None:
+        """
+        Disables the profiler, the timings of the phases so far are kept.
+        """
+
+        self._enabled = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed code as a call of the phase.
+        """
+
+        if not self._enabled:
+            yield
+            return
+
+        active: Set[str] = getattr(self._active, 'phases', set())
+        self._active.phases = active
+
+        if name in active:
+            yield
+            return
+
+        active.add(name)
+        start = time.perf_counter()
+
+        try:
+            yield
+
+        finally:
+            elapsed = time.perf_counter() - start
+            active.discard(name)
+
+            with self._lock:
+                phase = self._phases.setdefault(name, {'calls': 0, 'seconds': 0.0,
+                                                       'longest': 0.0})
+                phase['calls'] += 1
+                phase['seconds'] += elapsed
+                phase['longest'] = max(phase['longest'], elapsed)
+
+    def summary(self) -> Mapping[str, Any]:
+        """
+        Provides the duration of the run, the CPU time of lemonspotter and of the processes it
+        waited for, and the calls and seconds of every phase.
+        """
+
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+        with self._lock:
+            phases = {name: dict(phase) for name, phase in sorted(self._phases.items())}
+
+        return {'wall': time.perf_counter() - self._started,
+                'lemonspotter_cpu': own.ru_utime + own.ru_stime,
+                'children_cpu': children.ru_utime + children.ru_stime,
+                'phases': phases}
+
+    def table(self) -> str:
+        """
+        Provides the phases as a table, with their share of the duration of the run.
+        """
+
+        summary = self.summary()
+        wall = summary['wall']
+
+        lines = [f'{"phase":<40} {"calls":>8} {"seconds":>10} {"longest":>10} {"% total":>7}']
+
+        for name, phase in summary['phases'].items():
+            share = 100 * phase['seconds'] / wall if wall > 0 else 0.0
+            lines.append(f'{name:<40} {phase["calls"]:>8} {phase["seconds"]:>10.3f} '
+                         f'{phase["longest"]:>10.3f} {share:>7.1f}')
+
+        lines.append(f'{"total":<40} {"":>8} {wall:>10.3f}')
+        lines.append(f'{"lemonspotter cpu":<40} {"":>8} {summary["lemonspotter_cpu"]:>10.3f}')
+        lines.append(f'{"compiler and launcher cpu":<40} {"":>8} '
+                     f'{summary["children_cpu"]:>10.3f}')
+
+        return '\n'.join(lines)
+
+    def write(self, path: Path) -> None:
+        """
+        Writes the summary to the path as JSON.
+        """
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with path.open('w') as output:
+            json.dump(self.summary(), output, indent=2)
+
+
+def profiled(phase: str) -> Callable[[T], T]:
+    """
+    Decorates a method, its calls are timed as the phase followed by the name of the class of
+    the instance.
+    """
+
+    def decorator(method: T) -> T:
+        @functools.wraps(method)
+        def timed(self, *args, **kwargs):
+            with Profiler().phase(f'{phase} {type(self).__name__}'):
+                return method(self, *args, **kwargs)
+
+        return timed  # type: ignore
+
+    return decorator
@@ -1,12 +1,14 @@
 import datetime
 import json
+from itertools import chain
 from pathlib import Path
-from typing import List, MutableMapping, Mapping, Any
+from typing import List, MutableMapping, Mapping, Any, Sequence
 
 from lemonspotter.core.test import Test
 from lemonspotter.core.test import TestType
 from lemonspotter.core.test import TestOutcome
 from lemonspotter.core.database import Database
+from lemonspotter.core.profiler import profiled
 
 
 class TestReport():
@@ -14,12 +16,23 @@ class TestReport():
     Class for generating logging statements for tests
     """
 
+    # function properties holding the outcome of performance tests
+    performance_properties: Sequence[str] = ('latency', 'latency_curve', 'bandwidth_curve',
+                                             'scaling')
+    # function properties comparing the performance with a baseline
+    comparison_properties: Sequence[str] = ('baseline',)
+    # function properties holding raw measurements, which are not reported
+    raw_properties: Sequence[str] = ('latency_samples',)
+    # number of tests listed by the wall clock time of their build and run
+    slowest_tests: int = 10
+
     def __init__(self):
         self._now = datetime.datetime.now()
         self._report_id: str = "lsout_" + self._now.strftime("%Y-%m-%d_%H:%M")
 
         self._report: MutableMapping = {}
         self._tests: List[Test] = []
+        self._lemons: MutableMapping[str, List[Mapping[str, Any]]] = {}
 
         # Ensures that report directory exists
         report_dir = Path.resolve(Path(__file__) / '../../../reports')
@@ -55,6 +68,20 @@ class TestReport():
     def tests(self, tests) -> None:
         self._tests = tests
 
+    @property
+    def lemons(self) -> Mapping[str, List[Mapping[str, Any]]]:
+        """This property provides the reasons of the functions flagged as lemons."""
+
+        return self._lemons
+
+    def flag_lemon(self, name: str, reason: Mapping[str, Any]) -> None:
+        """
+        Flags the function as a lemon, a function which misbehaves although it is present. Only
+        significant misbehaviour should be flagged, every reason is reported.
+        """
+
+        self._lemons.setdefault(name, []).append(reason)
+
     def log_test_result(self, test, msg=None) -> None:
         """
         Prints results for single test
@@ -68,6 +95,8 @@ class TestReport():
             log_msg += '[BUILD ONLY|'
             if test.build_outcome == TestOutcome.SUCCESS:
                 log_msg += 'PASS|'
+            elif test.build_outcome == TestOutcome.TIMEOUT:
+                log_msg += 'TIMEOUT|'
             else:
                 log_msg += 'FAIL|'
 
@@ -75,6 +104,8 @@ class TestReport():
             log_msg += '[RUN|'
             if test.run_outcome == TestOutcome.SUCCESS:
                 log_msg += 'PASS|'
+            elif TestOutcome.TIMEOUT in (test.build_outcome, test.run_outcome):
+                log_msg += 'TIMEOUT|'
             else:
                 log_msg += 'FAIL|'
 
@@ -89,6 +120,7 @@ class TestReport():
 
         self._generate_report()
 
+    @profiled('report')
     def _generate_report(self) -> None:
         """"""
 
@@ -101,21 +133,79 @@ class TestReport():
 
         functions = {}
         for function in Database().get_functions():
-            functions[function.name] = function.properties
+            functions[function.name] = {key: value for key, value in function.properties.items()
+                                        if key not in self.raw_properties}
 
         presence_report['constants'] = constants
         presence_report['functions'] = functions
 
         self._report['presence_report'] = presence_report
 
+        # Generates Performance Report #
+        performance_report = {}
+        for function in Database().get_functions():
+            measured = {key: function.properties[key]
+                        for key in chain(self.performance_properties, self.comparison_properties)
+                        if key in function.properties}
+
+            if measured:
+                performance_report[function.name] = measured
+
+        if performance_report:
+            self._report['performance_report'] = performance_report
+
+        if self._lemons:
+            self._report['lemons'] = {name: list(reasons)
+                                      for name, reasons in self._lemons.items()}
+
         test_report = {}
         for test in self._tests:
             test_report[test.name] = {'type': str(test.type),
                                       'build_outcome': str(test.build_outcome),
-                                      'run_outcome': str(test.run_outcome)}
+                                      'run_outcome': str(test.run_outcome),
+                                      'reused': test.reused}
+
+            for phase, usage in (('build', test.build_usage), ('run', test.run_usage)):
+                if usage is not None:
+                    test_report[test.name][f'{phase}_usage'] = usage._asdict()
 
         self._report['tests'] = test_report
 
+        # Generates Usage Report #
+        usage_report = self._usage_report()
+        if usage_report:
+            self._report['usage_report'] = usage_report
+
+    def _usage_report(self) -> Mapping[str, Any]:
+        """
+        Provides the total resources the builds and runs of the tests used, and the tests which
+        used the most wall clock time.
+        """
+
+        usage_report: MutableMapping[str, Any] = {}
+
+        for phase in ('build', 'run'):
+            usages = [getattr(test, f'{phase}_usage') for test in self._tests
+                      if getattr(test, f'{phase}_usage') is not None]
+
+            if usages:
+                usage_report[phase] = {'count': len(usages),
+                                       'wall': sum(usage.wall for usage in usages),
+                                       'user': sum(usage.user for usage in usages),
+                                       'system': sum(usage.system for usage in usages),
+                                       'max_rss': max(usage.max_rss for usage in usages)}
+
+        def wall(test: Test) -> float:
+            return sum(usage.wall for usage in (test.build_usage, test.run_usage)
+                       if usage is not None)
+
+        measured = [test for test in self._tests if wall(test) > 0]
+        if measured:
+            slowest = sorted(measured, key=wall, reverse=True)[:self.slowest_tests]
+            usage_report['slowest'] = {test.name: wall(test) for test in slowest}
+
+        return usage_report
+
     def print_report(self, indent=2):
         """
         Pretty prints report
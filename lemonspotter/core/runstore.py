@@ -0,0 +1,51 @@
+"""
+This module contains the RunStore class, which keeps the outcomes of previous runs by the
+fingerprint of the MPI library and of the database, so that a run against an unchanged MPI
+library and database reuses them.
+"""
+
+import logging
+from pathlib import Path
+
+from lemonspotter.core.journal import Journal
+
+
+class RunStore:
+    """
+    This class stores the outcomes of every run as a journal named after its fingerprint. A run
+    with the fingerprint of a previous run appends to the journal of that run.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self._directory = directory
+
+    @property
+    def directory(self) -> Path:
+        """This property provides the directory the runs are stored in."""
+
+        return self._directory
+
+    @staticmethod
+    def fingerprint(toolchain: str, database: str) -> str:
+        """
+        Provides the fingerprint of a run from the fingerprints of the toolchain and of the
+        database.
+        """
+
+        return f'{toolchain}-{database}'
+
+    def open(self, fingerprint: str) -> Journal:
+        """
+        Opens the journal of the runs with the given fingerprint, which holds the outcomes of
+        the previous runs, if there are any.
+        """
+
+        path = self._directory / f'{fingerprint}.jsonl'
+
+        if path.exists():
+            logging.info('reusing outcomes of previous runs from %s', path)
+
+        else:
+            logging.info('no previous run with fingerprint %s', fingerprint)
+
+        return Journal(path, resume=True)
@@ -2,16 +2,28 @@
 Lemonspotter Runtime
 """
 
+import logging
 from pathlib import Path
+from typing import Any, Iterable, Mapping, Optional
+from itertools import chain
 
 from lemonspotter.parsers.mpiparser import MPIParser
+from lemonspotter.parsers.headerparser import HeaderParser
+from lemonspotter.executors.executor import Executor
 from lemonspotter.executors.mpiexecutor import MPIExecutor
 from lemonspotter.generators.startend import StartEndGenerator
 from lemonspotter.generators.independent import IndependentGenerator
+from lemonspotter.generators.performance import PerformanceGenerator
+from lemonspotter.generators.pointtopoint import PointToPointGenerator
+from lemonspotter.generators.collective import CollectiveGenerator
 from lemonspotter.generators.constantpresence import ConstantPresenceGenerator
 from lemonspotter.generators.functionpresence import FunctionPresenceGenerator
 from lemonspotter.samplers.valid import ValidSampler
+from lemonspotter.core.analysis import Analysis
+from lemonspotter.core.database import Database
 from lemonspotter.core.report import TestReport
+from lemonspotter.core.pipeline import Pipeline
+from lemonspotter.core.test import Test, TestOutcome
 
 
 class Runtime:
@@ -19,21 +31,27 @@ class Runtime:
     This class is the main run time of Lemonspotter.
     """
 
-    def __init__(self, database_path: Path, mpicc: str, mpiexec: str):
+    def __init__(self, database_path: Path, executor: Executor) -> None:
         """
-        Construct the LemonSpotter runtime
+        Construct the LemonSpotter runtime, which executes its tests with the given executor.
         """
 
         self.parse_database(database_path)
 
         self._reporter = TestReport()
 
-        self._executor = MPIExecutor(mpicc=mpicc, mpiexec=mpiexec)
+        self._executor = executor
 
     @property
     def reporter(self):
         return self._reporter
 
+    @property
+    def executor(self) -> Executor:
+        """This property provides the executor tests are executed with."""
+
+        return self._executor
+
     def parse_database(self, database_path: Path):
         """
         Parse the database pointed to by the command line argument.
@@ -45,19 +63,35 @@ class Runtime:
         parser = MPIParser()
         parser(database_path)
 
-    def presence_testing(self):
+    def presence_testing(self,
+                         constant_batch: int = 1,
+                         symbol_presence: bool = False,
+                         header_introspection: bool = False):
         """
-        Generate and run the presence testing required for the database.
+        Generate and run the presence testing required for the database. Constants are tested
+        in batches of constant_batch constants if it is larger than one. Functions exported by
+        the MPI libraries are found from their symbol tables if symbol_presence is set, only the
+        remaining functions are tested by compilation. Constants which can be resolved from a
+        single preprocessor pass over the MPI header are not tested if header_introspection is
+        set.
         """
 
         # generate all constant presence tests
         generator = ConstantPresenceGenerator()
-        constant_tests = generator.generate()
-
         func_gen = FunctionPresenceGenerator()
+
+        self._probe(generator, func_gen, symbol_presence, header_introspection)
+
+        if constant_batch > 1:
+            self._batched_testing(generator, constant_batch)
+            constant_tests: Iterable[Test] = generator.batched_tests
+
+        else:
+            constant_tests = generator.generate()
+            self._executor.execute(constant_tests)
+
         function_tests = func_gen.generate()
 
-        self._executor.execute(constant_tests)
         self._executor.execute(function_tests)
 
         for test in constant_tests:
@@ -66,13 +100,90 @@ class Runtime:
         for test in function_tests:
             self.reporter.log_test_result(test)
 
-    def independent_testing(self):
+    def _probe(self,
+               generator: ConstantPresenceGenerator,
+               func_gen: FunctionPresenceGenerator,
+               symbol_presence: bool,
+               header_introspection: bool) -> None:
+        """
+        Determines the presence of constants and functions without tests, as far as requested.
+        """
+
+        if header_introspection:
+            header = HeaderParser()
+            header(self._executor.toolchain.preprocess('#include <mpi.h>\n'))
+
+            generator.introspect(header)
+            func_gen.probe_declarations(header.declarations)
+
+        if symbol_presence:
+            func_gen.probe_symbols(self._executor.toolchain.exported_functions())
+
+    def pipelined_testing(self,
+                          constant_batch: int = 1,
+                          symbol_presence: bool = False,
+                          header_introspection: bool = False,
+                          group_size: Optional[int] = 1):
+        """
+        Generate and run the presence, independent and start-end tests as a pipeline, tests are
+        started as soon as the presence of the functions they depend on is known. The arguments
+        are the same as for presence_testing and independent_testing. The pipeline requires
+        the MPIExecutor.
+        """
+
+        if not isinstance(self._executor, MPIExecutor):
+            raise ValueError('Pipelined testing requires the MPIExecutor.')
+
+        generator = ConstantPresenceGenerator()
+        func_gen = FunctionPresenceGenerator()
+
+        self._probe(generator, func_gen, symbol_presence, header_introspection)
+
+        pipeline = Pipeline(self._executor, ValidSampler(), group_size)
+        pipeline.execute(generator, func_gen, constant_batch)
+
+        for tests in pipeline.tests.values():
+            for test in tests:
+                self.reporter.log_test_result(test)
+
+    def _batched_testing(self, generator: ConstantPresenceGenerator, batch_size: int) -> None:
+        """
+        Execute constant presence batches, bisecting failed batches until all constants have
+        been attributed an outcome.
+        """
+
+        batches = generator.generate_batches(batch_size)
+
+        while batches:
+            self._executor.execute(batches)
+
+            failed = filter(lambda batch: batch.outcome in (TestOutcome.FAILED,
+                                                            TestOutcome.TIMEOUT), batches)
+            batches = set(chain.from_iterable(generator.split_batch(batch) for batch in failed))
+
+    def independent_testing(self, group_size: Optional[int] = 1):
+        """
+        Generate and run the tests of functions which are independent of others. Up to
+        group_size tests are built into a single executable, if group_size is None all tests of
+        a function are.
+        """
+
         sampler = ValidSampler()
 
-        generator = IndependentGenerator()
+        generator = IndependentGenerator(group_size)
         independent_tests = generator.generate(sampler)
 
         self._executor.execute(independent_tests)
+
+        # a group fails to build as a whole, its members are rebuilt on their own
+        failed = {test for test in independent_tests if generator.grouped(test) and
+                  test.build_outcome in (TestOutcome.FAILED, TestOutcome.TIMEOUT)}
+        if failed:
+            split = {generator.split_group(test) for test in failed}
+            self._executor.execute(split)
+
+            independent_tests = (set(independent_tests) - failed) | split
+
         for test in independent_tests:
             self.reporter.log_test_result(test)
 
@@ -86,3 +197,176 @@ class Runtime:
 
         for test in start_end_tests:
             self.reporter.log_test_result(test)
+
+    def performance_testing(self,
+                            warmup: int = 10,
+                            repetitions: int = 100,
+                            confidence: float = 0.95,
+                            latency_limit: Optional[float] = None,
+                            rounds: int = 2):
+        """
+        Generate and run the tests timing the calls of present independent functions, each
+        function is called warmup times before repetitions calls are timed. The latencies are
+        attached to the functions.
+
+        Functions whose confidence interval of the latency is too wide are timed again with
+        more repetitions, for at most the given number of further rounds. Functions whose
+        latency is significantly above the latency limit in seconds are flagged as lemons.
+        """
+
+        sampler = ValidSampler()
+        analysis = Analysis(confidence)
+
+        generator = PerformanceGenerator(warmup, repetitions, analysis)
+        performance_tests = generator.generate(sampler)
+
+        for remaining in range(rounds, -1, -1):
+            self._executor.execute(performance_tests)
+
+            for test in performance_tests:
+                self.reporter.log_test_result(test)
+
+            if remaining == 0:
+                break
+
+            # noisy functions are timed again with the repetitions their latency needs
+            retimed = []
+            for test in performance_tests:
+                function = Database().get_function(test.name[len(generator.prefix):])
+                latency = function.properties.get('latency')
+
+                if test.run_outcome != TestOutcome.SUCCESS or latency is None:
+                    continue
+
+                needed = min(latency['repetitions'] + latency['additional_repetitions'],
+                             PerformanceGenerator.max_repetitions)
+
+                if needed > latency['repetitions']:
+                    logging.info('timing %s again with %i repetitions', function.name, needed)
+
+                    retest = PerformanceGenerator(warmup, needed,
+                                                  analysis).generate_function(function, sampler)
+                    if retest is not None:
+                        retimed.append(retest)
+
+            performance_tests = retimed
+
+        if latency_limit is None:
+            return
+
+        for function in Database().get_functions():
+            durations = function.properties.get('latency_samples')
+
+            if durations is not None and analysis.exceeds(durations, latency_limit):
+                latency = function.properties['latency']
+                self.reporter.flag_lemon(function.name,
+                                         {'reason': 'latency',
+                                          'limit': latency_limit,
+                                          'latency': latency['latency'],
+                                          'interval': latency['interval'],
+                                          'confidence': latency['confidence']})
+
+    def point_to_point_testing(self,
+                               warmup: int = 10,
+                               repetitions: int = 100,
+                               min_size: int = 1,
+                               max_size: int = 64 * 1024**2):
+        """
+        Generate and run the latency and bandwidth sweeps of the present send and receive
+        functions with two ranks, over the powers of two from min_size to max_size bytes. The
+        curves are attached to the send functions.
+        """
+
+        sampler = ValidSampler()
+
+        generator = PointToPointGenerator(warmup, repetitions, min_size, max_size)
+        sweep_tests = generator.generate(sampler)
+
+        self._executor.execute(sweep_tests)
+
+        for test in sweep_tests:
+            self.reporter.log_test_result(test)
+
+    def collective_testing(self,
+                           warmup: int = 10,
+                           repetitions: int = 100,
+                           min_size: int = 1,
+                           max_size: int = 1024**2):
+        """
+        Generate and run the scaling tests of the present collective operations at the powers
+        of two rank counts up to the cores of the executor, over the powers of two from
+        min_size to max_size bytes. The scaling matrices are attached to the functions.
+        """
+
+        sampler = ValidSampler()
+
+        generator = CollectiveGenerator(self._executor.cores,
+                                        warmup,
+                                        repetitions,
+                                        min_size,
+                                        max_size)
+        scaling_tests = generator.generate(sampler)
+
+        self._executor.execute(scaling_tests)
+
+        for test in scaling_tests:
+            self.reporter.log_test_result(test)
+
+    def performance_results(self) -> Mapping[str, Mapping[str, Any]]:
+        """
+        Provides the performance results of every measured function, including the raw
+        measurements, as stored in a baseline.
+        """
+
+        keys = tuple(TestReport.performance_properties) + tuple(TestReport.raw_properties)
+
+        results = {}
+        for function in Database().get_functions():
+            measured = {key: function.properties[key] for key in keys
+                        if key in function.properties}
+
+            if measured:
+                results[function.name] = measured
+
+        return results
+
+    def compare_performance(self,
+                            baseline: Mapping[str, Any],
+                            threshold: float = 0.1,
+                            confidence: float = 0.95):
+        """
+        Compare the latencies of the functions with the baseline, the comparison is attached to
+        the functions. Functions whose latency increased by more than the threshold, relative to
+        the baseline, at the given confidence are flagged as lemons.
+        """
+
+        analysis = Analysis(confidence)
+        fingerprint = baseline['fingerprint']
+
+        for function in Database().get_functions():
+            samples = function.properties.get('latency_samples')
+            reference = baseline['functions'].get(function.name, {}).get('latency_samples')
+
+            if samples is None or reference is None:
+                continue
+
+            comparison = analysis.compare(reference, samples)
+            if comparison is None:
+                logging.info('latency of %s cannot be compared with baseline %s',
+                             function.name, fingerprint)
+                continue
+
+            function.properties['baseline'] = {'fingerprint': fingerprint, **comparison}
+
+            # the whole interval of the difference lies beyond the threshold
+            if comparison['interval'][0] > threshold:
+                logging.warning('latency of %s regressed by %.1f%% against baseline %s',
+                                function.name, 100 * comparison['difference'], fingerprint)
+
+                self.reporter.flag_lemon(function.name,
+                                         {'reason': 'regression',
+                                          'baseline': fingerprint,
+                                          'threshold': threshold,
+                                          'difference': comparison['difference'],
+                                          'interval': comparison['interval'],
+                                          'confidence': confidence})
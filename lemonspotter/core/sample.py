@@ -185,7 +185,20 @@ class FunctionSample:
             raise NotImplementedError('Test if the variable already exists.')
 
         statement = (f'{self.function.return_type.language_type} {self.return_variable.name}'
-                     f' = {self.function.name}(')
+                     f' = {self.generate_call()};')
+
+        return FunctionStatement(self._function.name,
+                                 statement,
+                                 {self.return_variable.name: self.return_variable},
+                                 comment)
+
+    def generate_call(self) -> str:
+        """
+        Generates the call expression of the function with the arguments of the sample. The
+        arguments are those declared by generate_source, once it has been called.
+        """
+
+        statement = f'{self.function.name}('
 
         # add arguments
         logging.debug('arguments %s', str(self.arguments))
@@ -211,9 +224,6 @@ class FunctionSample:
                 if (idx + 1) != len(self._arguments):
                     statement += ', '
 
-        statement += ');'
+        statement += ')'
 
-        return FunctionStatement(self._function.name,
-                                 statement,
-                                 {self.return_variable.name: self.return_variable},
-                                 comment)
+        return statement
@@ -2,11 +2,12 @@
 This module contains the Source class.
 """
 
-from typing import Optional
+from typing import Dict, Optional, Set
 from pathlib import Path
 
 from lemonspotter.core.statement import Statement, SourceStatement
 from lemonspotter.core.variable import Variable
+from lemonspotter.core.profiler import Profiler
 
 
 class Source:
@@ -22,10 +23,40 @@ class Source:
 
         return self._block_statement.has_variable(name)
 
-    def get_variable(self, name: str) -> Optional[Variable]:
-        """This method looks up a variable by name."""
+    def get_variable(self, name: str, scope: Optional[str] = None) -> Optional[Variable]:
+        """
+        This method looks up a variable by name. If a scope is given, only the function
+        definition of that name is searched.
+        """
+
+        if scope is None:
+            return self._block_statement.get_variable(name)
+
+        definition = self._block_statement.get_definition(scope)
+        if definition is None:
+            return None
 
-        return self._block_statement.get_variable(name)
+        return definition.get_variable(name)
+
+    def variables(self, scope: Optional[str] = None) -> Dict[str, Variable]:
+        """
+        This method provides all variables by name in a single walk of the statements. If a
+        scope is given, only the function definition of that name is searched.
+        """
+
+        if scope is None:
+            return self._block_statement.variables()
+
+        definition = self._block_statement.get_definition(scope)
+        if definition is None:
+            return {}
+
+        return definition.variables()
+
+    def called_functions(self) -> Set[str]:
+        """This method provides the names of all functions called in the source."""
+
+        return self._block_statement.called_functions()
 
     def add_at_start(self, statement: Optional[Statement]) -> None:
         """
@@ -47,12 +78,15 @@ class Source:
         Combines the front and back lines into a single string.
         """
 
-        return self._block_statement.express(0)
+        with Profiler().phase('express source'):
+            return self._block_statement.express(0)
 
     def write(self, path: Path):
         """
         Output source code into the given path.
         """
 
-        with path.open(mode='w') as source_file:
-            source_file.write(repr(self))
+        source = repr(self)
+
+        with Profiler().phase('write source'), path.open(mode='w') as source_file:
+            source_file.write(source)
@@ -2,7 +2,7 @@
 This module defines the base class Statement and all the derived classes.
 """
 
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Set
 import logging
 from itertools import tee, chain
 
@@ -41,6 +41,16 @@ class Statement:
 
         return name in self._variables
 
+    def variables(self) -> Dict[str, Variable]:
+        """This method provides all variables of the Statement by name."""
+
+        return dict(self._variables)
+
+    def called_functions(self) -> Set[str]:
+        """This method provides the names of all functions called by the Statement."""
+
+        return set()
+
     def express(self, indent_level: int) -> str:
         """This method converts the Statement to a string."""
 
@@ -132,6 +142,37 @@ class BlockStatement(Statement):
 
         return False
 
+    def variables(self) -> Dict[str, Variable]:
+        """
+        This method provides all variables of the block and its statements by name. Of
+        variables sharing a name, the one get_variable finds is provided.
+        """
+
+        variables = dict(self._variables)
+        for statement in (self._front_statements + self._back_statements):
+            for name, variable in statement.variables().items():
+                variables.setdefault(name, variable)
+
+        return variables
+
+    def called_functions(self) -> Set[str]:
+        """"""
+
+        functions: Set[str] = set()
+        for statement in (self._front_statements + self._back_statements):
+            functions.update(statement.called_functions())
+
+        return functions
+
+    def get_definition(self, name: str) -> Optional['FunctionDefinitionStatement']:
+        """This method looks up a function definition in the block by name."""
+
+        for statement in (self._front_statements + self._back_statements):
+            if isinstance(statement, FunctionDefinitionStatement) and statement.name == name:
+                return statement
+
+        return None
+
     def add_at_start(self, statement: Optional[Statement]) -> None:
         """This method adds the statement at the start of the block."""
 
@@ -172,7 +213,8 @@ class BlockStatement(Statement):
                 for previous, statement in prepair(statements):
                     c = ''
                     if previous is not None:
-                        if not isinstance(previous, type(statement)):
+                        if (not isinstance(previous, type(statement)) or
+                                isinstance(previous, BlockStatement)):
                             c += '\n'
 
                         elif (isinstance(previous, FunctionStatement) and
@@ -191,8 +233,9 @@ class BlockStatement(Statement):
                 code += concat_statements(statements[:-1])
                 code += '\n'
 
-                # new line between different statement types
-                if not isinstance(statements[-1], type(statements[-2])):
+                # new line between different statement types and after blocks
+                if (not isinstance(statements[-1], type(statements[-2])) or
+                        isinstance(statements[-2], BlockStatement)):
                     code += '\n'
 
             # express last statement
@@ -258,6 +301,15 @@ class DeclarationStatement(Statement):
         return DeclarationStatement(variable, comment=comment)
 
 
+class ArrayDeclarationStatement(Statement):
+    """This class represents the declaration of an array of a fixed length."""
+
+    def __init__(self, variable: Variable, length: int, comment: str = None) -> None:
+        super().__init__({variable.name: variable}, comment=comment)
+
+        self._statement = f'{variable.type.language_type} {variable.name}[{length}];'
+
+
 class AssignmentStatement(Statement):
     """This class represents any variable assignment."""
 
@@ -309,6 +361,11 @@ class FunctionStatement(Statement):
     def function(self) -> Optional[str]:
         return self._function
 
+    def called_functions(self) -> Set[str]:
+        """"""
+
+        return {self._function} if self._function is not None else set()
+
     @classmethod
     def generate_print(cls,
                        variable: Variable,
@@ -321,12 +378,42 @@ class FunctionStatement(Statement):
             logging.info('%s is not printable, no Statement will be emitted.', variable.name)
             return None
 
-        statement = (f'printf("{variable.name} %{variable.type.print_specifier}'
-                     f'\\n", {variable.name});')
+        # capture frame of rank, name, type and value
+        statement = (f'printf("\\x1e%d|{variable.name}|{variable.type.abstract_type}|'
+                     f'%{variable.type.print_specifier}\\x1f\\n", '
+                     f'{RankDefinitionStatement.function}(), {variable.name});')
 
         return FunctionStatement('printf', statement, comment=comment)
 
 
+class RankDefinitionStatement(Statement):
+    """
+    This class represents the definition of the function which provides the rank of the
+    process for captures. The rank is read from the environment set by the launcher, so that
+    it is available before MPI is initialized.
+    """
+
+    function: str = 'lemonspotter_rank'
+    environment: Sequence[str] = ('OMPI_COMM_WORLD_RANK', 'PMI_RANK', 'PMIX_RANK')
+
+    def __init__(self, comment: str = None) -> None:
+        super().__init__(comment=comment)
+
+        first, *others = self.environment
+
+        lookups = ''.join(f'\tif(rank == NULL)\n'
+                          f'\t{{\n'
+                          f'\t\trank = getenv("{name}");\n'
+                          f'\t}}\n\n' for name in others)
+
+        self._statement = (f'static inline int {self.function}(void)\n'
+                           f'{{\n'
+                           f'\tconst char *rank = getenv("{first}");\n\n'
+                           f'{lookups}'
+                           f'\treturn rank != NULL ? atoi(rank) : 0;\n'
+                           f'}}')
+
+
 class ExitStatement(Statement):
     """This class represents any exit call."""
 
@@ -354,12 +441,43 @@ class ConditionStatement(BlockStatement):
         return code
 
 
-class MainDefinitionStatement(BlockStatement):
-    """This class represents the main function definition."""
+class LoopStatement(BlockStatement):
+    """This class represents for loops counting from zero to a number of iterations."""
 
-    def __init__(self, comment: str = None) -> None:
+    def __init__(self, counter: str, iterations: str, comment: str = None) -> None:
         super().__init__(comment=comment)
 
+        self._counter = counter
+        self._iterations = iterations
+
+    @property
+    def counter(self) -> str:
+        """This property provides the name of the loop counter."""
+
+        return self._counter
+
+    def express(self, indent_level: int) -> str:
+        """"""
+
+        indentation = self.indent * indent_level
+
+        header = (f'for(int {self._counter} = 0; {self._counter} < {self._iterations}; '
+                  f'{self._counter}++)')
+
+        return indentation + f'{header}\n{super().express(indent_level+1)}'
+
+
+class FunctionDefinitionStatement(BlockStatement):
+    """
+    This class represents a function definition, which takes the same parameters as the main
+    function.
+    """
+
+    def __init__(self, name: str, comment: str = None) -> None:
+        super().__init__(comment=comment)
+
+        self._name = name
+
         argc = Variable(Database().get_type('INT'),
                         'argument_count')
         argv = Variable(Database().get_type('CHAR_2PTR'),
@@ -368,7 +486,13 @@ class MainDefinitionStatement(BlockStatement):
         self._variables[argc.name] = argc
         self._variables[argv.name] = argv
 
-        self._statement: str = f'int main(int {argc.name}, char **{argv.name})'
+        self._statement: str = f'int {name}(int {argc.name}, char **{argv.name})'
+
+    @property
+    def name(self) -> str:
+        """This property provides the name of the defined function."""
+
+        return self._name
 
     def express(self, indent_level: int) -> str:
         """"""
@@ -376,3 +500,10 @@ class MainDefinitionStatement(BlockStatement):
         indentation = self.indent * indent_level
 
         return indentation + f'{self._statement}\n{super().express(indent_level+1)}'
+
+
+class MainDefinitionStatement(FunctionDefinitionStatement):
+    """This class represents the main function definition."""
+
+    def __init__(self, comment: str = None) -> None:
+        super().__init__('main', comment=comment)
@@ -2,7 +2,7 @@
 This modules defines the Test class.
 """
 
-from typing import Callable, Optional
+from typing import Callable, NamedTuple, Optional
 from enum import Enum
 from pathlib import Path
 
@@ -21,6 +21,21 @@ class TestOutcome(Enum):
 
     FAILED = 0
     SUCCESS = 1
+    TIMEOUT = 2
+
+
+class ResourceUsage(NamedTuple):
+    """
+    This tuple stores the resources a build or run used, the wall clock, user and system times
+    in seconds and the peak resident set size in bytes of the largest process. On Linux the peak
+    of a process includes the size of lemonspotter when it was started, which is kept across
+    exec.
+    """
+
+    wall: float
+    user: float
+    system: float
+    max_rss: int
 
 
 class Test:
@@ -29,9 +44,24 @@ class Test:
     source code level information.
     """
 
-    def __init__(self, name: str, test_type: TestType, source: Optional[Source] = None) -> None:
+    def __init__(self,
+                 name: str,
+                 test_type: TestType,
+                 source: Optional[Source] = None,
+                 processes: int = 1,
+                 entry: Optional[str] = None) -> None:
+        """
+        Constructs a Test. If an entry is given, the test is the function of that name in a
+        source shared with other tests, its executable is invoked with the entry as argument.
+        """
+
+        if processes < 1:
+            raise ValueError(f'Test {name} needs at least one process, not {processes}.')
+
         self._name: str = name
         self._type: TestType = test_type
+        self._processes: int = processes
+        self._entry: Optional[str] = entry
 
         self._source: Optional[Source] = source
         self._executable: Optional[Path] = None
@@ -42,9 +72,17 @@ class Test:
         self._run_success_func: Optional[Callable[[], None]] = None
         self._run_fail_func: Optional[Callable[[], None]] = None
 
+        self._build_timeout_func: Optional[Callable[[], None]] = None
+        self._run_timeout_func: Optional[Callable[[], None]] = None
+
         self._build_outcome: Optional[TestOutcome] = None
         self._run_outcome: Optional[TestOutcome] = None
 
+        self._reused: bool = False
+
+        self._build_usage: Optional[ResourceUsage] = None
+        self._run_usage: Optional[ResourceUsage] = None
+
     @property
     def build_success_function(self) -> Callable[[], None]:
         """This property provides access to the build success callback."""
@@ -117,6 +155,42 @@ class Test:
 
         self._run_fail_func = func
 
+    @property
+    def build_timeout_function(self) -> Callable[[], None]:
+        """This property provides access to the build timeout callback."""
+
+        if self._build_timeout_func is None:
+            def set_build_outcome_timeout():
+                self._build_outcome = TestOutcome.TIMEOUT
+
+            return set_build_outcome_timeout
+
+        return self._build_timeout_func
+
+    @build_timeout_function.setter
+    def build_timeout_function(self, func: Callable[[], None]) -> None:
+        """This provides setting the build timeout callback."""
+
+        self._build_timeout_func = func
+
+    @property
+    def run_timeout_function(self) -> Callable[[], None]:
+        """This property provides access to the run timeout callback."""
+
+        if self._run_timeout_func is None:
+            def set_run_outcome_timeout():
+                self._run_outcome = TestOutcome.TIMEOUT
+
+            return set_run_outcome_timeout
+
+        return self._run_timeout_func
+
+    @run_timeout_function.setter
+    def run_timeout_function(self, func: Callable[[], None]) -> None:
+        """This provides setting the run timeout callback."""
+
+        self._run_timeout_func = func
+
     @property
     def name(self) -> str:
         """This property provides the name of the Test."""
@@ -129,6 +203,21 @@ class Test:
 
         return self._type
 
+    @property
+    def processes(self) -> int:
+        """This property provides the number of MPI processes the Test is run with."""
+
+        return self._processes
+
+    @property
+    def entry(self) -> Optional[str]:
+        """
+        This property provides the name of the function in the Source which runs the Test, None
+        if the Test is the main function.
+        """
+
+        return self._entry
+
     @property
     def source(self) -> Source:
         """This property provides the Source of the Test."""
@@ -178,11 +267,47 @@ class Test:
 
         self._run_outcome = outcome
 
+    @property
+    def reused(self) -> bool:
+        """This property provides whether the outcomes were reused from a previous run."""
+
+        return self._reused
+
+    @reused.setter
+    def reused(self, reused: bool) -> None:
+        """This allows marking the outcomes as reused."""
+
+        self._reused = reused
+
+    @property
+    def build_usage(self) -> Optional[ResourceUsage]:
+        """This property provides the resources the build used, None if it was not measured."""
+
+        return self._build_usage
+
+    @build_usage.setter
+    def build_usage(self, usage: Optional[ResourceUsage]) -> None:
+        """This allows setting the resources the build used."""
+
+        self._build_usage = usage
+
+    @property
+    def run_usage(self) -> Optional[ResourceUsage]:
+        """This property provides the resources the run used, None if it was not measured."""
+
+        return self._run_usage
+
+    @run_usage.setter
+    def run_usage(self, usage: Optional[ResourceUsage]) -> None:
+        """This allows setting the resources the run used."""
+
+        self._run_usage = usage
+
     @property
     def outcome(self) -> Optional[TestOutcome]:
         """"""
 
-        if self._build_outcome is None or self._build_outcome is TestOutcome.FAILED:
+        if self._build_outcome is not TestOutcome.SUCCESS:
             return self._build_outcome
 
         else:
@@ -4,8 +4,10 @@ The TestGenerator is the base class for all generators.
 It provides the main function definition.
 """
 
+from typing import Sequence
+
 from lemonspotter.core.test import Source
-from lemonspotter.core.statement import IncludeStatement
+from lemonspotter.core.statement import IncludeStatement, RankDefinitionStatement
 
 
 class TestGenerator:
@@ -14,6 +16,8 @@ class TestGenerator:
     generation.
     """
 
+    frame_headers: Sequence[str] = ('stdio.h', 'stdlib.h', 'mpi.h')
+
     def _generate_source_frame(self) -> Source:
         """
         This function generates the main function for the test.
@@ -22,9 +26,10 @@ class TestGenerator:
         source = Source()
 
         # add include statements
-        source.add_at_start(IncludeStatement('stdio.h'))
-        source.add_at_start(IncludeStatement('stdlib.h'))
-        source.add_at_start(IncludeStatement('mpi.h'))
+        for header in self.frame_headers:
+            source.add_at_start(IncludeStatement(header))
         # TODO we assume MPI here! How do we include other APIs?
 
+        source.add_at_start(RankDefinitionStatement())
+
         return source
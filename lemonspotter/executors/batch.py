@@ -0,0 +1,251 @@
+"""
+This module contains the BatchExecutor, which runs tests inside the allocations of a batch
+scheduler.
+
+Tests are built locally. The tests of a run are packed into a single job script, which is
+submitted to the scheduler with a blocking submit command, for example sbatch --wait. The job
+script launches the tests in waves whose processes fit into the allocation and appends the exit
+code of every test to a results file, the output of every test is written to its own files. Once
+the job is finished, the results file is ingested and the outcomes are applied to the tests.
+"""
+
+import math
+import shlex
+import shutil
+import logging
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from lemonspotter.core.test import Test
+from lemonspotter.core.profiler import Profiler
+from lemonspotter.executors.capture import Capture, CaptureParser, BoundedOutput
+from lemonspotter.executors.executor import RunResult
+from lemonspotter.executors.mpiexecutor import MPIExecutor
+
+
+class BatchExecutor(MPIExecutor):
+    """
+    This class builds tests locally and runs them in one batch allocation of the given number
+    of cores per run, instead of launching every test itself.
+    """
+
+    # exit codes of the timeout command once the timeout expired, the second once it killed
+    timeout_returncodes: Sequence[int] = (124, 128 + 9)
+    # seconds after which a test ignoring the termination at its timeout is killed
+    kill_after: int = 5
+    # directives of a Slurm job
+    default_directives: Sequence[str] = ('#SBATCH --job-name={name}', '#SBATCH --ntasks={cores}')
+
+    def __init__(self,
+                 mpicc: str,
+                 mpiexec: str,
+                 submit: Sequence[str] = ('sbatch', '--wait'),
+                 directives: Optional[Sequence[str]] = None,
+                 **options) -> None:
+        """
+        Initializes a batch executor. The job script is passed to the submit command, which
+        returns once the job is finished. The directives are placed at the start of the job
+        script, the fields {name} and {cores} are replaced by the name of the job and the number
+        of cores of the allocation, by default those of a Slurm job. The remaining options are
+        those of the MPIExecutor, the resident runner is not supported.
+        """
+
+        if options.get('resident'):
+            raise ValueError('The resident runner cannot be used in batch allocations.')
+
+        super().__init__(mpicc, mpiexec, **options)
+
+        self._submit = list(submit)
+        self._directives = list(directives if directives is not None
+                                else self.default_directives)
+        self._submitted = 0
+
+    def run_tests(self, tests: Sequence[Test], arguments: List[str] = []) -> None:
+        """
+        Runs the given tests in a single batch job and evaluates their outcomes in the given
+        order.
+        """
+
+        pending = [test for test in tests if self.runnable(test)]
+
+        if not pending:
+            return
+
+        results = self.run_allocation(pending, arguments)
+
+        for test in tests:
+            if test in results:
+                self.evaluate_run(test, results[test])
+
+    def launch(self, test: Test, arguments: List[str] = []) -> Optional[RunResult]:
+        """
+        Runs a single test in its own batch job.
+        """
+
+        return self.run_allocation([test], arguments).get(test)
+
+    def run_allocation(self,
+                       tests: Sequence[Test],
+                       arguments: List[str] = []) -> Mapping[Test, RunResult]:
+        """
+        Writes the job script of the given tests, submits it and ingests the results once the
+        job is finished. This method does not modify the tests.
+        """
+
+        name = f'lemonspotter_{self._submitted}'
+        self._submitted += 1
+
+        directory = self.test_directory / 'batch' / name
+        directory.mkdir(parents=True, exist_ok=True)
+
+        script = directory / 'job.sh'
+        script.write_text(self.job_script(name, directory, tests, arguments))
+        script.chmod(0o755)
+
+        command = self._submit + [str(script)]
+        logging.info('submitting %i tests as job %s: %s', len(tests), name, ' '.join(command))
+
+        try:
+            with Profiler().phase('batch job'):
+                returncode, stdout, stderr, _, _ = self._communicate(command, None)
+
+        except FileNotFoundError as error:
+            logging.error(error)
+            logging.error('skip running %i tests in batch job', len(tests))
+            return {}
+
+        logging.debug('submit stdout:\n%s\n', stdout)
+
+        if returncode != 0:
+            logging.error('batch job %s failed with %i:\n%s', name, returncode, stderr)
+
+        results = self.ingest(tests, directory)
+
+        if not self._keep:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        return results
+
+    def job_script(self,
+                   name: str,
+                   directory: Path,
+                   tests: Sequence[Test],
+                   arguments: List[str] = []) -> str:
+        """
+        Provides the job script running the given tests, the outcomes are written to the given
+        directory.
+        """
+
+        lines = ['#!/bin/sh']
+        lines += [directive.format(name=name, cores=self.cores) for directive in self._directives]
+        lines += ['', f'cd {shlex.quote(str(directory))}', ': > results']
+
+        if self._cpu_limit is not None:
+            lines.append(f'ulimit -t {self._cpu_limit}')
+
+        if self._memory_limit is not None:
+            lines.append(f'ulimit -v {self._memory_limit // 1024}')
+
+        for wave in self.waves(tests):
+            lines.append('')
+
+            for index, test in wave:
+                command = ([self._mpiexec, '-n', str(test.processes)] + arguments +
+                           [str(test.executable)])
+
+                if test.entry is not None:
+                    command.append(test.entry)
+
+                if self._run_timeout is not None:
+                    command = ['timeout', '-k', str(self.kill_after),
+                               str(math.ceil(self._run_timeout))] + command
+
+                launch = ' '.join(shlex.quote(argument) for argument in command)
+                lines.append(f'({launch} > {index}.out 2> {index}.err; '
+                             f'echo "{index} $?" >> results) &')
+
+            lines.append('wait')
+
+        return '\n'.join(lines) + '\n'
+
+    def waves(self, tests: Sequence[Test]) -> List[List[Tuple[int, Test]]]:
+        """
+        Packs the given tests, with their index, into waves whose processes fit onto the cores
+        of the allocation, largest process count first.
+        """
+
+        waves: List[List[Tuple[int, Test]]] = []
+        available: List[int] = []
+
+        for index, test in sorted(enumerate(tests),
+                                  key=lambda indexed: (-indexed[1].processes, indexed[1].name)):
+            for wave, space in enumerate(available):
+                if test.processes <= space:
+                    waves[wave].append((index, test))
+                    available[wave] -= test.processes
+                    break
+
+            else:
+                waves.append([(index, test)])
+                available.append(self.cores - test.processes)
+
+        return waves
+
+    def ingest(self, tests: Sequence[Test], directory: Path) -> Mapping[Test, RunResult]:
+        """
+        Reads the outcomes of the given tests from the results file and the output files in the
+        directory. Tests without an exit code in the results file, for example because the job
+        was cancelled, are given the return code -1.
+        """
+
+        returncodes: Dict[int, int] = {}
+
+        results_file = directory / 'results'
+        if results_file.exists():
+            for line in results_file.read_text().splitlines():
+                fields = line.split()
+
+                if len(fields) == 2 and all(field.isdigit() for field in fields):
+                    returncodes[int(fields[0])] = int(fields[1])
+
+                else:
+                    logging.warning('ignoring malformed result %r of job in %s',
+                                    line, directory)
+
+        results = {}
+        for index, test in enumerate(tests):
+            if index not in returncodes:
+                logging.error('batch job gave no outcome for test %s.', test.name)
+                results[test] = RunResult(-1, '', 'no outcome in results file')
+                continue
+
+            # the last capture of a variable of each rank is kept
+            captures: Dict[Tuple[int, str], Capture] = {}
+            output = BoundedOutput(self.max_output)
+            errors = BoundedOutput(self.max_output)
+
+            def capture(captured: Capture) -> None:
+                captures[(captured.rank, captured.name)] = captured
+
+            parser = CaptureParser(capture, output.append)
+
+            for filename, consume in ((f'{index}.out', parser.feed),
+                                      (f'{index}.err', errors.append)):
+                path = directory / filename
+
+                if path.exists():
+                    with path.open(errors='replace') as output_file:
+                        for chunk in iter(lambda: output_file.read(64 * 1024), ''):
+                            consume(chunk)
+
+            returncode = returncodes[index]
+            timed_out = (self._run_timeout is not None and
+                         returncode in self.timeout_returncodes)
+
+            results[test] = RunResult(returncode,
+                                      str(output),
+                                      str(errors),
+                                      timed_out,
+                                      tuple(captures.values()))
+
+        return results
@@ -0,0 +1,170 @@
+"""
+This module contains the BuildCache, a persistent content addressed store of build outcomes.
+
+Every entry is a directory named after the hash of everything that influences a build. It holds
+the compiler output and, if the build succeeded, the executable.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple, Iterable
+
+
+class BuildCache:
+    """
+    This class stores build outcomes keyed on the source, toolchain and compile arguments.
+    Failed builds are stored as well. The least recently used entries are evicted once the cache
+    exceeds its maximum size.
+    """
+
+    result_filename: str = 'result.json'
+    executable_filename: str = 'executable'
+
+    def __init__(self, directory: Path, max_size: int) -> None:
+        if max_size < 0:
+            raise ValueError(f'Maximum cache size needs to be positive, not {max_size}.')
+
+        self._directory: Path = directory.resolve()
+        self._max_size: int = max_size
+
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def directory(self) -> Path:
+        """This property provides the directory of the cache."""
+
+        return self._directory
+
+    @property
+    def max_size(self) -> int:
+        """This property provides the maximum size of the cache in bytes."""
+
+        return self._max_size
+
+    @staticmethod
+    def key(parts: Iterable[str]) -> str:
+        """
+        Generates the cache key from all parts which influence a build.
+        """
+
+        digest = hashlib.sha256()
+
+        for part in parts:
+            encoded = part.encode()
+
+            # length prefix to avoid ambiguous concatenations
+            digest.update(len(encoded).to_bytes(8, 'little'))
+            digest.update(encoded)
+
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self._directory / key[:2] / key
+
+    def load(self, key: str, executable: Path) -> Optional[Tuple[str, str]]:
+        """
+        Provides the compiler stdout and stderr of a cached build. The cached executable, if any,
+        is placed at the given executable path.
+        """
+
+        entry = self._entry(key)
+        result_path = entry / self.result_filename
+
+        try:
+            with result_path.open() as result_file:
+                result = json.load(result_file)
+
+            if result['executable']:
+                self._place(entry / self.executable_filename, executable)
+
+        except (OSError, ValueError, KeyError) as error:
+            logging.debug('build cache miss %s: %s', key, error)
+            return None
+
+        # mark as recently used
+        os.utime(result_path)
+
+        logging.debug('build cache hit %s', key)
+
+        return result['stdout'], result['stderr']
+
+    def store(self, key: str, executable: Optional[Path], stdout: str, stderr: str) -> None:
+        """
+        Stores the outcome of a build. The executable is only stored if given.
+        """
+
+        entry = self._entry(key)
+        if entry.exists():
+            return
+
+        entry.parent.mkdir(parents=True, exist_ok=True)
+
+        staging = Path(tempfile.mkdtemp(prefix='.staging-', dir=self._directory))
+
+        try:
+            if executable is not None:
+                self._place(executable, staging / self.executable_filename)
+
+            with (staging / self.result_filename).open('w') as result_file:
+                json.dump({'executable': executable is not None,
+                           'stdout': stdout,
+                           'stderr': stderr},
+                          result_file)
+
+            staging.rename(entry)
+
+        except OSError as error:
+            # another build of the same key finished first, or the executable vanished
+            logging.debug('not storing build %s in cache: %s', key, error)
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def prune(self) -> None:
+        """
+        Evicts the least recently used entries until the cache fits its maximum size.
+        """
+
+        entries = []
+        total = 0
+
+        for result_path in self._directory.glob(f'*/*/{self.result_filename}'):
+            entry = result_path.parent
+
+            try:
+                used = result_path.stat().st_mtime
+                size = sum(path.stat().st_size for path in entry.iterdir())
+
+            except OSError:
+                continue
+
+            entries.append((used, size, entry))
+            total += size
+
+        entries.sort(key=lambda entry: entry[0])
+
+        for _, size, entry in entries:
+            if total <= self._max_size:
+                break
+
+            logging.debug('evicting build cache entry %s', entry.name)
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    @staticmethod
+    def _place(source: Path, destination: Path) -> None:
+        """
+        Places a file at the destination, as a hard link if possible.
+        """
+
+        if destination.exists():
+            destination.unlink()
+
+        try:
+            os.link(source, destination)
+
+        except OSError:
+            shutil.copy2(source, destination)
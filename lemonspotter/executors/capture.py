@@ -0,0 +1,148 @@
+"""
+This module contains the parser of the capture protocol tests print their variables with.
+
+A capture is a frame of the rank of the process, the variable name, its abstract type and its
+value, separated by |. Frames start with the record separator \\x1e and end with the unit
+separator \\x1f, so values may contain any other character. Output is parsed incrementally while
+the test is running, neither the frames nor the other output are buffered without bound.
+"""
+
+import logging
+from typing import Callable, List, NamedTuple, Optional
+
+
+FRAME_START: str = '\x1e'
+FRAME_END: str = '\x1f'
+
+
+class Capture(NamedTuple):
+    """This tuple stores a single captured variable value."""
+
+    rank: int
+    name: str
+    type: str
+    value: str
+
+
+class BoundedOutput:
+    """
+    This class collects text up to a maximum length, further text is counted but dropped.
+    """
+
+    def __init__(self, max_length: int) -> None:
+        self._max_length = max_length
+        self._parts: List[str] = []
+        self._length = 0
+        self._dropped = 0
+
+    def append(self, text: str) -> None:
+        """Appends the text, as far as the maximum length allows."""
+
+        kept = text[:max(self._max_length - self._length, 0)]
+
+        if kept:
+            self._parts.append(kept)
+            self._length += len(kept)
+
+        self._dropped += len(text) - len(kept)
+
+    def __str__(self) -> str:
+        text = ''.join(self._parts)
+
+        if self._dropped:
+            text += f'\n[{self._dropped} characters dropped]\n'
+
+        return text
+
+
+class CaptureParser:
+    """
+    This class splits output into captures and the remaining output, incrementally. Frames
+    longer than max_frame_length are discarded.
+    """
+
+    def __init__(self,
+                 capture: Callable[[Capture], None],
+                 output: Callable[[str], None],
+                 max_frame_length: int = 64 * 1024) -> None:
+        self._capture = capture
+        self._output = output
+        self._max_frame_length = max_frame_length
+
+        self._frame: Optional[List[str]] = None
+        self._frame_length = 0
+        self._terminated = False
+
+    def feed(self, text: str) -> None:
+        """
+        Parses the next piece of output.
+        """
+
+        # the frame is terminated by a new line
+        if self._terminated and text:
+            self._terminated = False
+
+            if text.startswith('\n'):
+                text = text[1:]
+
+        while text:
+            if self._frame is None:
+                start = text.find(FRAME_START)
+
+                if start < 0:
+                    self._output(text)
+                    return
+
+                if start > 0:
+                    self._output(text[:start])
+
+                self._frame = []
+                self._frame_length = 0
+                text = text[start + 1:]
+
+            else:
+                end = text.find(FRAME_END)
+                restart = text.find(FRAME_START)
+
+                # a frame cut off by a crash is followed by the start of another
+                if restart >= 0 and (end < 0 or restart < end):
+                    logging.warning('discarding incomplete capture.')
+
+                    self._frame = None
+                    text = text[restart:]
+                    continue
+
+                part = text if end < 0 else text[:end]
+
+                if self._frame_length + len(part) <= self._max_frame_length:
+                    self._frame.append(part)
+
+                self._frame_length += len(part)
+
+                if end < 0:
+                    return
+
+                self._finish()
+                text = text[end + 1:]
+
+                if not text:
+                    self._terminated = True
+
+                elif text.startswith('\n'):
+                    text = text[1:]
+
+    def _finish(self) -> None:
+        frame = ''.join(self._frame)  # type: ignore
+        self._frame = None
+
+        if self._frame_length > self._max_frame_length:
+            logging.warning('discarding capture of %i characters.', self._frame_length)
+            return
+
+        fields = frame.split('|', 3)
+
+        try:
+            self._capture(Capture(int(fields[0]), fields[1], fields[2], fields[3]))
+
+        except (IndexError, ValueError):
+            logging.warning('discarding malformed capture %r.', frame)
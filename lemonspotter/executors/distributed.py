@@ -0,0 +1,670 @@
+"""
+This module contains the distributed executor. A coordinator hands the tests of a run out to
+workers, which connect to it over TCP or Unix sockets, build and run the tests with their local
+toolchain and send the outcomes back.
+
+Messages are JSON objects, one per line. A worker introduces itself with a hello message and
+then requests one task per free slot. A task is a source and the tests sharing it, the worker
+answers with the build result and the run result of every test. Once no task is left to hand
+out, tasks which are still running are handed out again to idle workers and the first result of
+a task is used, so that a slow worker does not hold up the end of the run.
+"""
+
+import os
+import json
+import time
+import socket
+import logging
+from collections import deque
+from pathlib import Path
+from threading import Condition, Lock, Thread
+from concurrent.futures import ThreadPoolExecutor
+from typing import (Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple,
+                    Union)
+
+from lemonspotter.core.journal import Journal
+from lemonspotter.core.test import Test, TestType
+from lemonspotter.executors.capture import Capture
+from lemonspotter.executors.executor import Executor, BuildResult, RunResult
+from lemonspotter.executors.mpiexecutor import MPIExecutor
+from lemonspotter.executors.toolchain import Toolchain
+
+
+def parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """
+    Provides the socket family and socket address of an address given as host:port or as
+    unix:path.
+    """
+
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+
+    host, _, port = address.rpartition(':')
+
+    if not host or not port.isdigit():
+        raise ValueError(f'Invalid address {address}, expected host:port or unix:path.')
+
+    return socket.AF_INET, (host, int(port))
+
+
+class Connection:
+    """
+    This class sends and receives the messages of the protocol over a connected socket. Sending
+    is safe from multiple threads.
+    """
+
+    def __init__(self, connected: socket.socket) -> None:
+        self._socket = connected
+        self._reader = connected.makefile('r', encoding='utf-8', newline='\n')
+        self._lock = Lock()
+
+    def send(self, message: Mapping[str, Any]) -> bool:
+        """Sends the message, provides whether it was sent."""
+
+        data = (json.dumps(message) + '\n').encode()
+
+        with self._lock:
+            try:
+                self._socket.sendall(data)
+
+            except OSError:
+                return False
+
+        return True
+
+    def receive(self) -> Optional[Dict[str, Any]]:
+        """Receives the next message, None once the connection is closed."""
+
+        try:
+            line = self._reader.readline()
+
+        except (OSError, ValueError):
+            return None
+
+        if not line:
+            return None
+
+        try:
+            return json.loads(line)
+
+        except json.JSONDecodeError:
+            logging.error('received malformed message: %s', line.strip())
+            return None
+
+    def close(self) -> None:
+        """Closes the connection, a receive blocked in another thread returns None."""
+
+        try:
+            self._socket.shutdown(socket.SHUT_RDWR)
+
+        except OSError:
+            pass
+
+        self._reader.close()
+        self._socket.close()
+
+
+class _Task:
+    """
+    This class stores the tests sharing a source, which are built and run by a single worker.
+    """
+
+    def __init__(self, identifier: int, tests: List[Test]) -> None:
+        self.identifier = identifier
+        self.tests = tests
+
+        self.processes = max(test.processes for test in tests)
+        self.started: Optional[float] = None
+        self.workers: Set['_Peer'] = set()
+        self.result: Optional[Mapping[str, Any]] = None
+
+    def message(self) -> Dict[str, Any]:
+        """Provides the message handing the task to a worker."""
+
+        return {'type': 'task',
+                'task': self.identifier,
+                'name': self.tests[0].name,
+                'source': repr(self.tests[0].source),
+                'tests': [{'name': test.name,
+                           'processes': test.processes,
+                           'run': test.type is TestType.BUILD_AND_RUN,
+                           'entry': test.entry} for test in self.tests]}
+
+
+class _Peer:
+    """
+    This class stores the state of a connected worker on the coordinator.
+    """
+
+    def __init__(self, connection: Connection, name: str, cores: int) -> None:
+        self.connection = connection
+        self.name = name
+        self.cores = cores
+
+        self.requested = 0
+        self.tasks: Set[_Task] = set()
+
+
+class DistributedExecutor(Executor):
+    """
+    This class is the coordinator, it listens for workers and hands out the tests of every
+    execute call to them. Outcomes are evaluated locally, in the order of the test names, once
+    all tests of the call are finished. The local toolchain is only used to query the MPI
+    library.
+    """
+
+    def __init__(self,
+                 address: str,
+                 toolchain: Toolchain,
+                 journal: Optional[Journal] = None,
+                 copies: int = 2,
+                 store: Optional[Journal] = None,
+                 timeout: Optional[float] = 300) -> None:
+        """
+        Listens for workers on the address. A task which is still running once no task is left
+        is handed out until it is running on copies workers. Waiting for tasks or cores fails
+        once no worker has been connected for timeout seconds, None waits forever. The journal
+        and the store are those of the Executor.
+        """
+
+        super().__init__(journal, store)
+
+        self._toolchain = toolchain
+        self._copies = copies
+        self._timeout = timeout
+
+        family, location = parse_address(address)
+
+        self._server = socket.socket(family, socket.SOCK_STREAM)
+        self._unix_path: Optional[Path] = None
+
+        if family == socket.AF_UNIX:
+            self._unix_path = Path(location)  # type: ignore
+
+            # a socket left behind by a previous coordinator
+            if self._unix_path.is_socket():
+                self._unix_path.unlink()
+
+        else:
+            self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        self._server.bind(location)
+        self._server.listen()
+
+        self._condition = Condition()
+        self._peers: List[_Peer] = []
+        self._pending: Deque[_Task] = deque()
+        self._running: List[_Task] = []
+        self._identifiers = 0
+        self._cores = 0
+        self._unconnected = time.monotonic()
+
+        Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def address(self) -> str:
+        """This property provides the address workers connect to."""
+
+        if self._unix_path is not None:
+            return f'unix:{self._unix_path}'
+
+        host, port = self._server.getsockname()
+
+        return f'{host}:{port}'
+
+    @property
+    def toolchain(self) -> Toolchain:
+        """This property provides the local toolchain, used to query the MPI library."""
+
+        return self._toolchain
+
+    @property
+    def cores(self) -> int:
+        """
+        This property provides the number of cores of the largest worker connected so far, it
+        waits for the first worker to connect.
+        """
+
+        with self._condition:
+            self._wait(lambda: self._cores > 0)
+
+            return self._cores
+
+    @property
+    def workers(self) -> int:
+        """This property provides the number of connected workers."""
+
+        with self._condition:
+            return len(self._peers)
+
+    def execute(self, tests: Iterable[Test]) -> None:
+        """
+        Hands out the given tests, tests sharing a source as a single task, and waits for all
+        of them to be finished before evaluating their outcomes.
+        """
+
+        ordered = sorted(tests, key=lambda test: test.name)
+        ordered = [test for test in ordered if not self.resume(test)]
+
+        if not ordered:
+            return
+
+        shared: Dict[int, List[Test]] = {}
+        for test in ordered:
+            if test.build_outcome:
+                logging.critical('Test %s has build outcome.', test.name)
+                continue
+
+            shared.setdefault(id(test.source), []).append(test)
+
+        with self._condition:
+            tasks = []
+            for group in shared.values():
+                tasks.append(_Task(self._identifiers, group))
+                self._identifiers += 1
+
+            self._pending.extend(tasks)
+
+            if not self._peers:
+                logging.warning('waiting for workers to connect to %s', self.address)
+
+            self._dispatch()
+
+            try:
+                self._wait(lambda: all(task.result is not None for task in tasks))
+
+            except ConnectionError:
+                # without workers all unfinished tasks are pending
+                for task in tasks:
+                    if task in self._pending:
+                        self._pending.remove(task)
+
+                raise
+
+        for task in tasks:
+            self._evaluate(task)
+
+    def _wait(self, predicate: Callable[[], bool]) -> None:
+        """
+        Waits on the condition, which needs to be held, until the predicate holds. Raises a
+        ConnectionError once no worker has been connected for the timeout.
+        """
+
+        while not predicate():
+            if self._peers or self._timeout is None:
+                self._condition.wait()
+                continue
+
+            remaining = self._unconnected + self._timeout - time.monotonic()
+            if remaining <= 0:
+                raise ConnectionError(f'No worker connected to {self.address} for '
+                                      f'{self._timeout:g} seconds.')
+
+            self._condition.wait(remaining)
+
+    def _evaluate(self, task: _Task) -> None:
+        """
+        Applies the result a worker gave for the task to its tests.
+        """
+
+        build = task.result['build']  # type: ignore
+        runs = task.result['runs']  # type: ignore
+
+        build_result = BuildResult(Path(build['executable']),
+                                   build['stdout'],
+                                   build['stderr'],
+                                   build['timed_out'],
+                                   self.usage(build))
+
+        for test in task.tests:
+            self.evaluate_build(test, build_result)
+
+            if not self.runnable(test):
+                continue
+
+            run = runs.get(test.name)
+            if run is None:
+                self.evaluate_run(test, RunResult(-1, '', 'no run result from worker'))
+                continue
+
+            self.evaluate_run(test, RunResult(run['returncode'],
+                                              run['stdout'],
+                                              run['stderr'],
+                                              run['timed_out'],
+                                              tuple(Capture(*capture)
+                                                    for capture in run['captures']),
+                                              self.usage(run)))
+
+    def close(self) -> None:
+        """
+        Shuts the connected workers down and stops listening.
+        """
+
+        with self._condition:
+            for peer in self._peers:
+                peer.connection.send({'type': 'shutdown'})
+
+        self._server.close()
+
+        if self._unix_path is not None and self._unix_path.is_socket():
+            self._unix_path.unlink()
+
+    def _accept(self) -> None:
+        while True:
+            try:
+                connected, _ = self._server.accept()
+
+            except OSError:
+                return
+
+            Thread(target=self._serve, args=(Connection(connected),), daemon=True).start()
+
+    def _serve(self, connection: Connection) -> None:
+        """
+        Receives the messages of a single worker until it disconnects.
+        """
+
+        hello = connection.receive()
+
+        if hello is None or hello.get('type') != 'hello':
+            logging.warning('rejecting connection without hello.')
+            connection.close()
+            return
+
+        peer = _Peer(connection, hello['name'], hello['cores'])
+
+        with self._condition:
+            self._peers.append(peer)
+            self._cores = max(self._cores, peer.cores)
+
+            self._condition.notify_all()
+
+        logging.info('worker %s connected with %i cores.', peer.name, peer.cores)
+
+        try:
+            while True:
+                message = connection.receive()
+
+                if message is None:
+                    break
+
+                with self._condition:
+                    if message['type'] == 'request':
+                        peer.requested += 1
+
+                    elif message['type'] == 'result':
+                        self._complete(peer, message)
+
+                    else:
+                        logging.warning('ignoring message of type %s from worker %s.',
+                                        message['type'], peer.name)
+
+                    self._dispatch()
+
+        finally:
+            with self._condition:
+                self._disconnect(peer)
+                self._dispatch()
+
+            connection.close()
+
+    def _complete(self, peer: _Peer, message: Mapping[str, Any]) -> None:
+        """
+        Stores the result of a task, unless another worker finished the task first.
+        """
+
+        task = next((task for task in peer.tasks if task.identifier == message['task']), None)
+
+        if task is None:
+            logging.warning('ignoring result of unknown task from worker %s.', peer.name)
+            return
+
+        peer.tasks.discard(task)
+        task.workers.discard(peer)
+
+        if task.result is not None:
+            logging.debug('discarding result of task %s from worker %s, finished already.',
+                          task.tests[0].name, peer.name)
+            return
+
+        logging.debug('worker %s finished task %s.', peer.name, task.tests[0].name)
+
+        task.result = message
+        self._running.remove(task)
+
+        self._condition.notify_all()
+
+    def _disconnect(self, peer: _Peer) -> None:
+        """
+        Removes the worker, its unfinished tasks are handed out again.
+        """
+
+        logging.warning('worker %s disconnected.', peer.name)
+
+        self._peers.remove(peer)
+
+        if not self._peers:
+            self._unconnected = time.monotonic()
+            self._condition.notify_all()
+
+        for task in sorted(peer.tasks, key=lambda task: task.identifier, reverse=True):
+            task.workers.discard(peer)
+
+            if task.result is None and not task.workers:
+                self._running.remove(task)
+                self._pending.appendleft(task)
+
+        peer.tasks.clear()
+
+    def _dispatch(self) -> None:
+        """
+        Hands out tasks to the workers requesting them, one task per worker in turn.
+        """
+
+        handed = True
+        while handed:
+            handed = False
+
+            for peer in self._peers:
+                if peer.requested == 0:
+                    continue
+
+                task = self._next(peer)
+                if task is None:
+                    continue
+
+                if task.started is None:
+                    task.started = time.monotonic()
+                    self._running.append(task)
+
+                else:
+                    logging.info('handing task %s to worker %s as well.',
+                                 task.tests[0].name, peer.name)
+
+                peer.requested -= 1
+                peer.tasks.add(task)
+                task.workers.add(peer)
+
+                # a failed send is noticed as a disconnect by the receiving thread
+                peer.connection.send(task.message())
+                handed = True
+
+    def _next(self, peer: _Peer) -> Optional[_Task]:
+        """
+        Provides the next task of the worker. Tasks are only handed to workers with enough
+        cores, unless no worker has enough. If no task is pending, the longest running task
+        which runs on less than copies workers is handed out again.
+        """
+
+        largest = max(other.cores for other in self._peers)
+
+        for task in self._pending:
+            if task.processes <= peer.cores or task.processes > largest:
+                self._pending.remove(task)
+                return task
+
+        if self._pending:
+            return None
+
+        backups = [task for task in self._running
+                   if peer not in task.workers and len(task.workers) < self._copies and
+                   task.processes <= peer.cores]
+
+        return min(backups, key=lambda task: task.started, default=None)  # type: ignore
+
+
+class Worker:
+    """
+    This class connects to a coordinator and builds and runs the tasks it hands out with a
+    local executor, until the coordinator shuts it down.
+    """
+
+    def __init__(self,
+                 address: str,
+                 executor: MPIExecutor,
+                 slots: Optional[int] = None,
+                 name: Optional[str] = None) -> None:
+        """
+        Up to slots tasks, by default as many as the executor builds concurrently, are executed
+        at the same time. The processes of the running tests are packed onto the cores of the
+        executor.
+        """
+
+        self._address = address
+        self._executor = executor
+        self._slots = slots if slots is not None else executor.jobs
+        self._name = name if name is not None else f'{socket.gethostname()}:{os.getpid()}'
+
+        self._condition = Condition()
+        self._available = executor.cores
+
+    @property
+    def name(self) -> str:
+        """This property provides the name the worker introduces itself with."""
+
+        return self._name
+
+    def run(self, connect_timeout: float = 30) -> None:
+        """
+        Connects to the coordinator, retrying until connect_timeout seconds have passed, and
+        executes tasks until the coordinator shuts the worker down or disconnects.
+        """
+
+        connection = self._connect(connect_timeout)
+        arguments = self._executor.prepare()
+
+        connection.send({'type': 'hello', 'name': self._name, 'cores': self._executor.cores})
+
+        with ThreadPoolExecutor(max_workers=self._slots) as pool:
+            for _ in range(self._slots):
+                connection.send({'type': 'request'})
+
+            while True:
+                message = connection.receive()
+
+                if message is None or message['type'] == 'shutdown':
+                    break
+
+                if message['type'] == 'task':
+                    pool.submit(self._serve, connection, message, arguments)
+
+                else:
+                    logging.warning('ignoring message of type %s.', message['type'])
+
+            connection.close()
+
+        self._executor.prune_cache()
+        self._executor.close()
+
+        logging.info('worker %s shut down.', self._name)
+
+    def _connect(self, timeout: float) -> Connection:
+        family, location = parse_address(self._address)
+        deadline = time.monotonic() + timeout
+
+        while True:
+            connecting = socket.socket(family, socket.SOCK_STREAM)
+
+            try:
+                connecting.connect(location)
+                return Connection(connecting)
+
+            except OSError as error:
+                connecting.close()
+
+                if time.monotonic() >= deadline:
+                    raise ConnectionError(f'Connecting to {self._address} failed: {error}')
+
+            time.sleep(0.2)
+
+    def _serve(self, connection: Connection, task: Mapping[str, Any], arguments: List[str]):
+        """
+        Executes a task and sends its result, followed by the request of the next task. A
+        worker missing its compiler or launcher disconnects, its tasks are handed to others.
+        """
+
+        try:
+            result = self.execute_task(task, arguments)
+
+        except FileNotFoundError as error:
+            logging.error(error)
+            logging.error('worker %s cannot execute tests, disconnecting.', self._name)
+
+            connection.close()
+            return
+
+        connection.send(result)
+        connection.send({'type': 'request'})
+
+    def execute_task(self, task: Mapping[str, Any], arguments: List[str]) -> Dict[str, Any]:
+        """
+        Builds the source of the task with the given compile arguments and runs its tests,
+        provides the result message.
+        """
+
+        build = self._executor.compile_source(task['name'], task['source'], arguments)
+
+        runs = {}
+        if build.built:
+            for entry in task['tests']:
+                if not entry['run']:
+                    continue
+
+                test = Test(entry['name'],
+                            TestType.BUILD_AND_RUN,
+                            processes=entry['processes'],
+                            entry=entry['entry'])
+                test.executable = build.executable
+
+                runs[test.name] = self._run(test)._asdict()
+
+        return {'type': 'result',
+                'task': task['task'],
+                'build': dict(build._asdict(), executable=str(build.executable)),
+                'runs': runs}
+
+    def _run(self, test: Test) -> RunResult:
+        """
+        Launches the test once enough cores are available.
+        """
+
+        if test.processes > self._executor.cores:
+            return RunResult(-1, '', f'test needs {test.processes} processes, but worker '
+                                     f'{self._name} has {self._executor.cores} cores.')
+
+        with self._condition:
+            self._condition.wait_for(lambda: self._available >= test.processes)
+            self._available -= test.processes
+
+        try:
+            result = self._executor.launch_test(test)
+
+        finally:
+            with self._condition:
+                self._available += test.processes
+                self._condition.notify_all()
+
+        if result is None:
+            raise FileNotFoundError(f'Launching test {test.name} failed.')
+
+        return result
@@ -0,0 +1,292 @@
+"""
+This module contains the Executor interface, which builds and runs tests and evaluates their
+outcomes. Executors differ in where and how tests are built and run, the evaluation of the
+outcomes and the journal are shared by all of them.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Iterable, Mapping, NamedTuple, Optional, Tuple
+
+from lemonspotter.core.journal import Journal
+from lemonspotter.core.test import Test, TestType, ResourceUsage
+from lemonspotter.executors.capture import Capture
+from lemonspotter.executors.toolchain import Toolchain
+
+
+class BuildResult(NamedTuple):
+    """This tuple stores the outcome of a single compiler invocation."""
+
+    executable: Path
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    usage: Optional[ResourceUsage] = None
+
+    @property
+    def built(self) -> bool:
+        """This property provides whether the compiler produced an executable."""
+
+        return not (self.timed_out or self.stdout or self.stderr)
+
+
+class RunResult(NamedTuple):
+    """
+    This tuple stores the outcome of a single test launch, stdout holds the output which is not
+    captured.
+    """
+
+    returncode: int
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    captures: Tuple[Capture, ...] = ()
+    usage: Optional[ResourceUsage] = None
+
+
+class Executor(ABC):
+    """
+    This class is the interface of all executors. Subclasses build and run tests, the outcomes
+    are applied to the tests by evaluate_build and evaluate_run.
+    """
+
+    def __init__(self,
+                 journal: Optional[Journal] = None,
+                 store: Optional[Journal] = None) -> None:
+        """
+        Outcomes are recorded in the journal, if given, and tests it holds outcomes of are not
+        executed again. The store is the journal of previous runs with the same fingerprint,
+        the outcomes it holds are reused and new outcomes are added to it.
+        """
+
+        self._journal = journal
+        self._store = store
+
+    @property
+    @abstractmethod
+    def toolchain(self) -> Toolchain:
+        """This property provides the local toolchain, used to query the MPI library."""
+
+    @property
+    @abstractmethod
+    def cores(self) -> int:
+        """This property provides the largest number of processes a test may be run with."""
+
+    @abstractmethod
+    def execute(self, tests: Iterable[Test]) -> None:
+        """
+        Builds and then runs the given tests and applies their outcomes.
+        """
+
+    def close(self) -> None:
+        """
+        Releases the resources of the executor, after the last tests are executed.
+        """
+
+    def _records(self,
+                 test: Test) -> Optional[Tuple[Mapping[str, Any], Optional[Mapping[str, Any]],
+                                               bool]]:
+        """
+        Provides the build and run records of the test, if the journal or else the store holds
+        all outcomes of the test, and whether they are from the store.
+        """
+
+        for journal, reused in ((self._journal, False), (self._store, True)):
+            if journal is None:
+                continue
+
+            build = journal.lookup(test, 'build')
+            if build is None:
+                continue
+
+            built = not (build['timed_out'] or build['stdout'] or build['stderr'])
+            run = journal.lookup(test, 'run')
+
+            if test.type is not TestType.BUILD_AND_RUN or not built or run is not None:
+                return build, run, reused
+
+        return None
+
+    def completed(self, test: Test) -> bool:
+        """
+        Checks whether the journal or the store holds all outcomes of the test.
+        """
+
+        return self._records(test) is not None
+
+    def resume(self, test: Test) -> bool:
+        """
+        Applies the outcomes the journal or the store holds for the test, if the test has been
+        completed. Provides whether the test was resumed.
+        """
+
+        records = self._records(test)
+        if records is None:
+            return False
+
+        build, run, reused = records
+        build_result = BuildResult(Path(build['executable']),
+                                   build['stdout'],
+                                   build['stderr'],
+                                   build['timed_out'],
+                                   self.usage(build))
+
+        if reused:
+            logging.info('reusing test %s from a previous run', test.name)
+
+        else:
+            logging.info('resuming test %s from journal', test.name)
+
+        test.reused = reused
+
+        self.evaluate_build(test, build_result)
+
+        if run is not None:
+            self.evaluate_run(test, RunResult(run['returncode'],
+                                              run['stdout'],
+                                              run['stderr'],
+                                              run['timed_out'],
+                                              tuple(Capture(*capture)
+                                                    for capture in run['captures']),
+                                              self.usage(run)))
+
+        elif not build_result.built:
+            # fails the run of the test as if it had been built in this run
+            self.runnable(test)
+
+        return True
+
+    @staticmethod
+    def usage(record: Mapping[str, Any]) -> Optional[ResourceUsage]:
+        """
+        Provides the resource usage of a recorded build or run, None if it was not measured.
+        """
+
+        usage = record.get('usage')
+
+        return ResourceUsage(*usage) if usage is not None else None
+
+    def _record(self, test: Test, phase: str, result: Mapping[str, Any]) -> None:
+        """
+        Records the outcome of the phase of the test in the journal and the store.
+        """
+
+        for journal in (self._journal, self._store):
+            if journal is not None:
+                journal.record(test, phase, result)
+
+    def evaluate_build(self, test: Test, result: BuildResult) -> None:
+        """
+        Applies the build callbacks of the test according to the compiler output.
+        """
+
+        logging.info('building test %s', test.name)
+
+        self._record(test, 'build', dict(result._asdict(), executable=str(result.executable)))
+
+        test.build_usage = result.usage
+
+        # evaluate build result
+        logging.debug('build stdout:\n%s\n', result.stdout)
+        logging.debug('build stderr:\n%s\n', result.stderr)
+
+        if result.timed_out:
+            test.build_timeout_function()
+
+            logging.warning('building timed out of test %s', test.name)
+
+        elif result.built:
+            # set executable on test
+            test.executable = result.executable
+
+            test.build_success_function()
+
+            logging.debug('building test %s successful\n%s\n', test.name, '-' * 80)
+
+        else:
+            test.build_fail_function()
+
+            logging.warning('building failed of test %s', test.name)
+
+    def runnable(self, test: Test) -> bool:
+        """
+        Checks whether the test needs to be launched. Tests which cannot be launched are failed.
+        """
+
+        # check if valid test
+        if test.type is TestType.BUILD_ONLY:
+            logging.info('skip running test %s due to BUILD_ONLY', test.name)
+
+        elif test.run_outcome:
+            logging.critical('Test %s has run outcome.', test.name)
+
+        elif test.executable is None:
+            logging.warning('skip running test %s, it has no executable.', test.name)
+            test.run_fail_function()
+
+        elif test.processes > self.cores:
+            logging.error('test %s needs %i processes, but only %i cores are available.',
+                          test.name, test.processes, self.cores)
+            test.run_fail_function()
+
+        else:
+            return True
+
+        return False
+
+    def evaluate_run(self, test: Test, result: RunResult) -> None:
+        """
+        Assigns the captured values and applies the run callbacks of the test.
+        """
+
+        logging.debug('run stdout:\n%s\n', result.stdout)
+        logging.debug('run stderr:\n%s\n', result.stderr)
+
+        self._record(test, 'run', result._asdict())
+
+        test.run_usage = result.usage
+
+        if result.timed_out:
+            logging.warning('test %s timed out.', test.name)
+            test.run_timeout_function()
+
+            return
+
+        # test run check
+        if not result.stderr and result.returncode == 0:
+            variables = test.source.variables(test.entry) if result.captures else {}
+
+            for capture in result.captures:
+                variable = variables.get(capture.name)
+
+                if variable is None:
+                    logging.warning('capturing %s, but no variable found.', capture.name)
+
+                elif capture.rank != 0:
+                    logging.debug('ignoring capture of %s from rank %i.',
+                                  capture.name, capture.rank)
+
+                else:
+                    if capture.type != variable.type.abstract_type:
+                        logging.warning('capturing %s of type %s, but variable is of type %s.',
+                                        capture.name, capture.type,
+                                        variable.type.abstract_type)
+
+                    variable.value = capture.value
+                    logging.debug('captured %s = %s', variable.name, capture.value)
+                    logging.debug('executor variable %s', str(variable))
+
+            # call success function
+            test.run_success_function()
+            logging.info('running test %s successful\n%s\n', test.name, '#'*80)
+
+            return
+
+        elif result.returncode > 0:
+            logging.critical('test %s crashed with errorcode %i', test.name, result.returncode)
+
+        else:
+            logging.warning('test %s failed with internal error.', test.name)
+
+        test.run_fail_function()
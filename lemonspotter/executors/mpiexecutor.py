@@ -1,24 +1,115 @@
 import os
+import sys
+import time
+import codecs
+import signal
+import shutil
+import select
+import tempfile
+import selectors
 
 from pathlib import Path
 import logging
+from concurrent.futures import ThreadPoolExecutor, Future
+from functools import partial
+from threading import Condition, Lock
 from subprocess import Popen, PIPE
-from typing import Set, List
-
-from lemonspotter.core.test import Test, TestType
-
-
-class MPIExecutor:
-    def __init__(self, mpicc: str, mpiexec: str, test_directory: Path = Path('generated_tests/')):
+from typing import Iterable, List, Sequence, Optional, Tuple, Mapping, Dict, Callable, Set
+
+from lemonspotter.core.database import Database
+from lemonspotter.core.journal import Journal
+from lemonspotter.core.profiler import Profiler
+from lemonspotter.core.test import Test, TestType, ResourceUsage
+from lemonspotter.core.testgenerator import TestGenerator
+from lemonspotter.executors.buildcache import BuildCache
+from lemonspotter.executors.capture import Capture, CaptureParser, BoundedOutput
+from lemonspotter.executors.executor import Executor, BuildResult, RunResult
+from lemonspotter.executors.toolchain import Toolchain
+from lemonspotter.executors.precompiledheader import PrecompiledHeader
+from lemonspotter.executors.residentrunner import ResidentRunner
+
+
+class MPIExecutor(Executor):
+    """
+    This class builds tests with the MPI compiler wrapper and runs them with the MPI launcher on
+    the local host.
+    """
+
+    # characters of uncaptured output and of error output kept per launch
+    max_output: int = 64 * 1024
+    # memory backed file system the executables of in memory builds are placed on
+    scratch_root: Path = Path('/dev/shm')
+
+    def __init__(self,
+                 mpicc: str,
+                 mpiexec: str,
+                 test_directory: Path = Path('generated_tests/'),
+                 jobs: Optional[int] = None,
+                 cores: Optional[int] = None,
+                 cache: Optional[BuildCache] = None,
+                 precompiled_header: bool = True,
+                 build_timeout: Optional[float] = None,
+                 run_timeout: Optional[float] = None,
+                 cpu_limit: Optional[int] = None,
+                 memory_limit: Optional[int] = None,
+                 resident: bool = False,
+                 journal: Optional[Journal] = None,
+                 in_memory: bool = False,
+                 keep: bool = True,
+                 store: Optional[Journal] = None) -> None:
         """
-        Initializes a test executor for MPI Libraries
+        Initializes a test executor for MPI Libraries. Timeouts are given in seconds of wall
+        clock time, the CPU limit in seconds and the memory limit in bytes of address space per
+        process. If resident is set, single process tests which neither initialize nor finalize
+        MPI are executed by a resident runner instead of being launched individually. Outcomes
+        are recorded in the journal, if given, and tests it holds outcomes of are not executed
+        again, the outcomes of previous runs in the store are reused. If in_memory is set,
+        sources are passed to the compiler on its standard input. Unless keep is set, sources
+        are not written and executables are placed in a scratch directory on a memory backed
+        file system, and the artifacts of the tests are removed when the executor is closed.
         """
 
+        super().__init__(journal, store)
+
         self._test_directory = test_directory.resolve()
 
         self._mpicc = mpicc
         self._mpiexec = mpiexec
 
+        self._toolchain = Toolchain(mpicc, mpiexec)
+        self._cache = cache
+
+        self._header: Optional[PrecompiledHeader] = None
+        if precompiled_header:
+            self._header = PrecompiledHeader(self._toolchain,
+                                             self._test_directory / 'precompiled',
+                                             TestGenerator.frame_headers)
+
+        self._runner: Optional[ResidentRunner] = None
+        if resident:
+            self._runner = ResidentRunner(self._toolchain, self._test_directory / 'runner')
+
+        self._jobs: int = jobs if jobs is not None else (os.cpu_count() or 1)
+        if self._jobs < 1:
+            raise ValueError(f'Number of build jobs needs to be at least 1, not {self._jobs}.')
+
+        self._cores: int = cores if cores is not None else (os.cpu_count() or 1)
+        if self._cores < 1:
+            raise ValueError(f'Number of cores needs to be at least 1, not {self._cores}.')
+
+        self._build_timeout = build_timeout
+        self._run_timeout = run_timeout
+
+        self._cpu_limit = cpu_limit
+        self._memory_limit = memory_limit
+
+        self._in_memory = in_memory
+        self._keep = keep
+
+        self._scratch: Optional[Path] = None
+        self._artifacts: Set[Path] = set()
+        self._artifacts_lock = Lock()
+
     @property
     def test_directory(self):
         """
@@ -26,18 +117,37 @@ class MPIExecutor:
         """
         return self._test_directory
 
-    def execute(self, tests: Set[Test]):
+    @property
+    def jobs(self) -> int:
+        """This property provides the number of concurrent builds."""
+
+        return self._jobs
+
+    @property
+    def cores(self) -> int:
+        """This property provides the number of cores test processes are packed onto."""
+
+        return self._cores
+
+    @property
+    def toolchain(self) -> Toolchain:
+        """This property provides the toolchain used to build and run tests."""
+
+        return self._toolchain
+
+    def execute(self, tests: Iterable[Test]) -> None:
         """
+        Builds and then runs the given tests. Builds and runs are performed concurrently, outcomes
+        are applied in the order of the test names.
         """
 
-        # check for test directory
-        if not os.path.isdir(self.test_directory):
-            os.makedirs(self.test_directory)
-
         if tests:
+            ordered = sorted(tests, key=lambda test: test.name)
+            ordered = [test for test in ordered if not self.resume(test)]
+
             try:
-                for test in tests:
-                    self.build_test(test)
+                arguments = self.prepare()
+                self.build_tests(ordered, arguments)
 
             except FileNotFoundError as error:
                 logging.error(error)
@@ -45,121 +155,544 @@ class MPIExecutor:
                 return
 
             try:
-                for test in tests:
-                    self.run_test(test)
+                self.run_tests(ordered)
 
             except FileNotFoundError as error:
                 logging.error(error)
                 logging.error('Running set of test failed.')
                 return
 
-    def build_test(self, test: Test, arguments: List[str] = []) -> None:
-        logging.info('building test %s', test.name)
+            finally:
+                self.prune_cache()
+
+    def prepare(self) -> List[str]:
+        """
+        Prepares the test directory, the precompiled header and the resident runner. Provides
+        the arguments every test is compiled with.
+        """
+
+        # check for test directory
+        if not os.path.isdir(self.test_directory):
+            os.makedirs(self.test_directory)
+
+        if self._in_memory and not self._keep and self._scratch is None:
+            root = self.scratch_root if os.access(self.scratch_root, os.W_OK) else None
+            self._scratch = Path(tempfile.mkdtemp(prefix='lemonspotter_', dir=root))
+
+            logging.info('placing executables in %s', self._scratch)
+
+        arguments = self._header.prepare() if self._header is not None else []
+
+        if self._runner is not None and self._runner.prepare() is None:
+            logging.warning('resident runner unavailable, launching tests individually.')
+            self._runner = None
+
+        return arguments
+
+    def close(self) -> None:
+        """
+        Removes the sources and executables of the tests and the scratch directory, unless the
+        artifacts are kept.
+        """
+
+        if self._keep:
+            return
 
+        with self._artifacts_lock:
+            for artifact in self._artifacts:
+                if artifact.exists():
+                    artifact.unlink()
+
+            self._artifacts.clear()
+
+        if self._scratch is not None:
+            shutil.rmtree(self._scratch, ignore_errors=True)
+            self._scratch = None
+
+    def prune_cache(self) -> None:
+        """
+        Prunes the build cache to its maximum size, if a build cache is used.
+        """
+
+        if self._cache is not None:
+            self._cache.prune()
+
+    def build_tests(self, tests: Sequence[Test], arguments: List[str] = []) -> None:
+        """
+        Compiles the given tests using a pool of jobs workers. Tests sharing a source are
+        compiled once, into an executable named after the first of them. The build outcome of
+        each test is evaluated in the given order once its compilation is finished.
+        """
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            builds: Dict[int, Future] = {}
+            futures = []
+            for test in tests:
+                if test.build_outcome:
+                    logging.critical('Test %s has build outcome.', test.name)
+                    continue
+
+                if id(test.source) not in builds:
+                    builds[id(test.source)] = pool.submit(self.compile_test, test, arguments)
+
+                futures.append((test, builds[id(test.source)]))
+
+            try:
+                for test, future in futures:
+                    self.evaluate_build(test, future.result())
+
+            except FileNotFoundError:
+                for future in builds.values():
+                    future.cancel()
+
+                raise
+
+    def build_test(self, test: Test, arguments: List[str] = []) -> None:
         if test.build_outcome:
             logging.critical('Test %s has build outcome.', test.name)
             return
 
-        # output source file
-        test_filename = self._test_directory / (test.name + '.c')
-        test.source.write(Path(test_filename))
+        self.evaluate_build(test, self.compile_test(test, arguments))
+
+    def compile_test(self, test: Test, arguments: List[str] = []) -> BuildResult:
+        """
+        Writes the source of the test and compiles it, unless the build cache holds the outcome.
+        This method does not modify the test and is safe to call from multiple threads.
+        """
+
+        if self._resident(test):
+            return self.compile_source(test.name, repr(test.source),
+                                       arguments + self._runner.compile_arguments,  # type: ignore
+                                       f'{test.name}.so')
 
-        # create executable command
-        executable_filename = self.test_directory / test.name
-        command = [self._mpicc, str(test_filename)] + arguments + ["-o", str(executable_filename)]
+        return self.compile_source(test.name, repr(test.source), arguments)
+
+    def compile_source(self,
+                       name: str,
+                       source: str,
+                       arguments: List[str] = [],
+                       executable: Optional[str] = None) -> BuildResult:
+        """
+        Writes the source under the given name and compiles it into the executable, named after
+        the source by default, unless the build cache holds the outcome. This method is safe to
+        call from multiple threads.
+        """
+
+        directory = self._scratch if self._scratch is not None else self.test_directory
+        executable_filename = directory / (executable or name)
+
+        self._artifact(executable_filename)
+
+        if self._cache is not None:
+            key = self._cache.key([source,
+                                   self._toolchain.mpicc_path,  # type: ignore
+                                   self._toolchain.mpicc_version] + arguments)  # type: ignore
+
+            cached = self._cache.load(key, executable_filename)
+            if cached is not None:
+                logging.debug('using cached build of %s', name)
+
+                return BuildResult(executable_filename, *cached)
+
+        # never write through a link into the cache
+        if executable_filename.exists():
+            executable_filename.unlink()
+
+        output = ["-o", str(executable_filename)]
+
+        if self._in_memory:
+            command = [self._mpicc, '-x', 'c', '-'] + arguments + output
+
+            # the source is persisted for inspection only
+            if self._keep:
+                with Profiler().phase('write source'):
+                    (self._test_directory / (name + '.c')).write_text(source)
+
+        else:
+            # output source file
+            test_filename = self._test_directory / (name + '.c')
+            with Profiler().phase('write source'):
+                test_filename.write_text(source)
+            self._artifact(test_filename)
+
+            command = [self._mpicc, str(test_filename)] + arguments + output
 
         logging.debug('executing: %s', ' '.join(command))
 
         # execute command
         try:
-            process = Popen(command, stdout=PIPE, stderr=PIPE, text=True)  # type: ignore
-            stdout, stderr = process.communicate()
+            with Profiler().phase('build'):
+                _, stdout, stderr, timed_out, usage = self._communicate(command,
+                                                                        self._build_timeout,
+                                                                        source=source
+                                                                        if self._in_memory
+                                                                        else None)
 
         except FileNotFoundError as error:
-            logging.error('Test %s failed to build, due to missing mpicc.', test.name)
+            logging.error('Test %s failed to build, due to missing mpicc.', name)
 
             raise error
 
-        # evaluate build result
-        logging.debug('build stdout:\n%s\n', stdout)
-        logging.debug('build stderr:\n%s\n', stderr)
+        if self._cache is not None and not timed_out:
+            built = not stdout and not stderr and executable_filename.exists()
+            self._cache.store(key, executable_filename if built else None, stdout, stderr)
+
+        return BuildResult(executable_filename, stdout, stderr, timed_out, usage)
+
+    def _artifact(self, path: Path) -> None:
+        """
+        Records a file created for a test, which is removed on close unless artifacts are kept.
+        """
+
+        if not self._keep:
+            with self._artifacts_lock:
+                self._artifacts.add(path)
+
+    def _communicate(self,
+                     command: List[str],
+                     timeout: Optional[float],
+                     consume: Optional[Callable[[str], None]] = None,
+                     source: Optional[str] = None) -> Tuple[int, str, str, bool,
+                                                            Optional[ResourceUsage]]:
+        """
+        Executes the command in its own process group with the resource limits applied. If the
+        timeout expires the whole process group is killed. Provides the return code, stdout,
+        stderr, whether the timeout expired and the resources the command and the descendants it
+        waited for used. If consume is given, stdout is passed to it
+        while the command is running instead of being provided, and stderr is bounded. If
+        source is given, it is written to stdin of the command.
+        """
+
+        started = time.monotonic()
+        process = Popen(self._limited(command),
+                        stdin=PIPE if source is not None else None,
+                        stdout=PIPE,
+                        stderr=PIPE,
+                        start_new_session=True)
+
+        # stderr is only bounded alongside consumed stdout
+        stdout: List[str] = []
+        stderr = BoundedOutput(self.max_output if consume is not None else sys.maxsize)
+
+        timed_out = self._stream(process,
+                                 command,
+                                 timeout,
+                                 consume if consume is not None else stdout.append,
+                                 stderr.append,
+                                 source)
+
+        usage = self._reap(process, started)
+
+        return process.returncode, ''.join(stdout), str(stderr), timed_out, usage
+
+    def _stream(self,
+                process: Popen,
+                command: List[str],
+                timeout: Optional[float],
+                consume: Callable[[str], None],
+                errors: Callable[[str], None],
+                source: Optional[str] = None) -> bool:
+        """
+        Writes the source to stdin of the process and passes stdout and stderr of the process
+        to consume and errors as they are produced, until the process closes both. Provides
+        whether the timeout expired.
+        """
+
+        sinks = {process.stdout: (codecs.getincrementaldecoder('utf-8')('replace'), consume),
+                 process.stderr: (codecs.getincrementaldecoder('utf-8')('replace'), errors)}
+        pending = memoryview(source.encode()) if source is not None else None
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        timed_out = False
+
+        with selectors.DefaultSelector() as selector:
+            for stream in sinks:
+                selector.register(stream, selectors.EVENT_READ)
+
+            if pending is not None:
+                selector.register(process.stdin, selectors.EVENT_WRITE)
+
+            while selector.get_map():
+                remaining = None
+                if deadline is not None and not timed_out:
+                    remaining = deadline - time.monotonic()
+
+                    if remaining <= 0:
+                        self._kill(process, command, timeout)
+                        timed_out = True
+                        remaining = None
+
+                for key, _ in selector.select(remaining):
+                    if key.fileobj is process.stdin:
+                        try:
+                            # a write of PIPE_BUF bytes to a writable pipe does not block
+                            written = os.write(key.fd, pending[:select.PIPE_BUF])  # type: ignore
+
+                        except BrokenPipeError:
+                            written = len(pending)  # type: ignore
 
-        if not stdout and not stderr:
-            # set executable on test
-            test.executable = Path(executable_filename)
+                        pending = pending[written:]  # type: ignore
+                        if not pending:
+                            selector.unregister(key.fileobj)
+                            key.fileobj.close()  # type: ignore
+
+                        continue
+
+                    decoder, sink = sinks[key.fileobj]  # type: ignore
+                    data = os.read(key.fd, 64 * 1024)
+
+                    if not data:
+                        selector.unregister(key.fileobj)
+
+                    sink(decoder.decode(data, final=not data))
+
+        for stream in sinks:
+            stream.close()  # type: ignore
+
+        return timed_out
+
+    def _reap(self, process: Popen, started: float) -> Optional[ResourceUsage]:
+        """
+        Waits for the process with wait4 and sets its return code. Provides the resources the
+        process and the descendants it waited for used, measured since started.
+        """
+
+        try:
+            _, status, usage = os.wait4(process.pid, 0)
 
-            test.build_success_function()
+        except ChildProcessError:
+            process.wait()
+            return None
 
-            logging.debug('building test %s successful\n%s\n', test.name, '-' * 80)
+        if os.WIFSIGNALED(status):
+            process.returncode = -os.WTERMSIG(status)
 
         else:
-            test.build_fail_function()
+            process.returncode = os.WEXITSTATUS(status)
+
+        # the peak resident set size is in kilobytes on Linux, in bytes on macOS
+        scale = 1 if sys.platform == 'darwin' else 1024
+
+        return ResourceUsage(time.monotonic() - started,
+                             usage.ru_utime,
+                             usage.ru_stime,
+                             usage.ru_maxrss * scale)
+
+    def _kill(self, process: Popen, command: List[str], timeout: Optional[float]) -> None:
+        """
+        Kills the process group of the process after its timeout expired.
+        """
+
+        logging.warning('killing "%s" after %s seconds.', ' '.join(command), timeout)
+
+        try:
+            # the session leader is the group leader, this includes all launched children
+            os.killpg(process.pid, signal.SIGKILL)
+
+        except ProcessLookupError:
+            pass
+
+    def _limited(self, command: List[str]) -> List[str]:
+        """
+        Provides the command with the resource limits applied by a shell, which then executes
+        it. A preexec_fn is not used, since it is unsafe while builds and runs are started from
+        multiple threads.
+        """
+
+        limits = []
+        if self._cpu_limit is not None:
+            limits.append(f'ulimit -t {self._cpu_limit}')
+
+        if self._memory_limit is not None:
+            limits.append(f'ulimit -v {self._memory_limit // 1024}')
+
+        if not limits:
+            return command
+
+        # the shell reports a missing command by its exit status only
+        if shutil.which(command[0]) is None:
+            raise FileNotFoundError(f'No such file or directory: {command[0]}')
+
+        return ['sh', '-c', '; '.join(limits + ['exec "$@"']), 'lemonspotter'] + command
+
+    def run_tests(self, tests: Sequence[Test], arguments: List[str] = []) -> None:
+        """
+        Runs the given tests concurrently. Tests are packed onto the available cores, largest
+        process count first, and a test is only launched once enough cores are free for all of
+        its processes. The run outcome of each test is evaluated in the given order.
+        """
+
+        pending: List[Test] = []
+        for test in tests:
+            if self.runnable(test):
+                pending.append(test)
+
+        resident = [test for test in pending if self._resident(test)]
+        pending = [test for test in pending if test not in resident]
 
-            logging.warning('building failed of test %s', test.name)
+        pending.sort(key=lambda test: (-test.processes, test.name))
+
+        condition = Condition()
+        available = [self.cores]
+
+        def release(test: Test, _) -> None:
+            with condition:
+                available[0] += test.processes
+                condition.notify()
+
+        futures = {}
+        with ThreadPoolExecutor(max_workers=self.cores) as pool:
+            # the resident runner is a single process executing its tests one after another
+            if resident:
+                available[0] -= 1
+
+                future = pool.submit(self.launch_resident, resident, arguments)
+                future.add_done_callback(lambda _: release(resident[0], None))
+                futures.update(dict.fromkeys(resident, future))
+
+            while pending:
+                with condition:
+                    test = next((test for test in pending if test.processes <= available[0]),
+                                None)
+
+                    if test is None:
+                        condition.wait()
+                        continue
+
+                    pending.remove(test)
+                    available[0] -= test.processes
+
+                future = pool.submit(self.launch_test, test, arguments)
+                future.add_done_callback(partial(release, test))
+                futures[test] = future
+
+        for test in tests:
+            if test in futures:
+                result = futures[test].result()
+
+                if isinstance(result, Mapping):
+                    result = result.get(test)
+
+                if result is not None:
+                    self.evaluate_run(test, result)
 
     def run_test(self, test: Test, arguments: List[str] = []) -> None:
         """
+        Runs a single test and evaluates its outcome.
         """
 
-        # todo test should define how many processes it needs
-        # todo check it is <= available with current run
-        # todo testgenerators should not generate any tests with more
-        arguments = ['-n', '1']
+        if self.runnable(test):
+            result = self.launch(test, arguments)
 
-        # check if valid test
-        if test.type is TestType.BUILD_ONLY:
-            logging.info('skip running test %s due to BUILD_ONLY', test.name)
+            if result is not None:
+                self.evaluate_run(test, result)
 
-        elif test.run_outcome:
-            logging.critical('Test %s has run outcome.', test.name)
-            return
+    def launch(self, test: Test, arguments: List[str] = []) -> Optional[RunResult]:
+        """
+        Launches a single test, by the resident runner if the test is executed by it. This
+        method does not modify the test and is safe to call from multiple threads.
+        """
 
-        else:
-            logging.debug('preparing test %s.', test.name)
+        if self._resident(test):
+            return self.launch_resident([test], arguments).get(test)
 
-            # create command
-            command = [self._mpiexec] + arguments + [str(test.executable)]
+        return self.launch_test(test, arguments)
 
-            # run test executable
-            logging.debug('executing "%s"', ' '.join(command))
-            try:
-                process = Popen(command, stdout=PIPE, stderr=PIPE, text=True)  # type: ignore
-                stdout, stderr = process.communicate()
-            except FileNotFoundError as error:
-                logging.error(error)
-                logging.error('skip running test %s', test.name)
-                return
+    def _resident(self, test: Test) -> bool:
+        """
+        Checks whether the test is executed by the resident runner. The runner has initialized
+        MPI before it executes a test, so tests calling any function of the database are
+        launched individually. Tests starting with the initiator initialize MPI themselves, and
+        independent functions are tested in the state before initialization.
+        """
+
+        if (self._runner is None or
+                test.type is not TestType.BUILD_AND_RUN or
+                test.processes != 1 or
+                test.source is None):
+            return False
 
-            logging.debug('run stdout:\n%s\n', stdout)
-            logging.debug('run stderr:\n%s\n', stderr)
+        return not any(Database().has_function(name)
+                       for name in test.source.called_functions())
 
-            # test run check
-            if not stderr and process.returncode == 0:
-                # filter for captures
-                for line in stdout.split('\n'):
-                    if line:
-                        tokens = line.split()
+    def launch_test(self, test: Test, arguments: List[str] = []) -> Optional[RunResult]:
+        """
+        Launches the executable of the test with as many processes as the test requires, passing
+        the entry of the test if it has one. This method does not modify the test and is safe to
+        call from multiple threads.
+        """
 
-                        variable = test.source.get_variable(tokens[0])
-                        if variable:
-                            # currently only supports key-value captures
-                            variable.value = tokens[1]
-                            logging.debug('captured %s = %s', variable.name, tokens[1])
-                            logging.debug('executor variable %s', str(variable))
+        logging.debug('preparing test %s.', test.name)
 
-                        else:
-                            logging.warning('capturing %s, but no variable found.', tokens[0])
+        # create command
+        command = ([self._mpiexec, '-n', str(test.processes)] + arguments +
+                   [str(test.executable)])
 
-                # call success function
-                test.run_success_function()
-                logging.info('running test %s successful\n%s\n', test.name, '#'*80)
+        if test.entry is not None:
+            command.append(test.entry)
 
-                return
+        # run test executable
+        logging.debug('executing "%s"', ' '.join(command))
+        # the last capture of a variable of each rank is kept
+        captures: Dict[Tuple[int, str], Capture] = {}
+        output = BoundedOutput(self.max_output)
+
+        def capture(captured: Capture) -> None:
+            captures[(captured.rank, captured.name)] = captured
+
+        parser = CaptureParser(capture, output.append)
+
+        try:
+            with Profiler().phase('run'):
+                returncode, _, stderr, timed_out, usage = self._communicate(command,
+                                                                            self._run_timeout,
+                                                                            parser.feed)
+
+        except FileNotFoundError as error:
+            logging.error(error)
+            logging.error('skip running test %s', test.name)
+            return None
+
+        return RunResult(returncode, str(output), stderr, timed_out, tuple(captures.values()),
+                         usage)
+
+    def launch_resident(self,
+                        tests: Sequence[Test],
+                        arguments: List[str] = []) -> Mapping[Test, RunResult]:
+        """
+        Launches the resident runner, which executes the shared objects of the given tests one
+        after another in a single MPI process. This method does not modify the tests and is safe
+        to call from multiple threads.
+        """
+
+        if self._runner is None:
+            raise RuntimeError('Executor has no resident runner.')
+
+        command = ([self._mpiexec, '-n', '1'] + arguments +
+                   self._runner.command(tests, self._run_timeout))
+
+        # every test is limited by the runner, this only catches a hanging runner
+        timeout = None
+        if self._run_timeout is not None:
+            timeout = self._run_timeout * (len(tests) + 1)
+
+        output = self._runner.output(tests, self.max_output)
+
+        logging.debug('executing "%s"', ' '.join(command))
+        try:
+            with Profiler().phase('run'):
+                _, _, stderr, _, _ = self._communicate(command, timeout, output.feed)
+
+        except FileNotFoundError as error:
+            logging.error(error)
+            logging.error('skip running %i resident tests', len(tests))
+            return {}
+
+        logging.debug('resident runner stderr:\n%s\n', stderr)
 
-            elif process.returncode > 0:
-                logging.critical('test crashed with errorcode %i', process.returncode)
+        results = output.results(RunResult)
 
-            else:
-                logging.warning('test %s failed with internal error.', test.name)
+        if not self._keep:
+            self._runner.remove(tests)
 
-            test.run_fail_function()
+        return results
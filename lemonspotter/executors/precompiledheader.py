@@ -0,0 +1,136 @@
+"""
+This module contains the PrecompiledHeader class, which precompiles the headers every test
+includes.
+
+The header is precompiled once per toolchain and reused by every test compile. GCC style
+precompiled headers are picked up implicitly through -include, Clang style precompiled headers
+are passed with -include-pch. If neither is supported tests are compiled without.
+"""
+
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+from lemonspotter.executors.toolchain import Toolchain
+
+
+class PrecompiledHeader:
+    """
+    This class builds a precompiled header of the given headers and provides the compile
+    arguments which make a compiler use it.
+    """
+
+    header_filename: str = 'frame.h'
+
+    def __init__(self, toolchain: Toolchain, directory: Path, headers: Sequence[str]) -> None:
+        self._toolchain = toolchain
+        self._headers = headers
+
+        self._base_directory: Path = directory
+        self._arguments: List[str] = []
+        self._prepared: bool = False
+
+    @property
+    def _directory(self) -> Path:
+        """This property provides the directory of the precompiled header of the toolchain."""
+
+        headers = hashlib.sha256('\n'.join(self._headers).encode()).hexdigest()[:16]
+
+        return self._base_directory / f'{self._toolchain.identity}-{headers}'  # type: ignore
+
+    @property
+    def header(self) -> Path:
+        """This property provides the path of the header which is precompiled."""
+
+        return self._directory / self.header_filename
+
+    def prepare(self) -> List[str]:
+        """
+        Precompiles the header, unless it has been precompiled by a previous run, and provides
+        the compile arguments using it. An empty list is provided if the compiler does not
+        support precompiled headers.
+        """
+
+        if self._prepared:
+            return self._arguments
+
+        self._prepared = True
+        self._directory.mkdir(parents=True, exist_ok=True)
+
+        header = ''.join(f'#include <{header}>\n' for header in self._headers)
+        if not self.header.exists() or self.header.read_text() != header:
+            self.header.write_text(header)
+
+        for suffix, arguments, marker in self._candidates():
+            try:
+                if self._precompile(suffix) and self._probe(arguments, marker):
+                    logging.info('using precompiled header %s%s', self.header, suffix)
+                    self._arguments = arguments
+
+                    return self._arguments
+
+            except FileNotFoundError as error:
+                logging.warning('precompiling header failed: %s', error)
+                break
+
+        logging.info('compiler does not support precompiled headers, continuing without.')
+
+        return self._arguments
+
+    def _candidates(self) -> Sequence[Tuple[str, List[str], str]]:
+        """
+        Provides the precompiled header suffix, the arguments to use it and the marker in the
+        -H output showing that it was used, for all supported compiler styles.
+        """
+
+        return (('.gch', ['-include', str(self.header)], f'! {self.header}.gch'),
+                ('.pch', ['-include-pch', f'{self.header}.pch'], ''))
+
+    def _precompile(self, suffix: str) -> bool:
+        """
+        Precompiles the header into the file with the given suffix.
+        """
+
+        output = Path(f'{self.header}{suffix}')
+        if output.exists() and output.stat().st_mtime >= self.header.stat().st_mtime:
+            return True
+
+        # -c avoids compiler wrappers appending link arguments
+        returncode, stdout, stderr = self._toolchain.compile(['-c', '-x', 'c-header',
+                                                              str(self.header),
+                                                              '-o', str(output)])
+
+        if returncode != 0 or not output.exists():
+            logging.debug('precompiling %s failed:\n%s%s', output, stdout, stderr)
+
+            if output.exists():
+                output.unlink()
+
+            return False
+
+        return True
+
+    def _probe(self, arguments: Sequence[str], marker: str) -> bool:
+        """
+        Compiles a program including the frame headers with the given arguments and checks that
+        it compiles cleanly and, if a marker is given, that the precompiled header was used.
+        """
+
+        probe = self._directory / 'probe.c'
+        probe.write_text(f'#include "{self.header_filename}"\n'
+                         'int main(void)\n{\n\treturn 0;\n}\n')
+
+        command = list(arguments) + ['-c', str(probe), '-o', str(probe.with_suffix('.o'))]
+        if marker:
+            command.append('-H')
+
+        returncode, stdout, stderr = self._toolchain.compile(command)
+
+        if returncode != 0:
+            return False
+
+        if marker:
+            return marker in stderr.splitlines()
+
+        return not stdout and not stderr
@@ -0,0 +1,348 @@
+"""
+This module contains the ResidentRunner, a long lived MPI process which executes tests compiled
+to shared objects.
+
+The runner initializes MPI once. For every test it forks a child, which loads the shared object
+and calls its entry function, so that a crashing test does not take down the runner. The main
+function of a test is renamed to the entry function at compile time. Tests which call MPI
+functions are not run by the resident runner, they would observe the runner's initialization.
+"""
+
+import math
+import signal
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from lemonspotter.core.test import Test
+from lemonspotter.executors.capture import Capture, CaptureParser, BoundedOutput
+from lemonspotter.executors.toolchain import Toolchain
+
+
+T = TypeVar('T')
+
+
+RUNNER_SOURCE = r'''
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <dlfcn.h>
+#include <sys/wait.h>
+#include <mpi.h>
+
+typedef int (*entry_function)(int, char **);
+
+int main(int argument_count, char **argument_list)
+{
+    char path[4096];
+    char error_path[4096];
+    int index = 0;
+
+    if(argument_count != 3)
+    {
+        fprintf(stderr, "usage: %s timeout test_list\n", argument_list[0]);
+        return 2;
+    }
+
+    unsigned int timeout = (unsigned int) atoi(argument_list[1]);
+    FILE *tests = fopen(argument_list[2], "r");
+
+    if(tests == NULL)
+    {
+        perror("opening test list");
+        return 2;
+    }
+
+    if(MPI_Init(&argument_count, &argument_list) != MPI_SUCCESS)
+    {
+        return 3;
+    }
+
+    while(fgets(path, sizeof(path), tests) != NULL)
+    {
+        path[strcspn(path, "\n")] = '\0';
+
+        if(path[0] == '\0')
+        {
+            continue;
+        }
+
+        /* an entry of a shared source follows the path */
+        char *entry_name = strchr(path, '\t');
+
+        if(entry_name != NULL)
+        {
+            *entry_name = '\0';
+            entry_name++;
+        }
+
+        snprintf(error_path, sizeof(error_path), "%s.%d.stderr", argument_list[2], index);
+
+        printf("\x1e" "0|@@MARKER@@|begin|%d\x1f\n", index);
+        fflush(stdout);
+
+        index++;
+
+        pid_t pid = fork();
+
+        if(pid == 0)
+        {
+            int errors = open(error_path, O_WRONLY | O_CREAT | O_TRUNC, 0644);
+
+            if(errors >= 0)
+            {
+                dup2(errors, STDERR_FILENO);
+                close(errors);
+            }
+
+            alarm(timeout);
+
+            void *handle = dlopen(path, RTLD_NOW | RTLD_LOCAL);
+
+            if(handle == NULL)
+            {
+                fprintf(stderr, "%s\n", dlerror());
+                _exit(127);
+            }
+
+            entry_function entry = (entry_function) dlsym(handle, "@@ENTRY@@");
+
+            if(entry == NULL)
+            {
+                fprintf(stderr, "%s\n", dlerror());
+                _exit(127);
+            }
+
+            char *arguments[] = {path, entry_name, NULL};
+            int code = entry(entry_name != NULL ? 2 : 1, arguments);
+
+            fflush(stdout);
+            _exit(code);
+        }
+
+        int status = 0;
+        int code = -1;
+        int terminated = 0;
+
+        if(pid < 0)
+        {
+            perror("fork");
+        }
+        else if(waitpid(pid, &status, 0) == pid)
+        {
+            if(WIFEXITED(status))
+            {
+                code = WEXITSTATUS(status);
+            }
+            else if(WIFSIGNALED(status))
+            {
+                terminated = WTERMSIG(status);
+            }
+        }
+
+        printf("\x1e" "0|@@MARKER@@|end|%d %d\x1f\n", code, terminated);
+        fflush(stdout);
+    }
+
+    fclose(tests);
+
+    MPI_Finalize();
+
+    return 0;
+}
+'''
+
+
+class ResidentRunner:
+    """
+    This class builds the resident runner once per toolchain and executes tests compiled to
+    shared objects with it.
+    """
+
+    entry: str = 'lemonspotter_test_entry'
+    # a capture name which is not a C identifier
+    marker: str = '@runner'
+
+    def __init__(self, toolchain: Toolchain, directory: Path) -> None:
+        self._toolchain = toolchain
+        self._base_directory = directory
+
+        self._executable: Optional[Path] = None
+        self._prepared: bool = False
+
+    @property
+    def compile_arguments(self) -> List[str]:
+        """
+        This property provides the arguments which compile a test into a loadable shared object.
+        """
+
+        return ['-shared', '-fPIC', f'-Dmain={self.entry}']
+
+    def prepare(self) -> Optional[Path]:
+        """
+        Builds the runner, unless it has been built by a previous run, and provides its path.
+        None is provided if the runner cannot be built.
+        """
+
+        if self._prepared:
+            return self._executable
+
+        self._prepared = True
+
+        directory = self._base_directory / self._toolchain.identity  # type: ignore
+        directory.mkdir(parents=True, exist_ok=True)
+
+        source = (RUNNER_SOURCE.replace('@@MARKER@@', self.marker)
+                               .replace('@@ENTRY@@', self.entry))
+
+        source_path = directory / 'runner.c'
+        executable = directory / 'runner'
+
+        if (executable.exists() and source_path.exists() and
+                source_path.read_text() == source):
+            self._executable = executable
+            return self._executable
+
+        source_path.write_text(source)
+
+        try:
+            returncode, stdout, stderr = self._toolchain.compile([str(source_path),
+                                                                  '-o', str(executable),
+                                                                  '-ldl'])
+
+        except FileNotFoundError as error:
+            logging.error('building resident runner failed: %s', error)
+            return None
+
+        if returncode != 0:
+            logging.error('building resident runner failed:\n%s%s', stdout, stderr)
+            return None
+
+        self._executable = executable
+
+        return self._executable
+
+    def command(self, tests: Sequence[Test], timeout: Optional[float]) -> List[str]:
+        """
+        Writes the list of shared objects to execute and provides the arguments of the runner.
+        """
+
+        if self._executable is None:
+            raise RuntimeError('Resident runner is not prepared.')
+
+        listing = self._listing(tests)
+        listing.write_text(''.join(f'{test.executable}\t{test.entry}\n'
+                                   if test.entry is not None else f'{test.executable}\n'
+                                   for test in tests))
+
+        seconds = math.ceil(timeout) if timeout is not None else 0
+
+        return [str(self._executable), str(seconds), str(listing)]
+
+    def remove(self, tests: Sequence[Test]) -> None:
+        """
+        Removes the list of shared objects and the error output of the given tests, once their
+        output has been parsed.
+        """
+
+        listing = self._listing(tests)
+        files = [listing] + [Path(f'{listing}.{index}.stderr') for index in range(len(tests))]
+
+        for path in files:
+            if path.exists():
+                path.unlink()
+
+    def _listing(self, tests: Sequence[Test]) -> Path:
+        """
+        Provides the path of the list of shared objects of the given tests.
+        """
+
+        return self._base_directory / f'tests_{tests[0].name}_{len(tests)}.list'
+
+    def output(self, tests: Sequence[Test], max_output: int) -> 'ResidentOutput':
+        """
+        Provides the parser of the runner output of the given tests.
+        """
+
+        return ResidentOutput(self, tests, self._listing(tests), max_output)
+
+
+class ResidentOutput:
+    """
+    This class splits the runner output into the outcome of every test while the runner is
+    running. The runner marks the start and end of every test with captures of the marker name.
+    """
+
+    def __init__(self,
+                 runner: ResidentRunner,
+                 tests: Sequence[Test],
+                 listing: Path,
+                 max_output: int) -> None:
+        self._runner = runner
+        self._tests = tests
+        self._listing = listing
+        self._max_output = max_output
+
+        self._parser = CaptureParser(self._capture, self._output)
+
+        self._index: Optional[int] = None
+        self._captures: Dict[Tuple[int, str], Capture] = {}
+        self._output_text = BoundedOutput(max_output)
+
+        self._outcomes: Dict[Test, Tuple[int, str, str, bool, Tuple[Capture, ...]]] = {}
+
+    def feed(self, text: str) -> None:
+        """Parses the next piece of runner output."""
+
+        self._parser.feed(text)
+
+    def _output(self, text: str) -> None:
+        if self._index is not None:
+            self._output_text.append(text)
+
+    def _capture(self, capture: Capture) -> None:
+        if capture.name != self._runner.marker:
+            if self._index is not None:
+                self._captures[(capture.rank, capture.name)] = capture
+
+            return
+
+        if capture.type == 'begin':
+            index = int(capture.value)
+
+            self._index = index if 0 <= index < len(self._tests) else None
+            self._captures = {}
+            self._output_text = BoundedOutput(self._max_output)
+
+        elif capture.type == 'end' and self._index is not None:
+            code, terminated = (int(value) for value in capture.value.split())
+
+            errors = Path(f'{self._listing}.{self._index}.stderr')
+            stderr = errors.read_text() if errors.exists() else ''
+
+            returncode = code if not terminated else -terminated
+            timed_out = terminated == signal.SIGALRM
+
+            self._outcomes[self._tests[self._index]] = (returncode,
+                                                        str(self._output_text),
+                                                        stderr,
+                                                        timed_out,
+                                                        tuple(self._captures.values()))
+            self._index = None
+
+    def results(self, result: Callable[..., T]) -> Mapping[Test, T]:
+        """
+        Provides the outcome of every test, constructed by result from the return code, the
+        uncaptured output, the error output, whether it timed out and the captures. Tests
+        without an outcome, for example because the runner itself failed, are given the return
+        code -1.
+        """
+
+        for test in self._tests:
+            if test not in self._outcomes:
+                logging.error('resident runner gave no outcome for test %s.', test.name)
+                self._outcomes[test] = (-1, '', 'no outcome from resident runner', False, ())
+
+        return {test: result(*outcome) for test, outcome in self._outcomes.items()}
@@ -0,0 +1,253 @@
+"""
+This module contains the Toolchain class which queries the MPI compiler wrapper and launcher.
+"""
+
+import re
+import hashlib
+import logging
+import shlex
+import shutil
+from functools import lru_cache
+from pathlib import Path
+from subprocess import Popen, PIPE
+from typing import Optional, Sequence, Tuple, AbstractSet
+
+
+class Toolchain:
+    """
+    This class represents the MPI compiler wrapper and launcher used to build and run tests.
+    Queries to the toolchain are performed once and cached.
+    """
+
+    # nm symbol types of exported functions, including weak and indirect functions
+    function_symbol_types: AbstractSet[str] = frozenset({'T', 'W', 'i'})
+
+    def __init__(self, mpicc: str, mpiexec: str, nm: str = 'nm') -> None:
+        self._mpicc = mpicc
+        self._mpiexec = mpiexec
+        self._nm = nm
+
+    @property
+    def mpicc(self) -> str:
+        """This property provides the MPI compiler wrapper command."""
+
+        return self._mpicc
+
+    @property
+    def mpiexec(self) -> str:
+        """This property provides the MPI launcher command."""
+
+        return self._mpiexec
+
+    @property  # type: ignore
+    @lru_cache()
+    def mpicc_path(self) -> str:
+        """This property provides the resolved path of the MPI compiler wrapper."""
+
+        return shutil.which(self._mpicc) or self._mpicc
+
+    @property  # type: ignore
+    @lru_cache()
+    def mpicc_version(self) -> str:
+        """This property provides the version output of the MPI compiler wrapper."""
+
+        return self._query([self._mpicc, '--version'])
+
+    @property  # type: ignore
+    @lru_cache()
+    def identity(self) -> str:
+        """
+        This property provides a short hash identifying the MPI compiler wrapper, for artifacts
+        which are built once per toolchain.
+        """
+
+        identity = hashlib.sha256('\n'.join([self.mpicc_path,  # type: ignore
+                                             self.mpicc_version]).encode())  # type: ignore
+
+        return identity.hexdigest()[:16]
+
+    @property  # type: ignore
+    @lru_cache()
+    def fingerprint(self) -> Optional[str]:
+        """
+        This property provides a short hash identifying the MPI library, made from the paths of
+        the compiler wrapper and the launcher, the underlying compiler command line and the
+        contents of the linked shared libraries and of mpi.h. None is provided if the compiler
+        wrapper or the launcher cannot be found or the version cannot be queried, since all
+        such toolchains would share a fingerprint.
+        """
+
+        mpiexec_path = shutil.which(self._mpiexec)
+
+        for command, path in ((self._mpicc, shutil.which(self._mpicc)),
+                              (self._mpiexec, mpiexec_path)):
+            if path is None:
+                logging.warning('%s not found, the MPI library cannot be identified.', command)
+                return None
+
+        if not self.mpicc_version.strip():  # type: ignore
+            logging.warning('version of %s unknown, the MPI library cannot be identified.',
+                            self._mpicc)
+            return None
+
+        parts = [self.mpicc_path,  # type: ignore
+                 mpiexec_path,
+                 self.mpicc_version,  # type: ignore
+                 ' '.join(self.wrapper_command)]  # type: ignore
+
+        files = list(self.libraries)  # type: ignore
+        if self.header is not None:
+            files.append(self.header)
+
+        for path in files:
+            parts.append(f'{path} {hashlib.sha256(path.read_bytes()).hexdigest()}')
+
+        return hashlib.sha256('\n'.join(parts).encode()).hexdigest()[:16]
+
+    @property  # type: ignore
+    @lru_cache()
+    def header(self) -> Optional[Path]:
+        """
+        This property provides the path of the mpi.h the MPI compiler wrapper includes, None if
+        it cannot be found.
+        """
+
+        # the line markers of the preprocessor name the included files
+        for match in re.finditer(r'^# \d+ "([^"]*/mpi\.h)"',
+                                 self.preprocess('#include <mpi.h>\n'),
+                                 re.MULTILINE):
+            path = Path(match.group(1))
+
+            if path.is_file():
+                return path.resolve()
+
+        logging.info('mpi.h of the compiler wrapper not found.')
+
+        return None
+
+    @property  # type: ignore
+    @lru_cache()
+    def wrapper_command(self) -> Sequence[str]:
+        """
+        This property provides the underlying compiler command line of the MPI compiler wrapper,
+        including the link arguments.
+        """
+
+        return tuple(shlex.split(self._query([self._mpicc, '-show'])))
+
+    @property  # type: ignore
+    @lru_cache()
+    def libraries(self) -> Sequence[Path]:
+        """
+        This property provides the resolved paths of the shared libraries the MPI compiler wrapper
+        links against.
+        """
+
+        command = self.wrapper_command
+        directories = [Path(argument[2:]) for argument in command  # type: ignore
+                       if argument.startswith('-L')]
+        names = [argument[2:] for argument in command  # type: ignore
+                 if argument.startswith('-l')]
+
+        libraries = []
+        for name in names:
+            filename = f'lib{name}.so'
+
+            candidates = [directory / filename for directory in directories]
+            # the compiler knows its default library search paths
+            candidates.append(Path(self._query([self._mpicc,
+                                                f'-print-file-name={filename}']).strip()))
+
+            for candidate in candidates:
+                if candidate.is_absolute() and candidate.is_file():
+                    libraries.append(candidate.resolve())
+                    break
+
+            else:
+                logging.info('shared library %s of the link line not found.', filename)
+
+        return tuple(dict.fromkeys(libraries))
+
+    def exported_functions(self) -> AbstractSet[str]:
+        """
+        Provides the names of all functions exported by the linked shared libraries, read from
+        their dynamic symbol tables in a single pass.
+        """
+
+        libraries = self.libraries
+        if not libraries:
+            return frozenset()
+
+        output = self._query([self._nm, '--dynamic', '--defined-only'] +
+                             [str(library) for library in libraries])  # type: ignore
+
+        functions = set()
+        for line in output.splitlines():
+            tokens = line.split()
+
+            if len(tokens) == 3 and tokens[1] in self.function_symbol_types:
+                # strip symbol versions
+                functions.add(tokens[2].split('@', 1)[0])
+
+        logging.debug('%i functions exported by %s', len(functions), str(libraries))
+
+        return frozenset(functions)
+
+    def preprocess(self, source: str) -> str:
+        """
+        Preprocesses the given source with the MPI compiler wrapper in a single pass, keeping the
+        macro definitions in the output.
+        """
+
+        command = [self._mpicc, '-E', '-dD', '-x', 'c', '-']
+        logging.debug('executing: %s', ' '.join(command))
+
+        try:
+            process = Popen(command,
+                            stdin=PIPE, stdout=PIPE, stderr=PIPE, text=True)  # type: ignore
+            stdout, stderr = process.communicate(source)
+
+        except FileNotFoundError as error:
+            logging.warning('preprocessing failed: %s', error)
+            return ''
+
+        if process.returncode != 0:
+            logging.warning('preprocessing failed:\n%s', stderr)
+            return ''
+
+        return stdout
+
+    def compile(self, arguments: Sequence[str]) -> Tuple[int, str, str]:
+        """
+        Invokes the MPI compiler wrapper with the given arguments and provides the return code,
+        stdout and stderr.
+        """
+
+        command = [self._mpicc] + list(arguments)
+        logging.debug('executing: %s', ' '.join(command))
+
+        process = Popen(command, stdout=PIPE, stderr=PIPE, text=True)  # type: ignore
+        stdout, stderr = process.communicate()
+
+        return process.returncode, stdout, stderr
+
+    def _query(self, command) -> str:
+        """
+        Executes a query command and provides its output. A failed query provides an empty string.
+        """
+
+        logging.debug('querying toolchain: %s', ' '.join(command))
+
+        try:
+            process = Popen(command, stdout=PIPE, stderr=PIPE, text=True)  # type: ignore
+            stdout, stderr = process.communicate()
+
+        except FileNotFoundError as error:
+            logging.warning('toolchain query failed: %s', error)
+            return ''
+
+        if process.returncode != 0:
+            logging.warning('toolchain query %s failed:\n%s', ' '.join(command), stderr)
+            return ''
+
+        return stdout + stderr
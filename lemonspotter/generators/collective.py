@@ -0,0 +1,165 @@
+"""
+This module defines the collective generator, which measures the scaling of collective
+operations over rank counts and message sizes.
+
+For every present collective operation a test is generated at every power of two rank count up
+to the number of cores. Each test sweeps the message sizes, the time of a single operation of
+each size is measured on the first rank between barriers of all ranks.
+"""
+
+import logging
+from typing import Iterable, Mapping, MutableSet, Sequence, Tuple
+
+from lemonspotter.core.test import Test, TestType, TestOutcome
+from lemonspotter.core.function import Function
+from lemonspotter.core.database import Database
+from lemonspotter.core.sample import FunctionSample
+from lemonspotter.core.sampler import Sampler
+from lemonspotter.core.variable import Variable
+from lemonspotter.core.statement import (MainDefinitionStatement,
+                                         BlockStatement,
+                                         FunctionStatement,
+                                         ReturnStatement)
+from lemonspotter.core.profiler import profiled
+from lemonspotter.generators.sweep import SweepGenerator, SWEEP
+
+
+class CollectiveGenerator(SweepGenerator):
+    """
+    Source code generator for the scaling of collective operations.
+    """
+
+    # datatype and call of every collective operation, the message size is the size of the
+    # contribution of every rank
+    collectives: Mapping[str, Tuple[str, str]] = {
+        'MPI_Bcast': ('MPI_BYTE',
+                      'MPI_Bcast(lemonspotter_buffer, lemonspotter_count, {datatype}, 0, '
+                      'MPI_COMM_WORLD);'),
+        'MPI_Reduce': ('MPI_INT',
+                       'MPI_Reduce(lemonspotter_buffer, lemonspotter_result, lemonspotter_count, '
+                       '{datatype}, MPI_SUM, 0, MPI_COMM_WORLD);'),
+        'MPI_Allreduce': ('MPI_INT',
+                          'MPI_Allreduce(lemonspotter_buffer, lemonspotter_result, '
+                          'lemonspotter_count, {datatype}, MPI_SUM, MPI_COMM_WORLD);'),
+        'MPI_Allgather': ('MPI_BYTE',
+                          'MPI_Allgather(lemonspotter_buffer, lemonspotter_count, {datatype}, '
+                          'lemonspotter_result, lemonspotter_count, {datatype}, '
+                          'MPI_COMM_WORLD);'),
+        'MPI_Alltoall': ('MPI_BYTE',
+                         'MPI_Alltoall(lemonspotter_buffer, lemonspotter_count, {datatype}, '
+                         'lemonspotter_result, lemonspotter_count, {datatype}, '
+                         'MPI_COMM_WORLD);'),
+    }
+
+    def __init__(self,
+                 max_ranks: int,
+                 warmup: int = 10,
+                 repetitions: int = 100,
+                 min_size: int = 1,
+                 max_size: int = 1024**2) -> None:
+        """
+        Constructs the generator. The rank counts are the powers of two up to max_ranks, the
+        message sizes are the powers of two from min_size to max_size bytes.
+        """
+
+        super().__init__(warmup, repetitions, min_size, max_size)
+
+        if max_ranks < 1:
+            raise ValueError(f'Number of ranks needs to be at least 1, not {max_ranks}.')
+
+        self._max_ranks = max_ranks
+
+    @property
+    def ranks(self) -> Sequence[int]:
+        """This property provides the rank counts the collective operations are measured at."""
+
+        return tuple(1 << step for step in range(self._max_ranks.bit_length()))
+
+    @profiled('generate')
+    def generate(self, sampler: Sampler) -> Iterable[Test]:
+        """
+        Generate the scaling tests of every present collective operation at every rank count.
+        """
+
+        tests: MutableSet[Test] = set()
+
+        frame = self._frame_functions()
+        if frame is None:
+            logging.warning('no present initiator and finalizer, skip collective tests.')
+            return tests
+
+        start, end = frame
+
+        for name, (datatype, _) in sorted(self.collectives.items()):
+            if not (self._present(name) and self._present(datatype)):
+                logging.info('%s or %s is not present, skip collective tests.', name, datatype)
+                continue
+
+            function = Database().get_function(name)
+
+            for ranks in self.ranks:
+                # samples are rewritten when generating their source
+                samples = [self._first_sample(f, sampler) for f in (start, end)]
+
+                if None in samples:
+                    logging.warning('no samples of %s and %s, skip collective tests.',
+                                    start, end)
+                    return tests
+
+                tests.add(self._gen_scaling(function, ranks, *samples))  # type: ignore
+
+        return tests
+
+    def _gen_scaling(self,
+                     function: Function,
+                     ranks: int,
+                     start: FunctionSample,
+                     end: FunctionSample) -> Test:
+        """
+        Generate the C source code of the message size sweep of the collective operation with
+        the given number of ranks between the initiator and finalizer.
+        """
+
+        datatype, call = self.collectives[function.name]
+
+        source = self._generate_source_frame()
+
+        block_main = MainDefinitionStatement()
+        source.add_at_start(block_main)
+
+        start.generate_source(block_main, 'initialization for collective test')
+
+        curve = Variable(SWEEP, 'lemonspotter_scaling')
+
+        def operation(block: BlockStatement) -> None:
+            block.add_at_start(FunctionStatement(function.name, call.format(datatype=datatype)))
+
+        # every buffer holds the contributions of all ranks
+        self._generate_sweep(block_main, curve, datatype, self._max_size * ranks,
+                             ('lemonspotter_buffer', 'lemonspotter_result'), operation,
+                             'lemonspotter_elapsed / lemonspotter_iterations',
+                             'MPI_Barrier(MPI_COMM_WORLD);')
+
+        end.generate_source(block_main, 'finalization for collective test')
+
+        block_main.add_at_end(ReturnStatement('0'))
+
+        test = Test(f'scaling_{function.name}_{ranks}', TestType.BUILD_AND_RUN, source,
+                    processes=ranks)
+
+        def run_success():
+            values = None
+            if start.evaluator() and end.evaluator():
+                values = self.parse_sweep(curve.value)
+
+            if values is None:
+                test.run_outcome = TestOutcome.FAILED
+                logging.warning('%s test failed', test.name)
+
+            else:
+                test.run_outcome = TestOutcome.SUCCESS
+                function.properties.setdefault('scaling', {})[str(ranks)] = values
+
+        test.run_success_function = run_success
+
+        return test
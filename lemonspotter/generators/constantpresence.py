@@ -2,20 +2,25 @@
 This module defines the constant presence test generator.
 
 Tests whether a specific constant exists. No execution is required only building success or fail.
+
+Constants can also be tested in batches, where a single program declares and prints many
+constants. Batches which fail are bisected until every failing constant is tested on its own.
 """
 
 import logging
-from typing import Set
+from typing import Set, Dict, List, Sequence, Tuple
 
 from lemonspotter.core.database import Database
 from lemonspotter.core.test import Test, TestType, TestOutcome
 from lemonspotter.core.testgenerator import TestGenerator
 from lemonspotter.core.constant import Constant
 from lemonspotter.core.variable import Variable
+from lemonspotter.parsers.headerparser import HeaderParser
 from lemonspotter.core.statement import (DeclarationAssignmentStatement,
                                          FunctionStatement,
                                          MainDefinitionStatement,
                                          ReturnStatement)
+from lemonspotter.core.profiler import profiled
 
 
 class ConstantPresenceGenerator(TestGenerator):
@@ -23,6 +28,21 @@ class ConstantPresenceGenerator(TestGenerator):
     This TestGenerator generates tests which check existance and captures the value of a constant.
     """
 
+    def __init__(self) -> None:
+        super().__init__()
+
+        self._batches: Dict[Test, Sequence[Tuple[Constant, Test]]] = {}
+        self._batched_tests: List[Test] = []
+
+    @property
+    def batched_tests(self) -> Sequence[Test]:
+        """
+        This property provides the constant presence tests which are covered by batches.
+        """
+
+        return self._batched_tests
+
+    @profiled('generate')
     def generate(self) -> Set[Test]:
         """
         Generates all constant presence test objects for all constants in the database.
@@ -42,6 +62,182 @@ class ConstantPresenceGenerator(TestGenerator):
 
         return tests
 
+    # printf specifiers of which the output is the decimal value, with the bits of the value
+    decimal_specifiers: Dict[str, int] = {'d': 32, 'i': 32, 'ld': 64, 'lld': 64, 'hd': 16,
+                                          'hhd': 8}
+
+    def introspect(self, header: HeaderParser) -> int:
+        """
+        Resolves constants from a parsed header without generating tests. Constants defined as
+        macros or enumerators are present. Their value is assigned if it can be derived
+        statically or if the value is not captured at runtime anyway. All other constants remain
+        to be tested by building and running.
+        """
+
+        resolved = 0
+
+        for constant in Database().get_constants():
+            if constant.properties.get('presence_tested', False):
+                continue
+
+            if not header.defines(constant.name):
+                continue
+
+            if not constant.type.printable:
+                # presence is all a build only test determines
+                constant.properties['presence_tested'] = True
+                constant.properties['present'] = True
+
+                resolved += 1
+                continue
+
+            value = header.value(constant.name)
+            bits = self.decimal_specifiers.get(constant.type.print_specifier)
+
+            # a value out of range of the type is converted when printed at runtime
+            if value is None or bits is None or not -2**(bits - 1) <= value < 2**(bits - 1):
+                logging.debug('value of %s requires runtime evaluation.', constant.name)
+                continue
+
+            constant.properties['presence_tested'] = True
+            constant.properties['present'] = True
+            constant.properties['value'] = str(value)
+
+            if constant.defined:
+                constant.validate()
+
+            resolved += 1
+
+        logging.info('%i constants resolved from the header.', resolved)
+
+        return resolved
+
+    @profiled('generate')
+    def generate_batches(self, batch_size: int) -> Set[Test]:
+        """
+        Generates batch tests which each cover up to batch_size constants of the database. The
+        constant presence tests of the covered constants are driven by the batch tests.
+        """
+
+        if batch_size < 1:
+            raise ValueError(f'Batch size needs to be at least 1, not {batch_size}.')
+
+        constants = sorted(filter(lambda c: not c.properties.get('presence_tested', False),
+                                  Database().get_constants()),
+                           key=lambda c: c.name)
+
+        members = [(constant, self.generate_test(constant)) for constant in constants]
+        self._batched_tests.extend(test for _, test in members)
+
+        batches = set()
+        for start in range(0, len(members), batch_size):
+            batches.add(self.generate_batch(members[start:start + batch_size]))
+
+        return batches
+
+    def split_batch(self, batch: Test) -> Set[Test]:
+        """
+        Bisects a failed batch test into two batch tests. Batches covering a single constant
+        are not split.
+        """
+
+        members = self._batches[batch]
+        if len(members) < 2:
+            return set()
+
+        half = len(members) // 2
+
+        return {self.generate_batch(members[:half]), self.generate_batch(members[half:])}
+
+    def generate_batch(self, members: Sequence[Tuple[Constant, Test]]) -> Test:
+        """
+        Generates a Test which declares and prints all constants of the given presence tests.
+        The outcome of the batch is forwarded to the presence tests if it succeeds or if it
+        only covers a single constant.
+        """
+
+        first, _ = members[0]
+        logging.info('generating constant presence batch of %i from %s', len(members), first.name)
+
+        source = self._generate_source_frame()
+
+        block_main = MainDefinitionStatement()
+        source.add_at_start(block_main)
+
+        block_main.add_at_end(ReturnStatement('0'))
+
+        runnable = []
+        for constant, member in members:
+            variable = member.source.get_variable(f'variable_{constant.name}')
+            if variable is None:
+                raise RuntimeError(f'Test {member.name} does not declare the constant variable.')
+
+            block_main.add_at_start(DeclarationAssignmentStatement(variable,
+                                                                   f'declare {constant.name}'))
+
+            if member.type is TestType.BUILD_AND_RUN:
+                block_main.add_at_start(FunctionStatement.generate_print(variable))
+                runnable.append(member)
+
+        test = Test(f'constant_presence_batch_{first.name}_{len(members)}',
+                    TestType.BUILD_AND_RUN if runnable else TestType.BUILD_ONLY,
+                    source)
+
+        self._batches[test] = members
+        single = len(members) == 1
+
+        def build_fail():
+            if single:
+                members[0][1].build_fail_function()
+
+            test.build_outcome = TestOutcome.FAILED
+
+        test.build_fail_function = build_fail
+
+        def build_success():
+            # members of a bisected batch were built before, with the batch that failed to run
+            for _, member in members:
+                if not member.build_outcome:
+                    member.build_success_function()
+
+            test.build_outcome = TestOutcome.SUCCESS
+
+        test.build_success_function = build_success
+
+        def run_fail():
+            if single:
+                members[0][1].run_fail_function()
+
+            test.run_outcome = TestOutcome.FAILED
+
+        test.run_fail_function = run_fail
+
+        def build_timeout():
+            if single:
+                members[0][1].build_timeout_function()
+
+            test.build_outcome = TestOutcome.TIMEOUT
+
+        test.build_timeout_function = build_timeout
+
+        def run_timeout():
+            if single:
+                members[0][1].run_timeout_function()
+
+            test.run_outcome = TestOutcome.TIMEOUT
+
+        test.run_timeout_function = run_timeout
+
+        def run_success():
+            for member in runnable:
+                member.run_success_function()
+
+            test.run_outcome = TestOutcome.SUCCESS
+
+        test.run_success_function = run_success
+
+        return test
+
     def generate_test(self, constant: Constant) -> Test:
         """
         Generates a Test with a main statement and a variable with the assignment of
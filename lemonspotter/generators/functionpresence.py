@@ -6,20 +6,61 @@ building success or fail.
 """
 
 import logging
-from typing import Set
+from typing import Set, AbstractSet
 
 from lemonspotter.core.database import Database
 from lemonspotter.core.test import Test, TestType, TestOutcome
 from lemonspotter.core.function import Function
 from lemonspotter.core.testgenerator import TestGenerator
 from lemonspotter.core.statement import MainDefinitionStatement, ReturnStatement
+from lemonspotter.core.profiler import profiled
 from lemonspotter.samplers.declare import DeclarationSampler
 
 
 class FunctionPresenceGenerator(TestGenerator):
     """
+    This TestGenerator generates tests which check whether a function can be linked.
     """
 
+    def probe_declarations(self, declarations: AbstractSet[str]) -> None:
+        """
+        Records for all functions whether a prototype was found in the header.
+        """
+
+        for function in Database().get_functions():
+            function.properties['declared'] = function.name in declarations
+
+    def probe_symbols(self, symbols: AbstractSet[str]) -> int:
+        """
+        Marks all untested functions which are exported by the library as present, without
+        generating tests. Functions which are not exported, or only exported through the
+        profiling layer, may be macros or otherwise ambiguous and remain to be tested by
+        compilation.
+        """
+
+        probed = 0
+
+        for function in Database().get_functions():
+            if function.properties.get('presence_tested', False):
+                continue
+
+            if function.name in symbols:
+                function.properties['presence_tested'] = True
+                function.properties['present'] = True
+
+                probed += 1
+
+            elif f'P{function.name}' in symbols:
+                logging.info('%s is only exported by the profiling layer.', function.name)
+
+            else:
+                logging.info('%s is not exported, testing by compilation.', function.name)
+
+        logging.info('%i functions found in the library symbol tables.', probed)
+
+        return probed
+
+    @profiled('generate')
     def generate(self) -> Set[Test]:
         """
         Generates all presence test objects for all functions in the database.
@@ -3,7 +3,8 @@ This module defines the initiation point to finalization point generator.
 """
 
 import logging
-from typing import Iterable, MutableSet, MutableMapping
+from itertools import groupby
+from typing import Dict, Iterable, MutableSet, MutableMapping, Optional, Sequence, List, Tuple
 
 from lemonspotter.core.test import Test, TestType, TestOutcome
 from lemonspotter.core.database import Database
@@ -11,7 +12,14 @@ from lemonspotter.core.function import Function
 from lemonspotter.core.sample import FunctionSample
 from lemonspotter.core.testgenerator import TestGenerator
 from lemonspotter.core.sampler import Sampler
-from lemonspotter.core.statement import MainDefinitionStatement, ReturnStatement
+from lemonspotter.core.source import Source
+from lemonspotter.core.statement import (MainDefinitionStatement,
+                                         FunctionDefinitionStatement,
+                                         ConditionStatement,
+                                         FunctionStatement,
+                                         IncludeStatement,
+                                         ReturnStatement)
+from lemonspotter.core.profiler import profiled
 
 
 class IndependentGenerator(TestGenerator):
@@ -19,38 +27,116 @@ class IndependentGenerator(TestGenerator):
     Source code generator for initiator and finalizer functions.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, group_size: Optional[int] = 1) -> None:
+        """
+        Constructs the generator. Up to group_size tests are emitted as functions of a single
+        program, which runs one of them selected by its first argument. If group_size is None,
+        all tests of a function form a single program.
+        """
+
         super().__init__()
 
+        if group_size is not None and group_size < 1:
+            raise ValueError(f'Group size needs to be at least 1, not {group_size}.')
+
+        self._group_size = group_size
+        self._grouped: Dict[Test, Tuple[str, FunctionSample]] = {}
+
         self.elements_generated = 0
 
+    @profiled('generate')
     def generate(self, sampler: Sampler) -> Iterable[Test]:
         """
         Generate all possible C programs for all initiators and finalizers.
         """
 
         # determine all start functions
-        independent = list(filter(lambda f: (not (f.needs_all or f.needs_any) and
-                             (not (f.leads_any or f.leads_all))) and f.present,
-                             Database().get_functions()))
+        independent = list(filter(lambda f: self.independent(f) and f.present,
+                                  Database().get_functions()))
 
         # for all combinations
         tests: MutableSet[Test] = set()
+        samples: List[Tuple[str, FunctionSample]] = []
 
-        for function in independent:
+        for function in sorted(independent, key=lambda function: function.name):
             # generate individual test
             logging.debug('generating tests for %s with %s', function, sampler)
-            for test in self._gen_tests(function, sampler):
-                tests.add(test)
+            samples.extend(self._gen_samples(function, sampler))
+
+        for group in self._group(samples):
+            if len(group) == 1:
+                tests.add(self._gen_test(*group[0]))
+
+            else:
+                tests.update(self._gen_group(group))
 
         return tests
 
-    def _gen_tests(self, function: Function, sampler: Sampler) -> Iterable[Test]:
+    @staticmethod
+    def independent(function: Function) -> bool:
         """
-        Using the functions selected and the given sampler generate a test
-        for each argument set extracted from sampler.
+        Checks whether the function neither needs nor leads to other functions.
+        """
+
+        return (not (function.needs_all or function.needs_any) and
+                not (function.leads_any or function.leads_all))
+
+    @profiled('generate')
+    def generate_function(self, function: Function, sampler: Sampler) -> Iterable[Test]:
         """
+        Generate the tests of a single independent function, grouping only its own tests.
+        """
+
         tests: MutableSet[Test] = set()
+
+        for group in self._group(list(self._gen_samples(function, sampler))):
+            if len(group) == 1:
+                tests.add(self._gen_test(*group[0]))
+
+            else:
+                tests.update(self._gen_group(group))
+
+        return tests
+
+    def grouped(self, test: Test) -> bool:
+        """
+        Checks whether the test is built as part of a group of tests.
+        """
+
+        return test in self._grouped
+
+    def split_group(self, test: Test) -> Test:
+        """
+        Generates the test of a group member as a program of its own. The build of a group
+        fails as a whole, so members of a failed group are rebuilt individually to attribute
+        the failure.
+        """
+
+        return self._gen_test(*self._grouped[test])
+
+    def _group(self,
+               samples: Sequence[Tuple[str, FunctionSample]]
+               ) -> Iterable[Sequence[Tuple[str, FunctionSample]]]:
+        """
+        Splits the named samples into the groups which are emitted as a single program.
+        """
+
+        if self._group_size is None:
+            for _, group in groupby(samples, key=lambda named: named[1].function.name):
+                yield list(group)
+
+        else:
+            for start in range(0, len(samples), self._group_size):
+                yield samples[start:start + self._group_size]
+
+    def _gen_samples(self,
+                     function: Function,
+                     sampler: Sampler) -> Iterable[Tuple[str, FunctionSample]]:
+        """
+        Using the functions selected and the given sampler generate a named sample
+        for each argument set extracted from sampler.
+        """
+        named_samples: List[Tuple[str, FunctionSample]] = []
         test_base_name = f'{function.name}'
 
         # generate function samples
@@ -68,12 +154,9 @@ class IndependentGenerator(TestGenerator):
             test_specifier = idx + len(samples[function]) * idx
 
             logging.info('generating test of %s', str(function_sample))
-            test = self._gen_test(f'{test_base_name}_{test_specifier}',
-                                  function_sample)
-
-            tests.add(test)
+            named_samples.append((f'{test_base_name}_{test_specifier}', function_sample))
 
-        return tests
+        return named_samples
 
     def _gen_test(self, test_name: str, function: FunctionSample) -> Test:
         """
@@ -91,8 +174,60 @@ class IndependentGenerator(TestGenerator):
         function.generate_source(block_main,
                               'start point for independent test')
 
-        # create test
-        test = Test(test_name, TestType.BUILD_AND_RUN, source)
+        return self._create_test(test_name, source, function)
+
+    def _gen_group(self, group: Sequence[Tuple[str, FunctionSample]]) -> Iterable[Test]:
+        """
+        Generate a single C program for the given named samples, each sample is a function
+        which main dispatches to by name.
+        """
+
+        source = self._generate_source_frame()
+        source.add_at_start(IncludeStatement('string.h'))
+
+        block_main = MainDefinitionStatement()
+
+        tests: List[Test] = []
+        for test_name, function in group:
+            entry = f'lemonspotter_{test_name}'
+
+            block_test = FunctionDefinitionStatement(entry)
+            source.add_at_start(block_test)
+
+            block_test.add_at_end(ReturnStatement('0'))
+
+            logging.debug(function)
+            function.generate_source(block_test,
+                                     'start point for independent test')
+
+            dispatch = ConditionStatement(f'argument_count > 1 && '
+                                          f'strcmp(argument_list[1], "{entry}") == 0')
+            dispatch.add_at_start(ReturnStatement(f'{entry}(argument_count, argument_list)'))
+            block_main.add_at_start(dispatch)
+
+            test = self._create_test(test_name, source, function, entry)
+            self._grouped[test] = (test_name, function)
+
+            tests.append(test)
+
+        block_main.add_at_end(FunctionStatement('fprintf',
+                                                'fprintf(stderr, "unknown test\\n");'))
+        block_main.add_at_end(ReturnStatement('EXIT_FAILURE'))
+
+        source.add_at_start(block_main)
+
+        return tests
+
+    def _create_test(self,
+                     test_name: str,
+                     source: Source,
+                     function: FunctionSample,
+                     entry: Optional[str] = None) -> Test:
+        """
+        Create the test of the given sample, which evaluates the sample once run.
+        """
+
+        test = Test(test_name, TestType.BUILD_AND_RUN, source, entry=entry)
 
         def run_success():
             eval_function = function.evaluator()
@@ -0,0 +1,315 @@
+"""
+This module defines the performance generator, which times the calls of independent functions.
+
+Every test initializes MPI, validates a single call of the timed function and then calls it in a
+warmup loop and a timed loop. The duration of every timed call is measured with MPI_Wtime and
+the durations are captured as a single frame once the loop is finished, so that printing does
+not disturb the timing. An empty timed loop measures the overhead of the timer itself, which is
+subtracted from the durations before they are analysed.
+"""
+
+import logging
+import statistics
+from typing import Any, Dict, Iterable, List, MutableSet, Optional, Sequence
+
+from lemonspotter.core.analysis import Analysis
+from lemonspotter.core.test import Test, TestType, TestOutcome
+from lemonspotter.core.database import Database
+from lemonspotter.core.function import Function
+from lemonspotter.core.sample import FunctionSample
+from lemonspotter.core.testgenerator import TestGenerator
+from lemonspotter.core.sampler import Sampler
+from lemonspotter.core.type import Type
+from lemonspotter.core.variable import Variable
+from lemonspotter.core.statement import (MainDefinitionStatement,
+                                         ArrayDeclarationStatement,
+                                         BlockStatement,
+                                         FunctionStatement,
+                                         LoopStatement,
+                                         RankDefinitionStatement,
+                                         ReturnStatement)
+from lemonspotter.core.profiler import profiled
+from lemonspotter.generators.independent import IndependentGenerator
+from lemonspotter.generators.startend import StartEndGenerator
+
+
+# the durations of the timed calls in seconds, captured as a whitespace separated list
+TIMINGS = Type({'name': 'double[]',
+                'abstract_type': 'TIMINGS',
+                'base_type': True,
+                'language_type': 'double',
+                'print_specifier': '.6e',
+                'default': '0.0'})
+
+
+class PerformanceGenerator(TestGenerator):
+    """
+    Source code generator for timed calls of independent functions.
+    """
+
+    # the timings of a function are captured in a single frame, which is limited to 64KiB, at
+    # most 14 characters each
+    max_repetitions: int = 4096
+    # prefix of the test names, which are followed by the name of the timed function
+    prefix: str = 'performance_'
+
+    def __init__(self,
+                 warmup: int = 10,
+                 repetitions: int = 100,
+                 analysis: Optional[Analysis] = None) -> None:
+        """
+        Constructs the generator. Each function is called warmup times before it is called and
+        timed repetitions times, the timings are summarized by the analysis.
+        """
+
+        super().__init__()
+
+        if warmup < 0:
+            raise ValueError(f'Number of warmup calls cannot be negative, not {warmup}.')
+
+        if not 1 <= repetitions <= self.max_repetitions:
+            raise ValueError(f'Number of repetitions needs to be between 1 and '
+                             f'{self.max_repetitions}, not {repetitions}.')
+
+        self._warmup = warmup
+        self._repetitions = repetitions
+        self._analysis = analysis if analysis is not None else Analysis()
+
+    @property
+    def repetitions(self) -> int:
+        """This property provides the number of timed calls of each function."""
+
+        return self._repetitions
+
+    @property
+    def analysis(self) -> Analysis:
+        """This property provides the analysis summarizing the timings."""
+
+        return self._analysis
+
+    @profiled('generate')
+    def generate(self, sampler: Sampler) -> Iterable[Test]:
+        """
+        Generate a performance test for every present independent function.
+        """
+
+        tests: MutableSet[Test] = set()
+
+        frame = self._frame_functions()
+        if frame is None:
+            logging.warning('no present initiator and finalizer, skip performance tests.')
+            return tests
+
+        timed = filter(lambda f: IndependentGenerator.independent(f) and f.present,
+                       Database().get_functions())
+
+        for function in sorted(timed, key=lambda function: function.name):
+            test = self.generate_function(function, sampler)
+
+            if test is not None:
+                tests.add(test)
+
+        return tests
+
+    @profiled('generate')
+    def generate_function(self, function: Function, sampler: Sampler) -> Optional[Test]:
+        """
+        Generate the performance test of a single function, None is provided if the function
+        cannot be sampled or there is no initiator and finalizer.
+        """
+
+        frame = self._frame_functions()
+        if frame is None:
+            return None
+
+        start, end = frame
+
+        # samples are rewritten when generating their source, every test needs its own
+        samples = [self._first_sample(f, sampler) for f in (start, function, end)]
+
+        if None in samples:
+            logging.warning('no samples of %s, skip performance test.', function)
+            return None
+
+        return self._gen_test(function, *samples)  # type: ignore
+
+    @staticmethod
+    def _frame_functions() -> Optional[Sequence[Function]]:
+        """
+        Provides the first present initiator and a present finalizer it leads to.
+        """
+
+        starts = filter(lambda f: StartEndGenerator.start(f) and f.present,
+                        Database().get_functions())
+
+        for start in sorted(starts, key=lambda function: function.name):
+            ends = filter(lambda f: StartEndGenerator.end(f) and f.present,
+                          start.leads_all | start.leads_any)
+
+            for end in sorted(ends, key=lambda function: function.name):
+                return start, end
+
+        return None
+
+    @staticmethod
+    def _first_sample(function: Function, sampler: Sampler) -> Optional[FunctionSample]:
+        """
+        Provides the sample of the function with the first argument names.
+        """
+
+        samples = sorted(sampler.generate_samples(function),
+                         key=lambda sample: [argument.name for argument in sample.arguments])
+
+        return samples[0] if samples else None
+
+    def _gen_test(self,
+                  function: Function,
+                  start: FunctionSample,
+                  sample: FunctionSample,
+                  end: FunctionSample) -> Test:
+        """
+        Generate the C source code timing the sample between the initiator and finalizer.
+        """
+
+        source = self._generate_source_frame()
+
+        block_main = MainDefinitionStatement()
+        source.add_at_start(block_main)
+
+        start.generate_source(block_main, 'initialization for performance test')
+        sample.generate_source(block_main, 'validation of the timed call')
+
+        call = FunctionStatement(function.name, f'{sample.generate_call()};')
+
+        warmup = LoopStatement('lemonspotter_warmup', str(self._warmup),
+                               f'warmup calls of {function.name}')
+        warmup.add_at_start(call)
+        block_main.add_at_start(warmup)
+
+        timings = Variable(TIMINGS, 'lemonspotter_timings')
+        overhead = Variable(TIMINGS, 'lemonspotter_overhead')
+
+        self._generate_timing(block_main, timings, call, f'timed calls of {function.name}')
+        self._generate_timing(block_main, overhead, None, 'overhead of the timer')
+
+        end.generate_source(block_main, 'finalization for performance test')
+
+        block_main.add_at_end(ReturnStatement('0'))
+
+        test = Test(f'{self.prefix}{function.name}', TestType.BUILD_AND_RUN, source)
+
+        def run_success():
+            evaluated = start.evaluator() and sample.evaluator() and end.evaluator()
+
+            durations = None
+            if evaluated:
+                durations = self.corrected(self.parse_timings(timings.value),
+                                           self.parse_timings(overhead.value))
+
+            latency = self.summarize(durations) if durations is not None else None
+
+            if latency is None:
+                test.run_outcome = TestOutcome.FAILED
+                logging.warning('%s test failed', test.name)
+
+            else:
+                test.run_outcome = TestOutcome.SUCCESS
+                function.properties['latency'] = latency
+                function.properties['latency_samples'] = durations
+
+                logging.info('latency of %s is %.3e seconds', function.name, latency['latency'])
+
+        test.run_success_function = run_success
+
+        return test
+
+    def _generate_timing(self,
+                         block: BlockStatement,
+                         timings: Variable,
+                         call: Optional[FunctionStatement],
+                         comment: str) -> None:
+        """
+        Generates the timed loop around the call, storing the duration of every iteration in
+        the timings, and the capture of the timings.
+        """
+
+        block.add_at_start(ArrayDeclarationStatement(timings, self._repetitions, comment))
+
+        loop = LoopStatement(f'{timings.name}_index', str(self._repetitions))
+        loop.add_at_start(FunctionStatement('MPI_Wtime',
+                                            f'double {timings.name}_start = MPI_Wtime();'))
+        loop.add_at_start(call)
+        loop.add_at_start(FunctionStatement('MPI_Wtime',
+                                            f'{timings.name}[{loop.counter}] = '
+                                            f'MPI_Wtime() - {timings.name}_start;'))
+        block.add_at_start(loop)
+
+        # capture frame of rank, name, type and all timings
+        block.add_at_start(FunctionStatement('printf',
+                                             f'printf("\\x1e%d|{timings.name}|'
+                                             f'{timings.type.abstract_type}|", '
+                                             f'{RankDefinitionStatement.function}());'))
+
+        output = LoopStatement(f'{timings.name}_output', str(self._repetitions))
+        output.add_at_start(FunctionStatement('printf',
+                                              f'printf("%{timings.type.print_specifier} ", '
+                                              f'{timings.name}[{output.counter}]);'))
+        block.add_at_start(output)
+
+        block.add_at_start(FunctionStatement('printf', 'printf("\\x1f\\n");'))
+
+    def parse_timings(self, value: Optional[str]) -> Optional[List[float]]:
+        """
+        Parses the captured timings, None is provided unless there is a timing of every
+        repetition.
+        """
+
+        if value is None:
+            return None
+
+        try:
+            timings = [float(timing) for timing in value.split()]
+
+        except ValueError:
+            logging.warning('malformed timings captured: %r', value)
+            return None
+
+        if len(timings) != self._repetitions:
+            logging.warning('captured %i timings instead of %i.', len(timings), self._repetitions)
+            return None
+
+        return timings
+
+    def corrected(self,
+                  timings: Optional[Sequence[float]],
+                  overhead: Optional[Sequence[float]]) -> Optional[List[float]]:
+        """
+        Provides the durations of the timed calls less the median overhead of the timer, which
+        is taken without warmup and outliers.
+        """
+
+        if not timings or not overhead:
+            return None
+
+        cleaned, _, _ = self._analysis.clean(overhead)
+        timer = statistics.median(cleaned)
+
+        return [timing - timer for timing in timings]
+
+    def summarize(self, durations: Optional[Sequence[float]]) -> Optional[Dict[str, Any]]:
+        """
+        Provides the statistics of the durations of the timed calls in seconds, see
+        Analysis.summarize. The latency is the median duration, at least zero.
+        """
+
+        if not durations:
+            return None
+
+        summary = self._analysis.summarize(durations)
+        if summary is None:
+            return None
+
+        summary['latency'] = max(summary['median'], 0.0)
+        summary['repetitions'] = len(durations)
+
+        return summary
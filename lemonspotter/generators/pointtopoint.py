@@ -0,0 +1,219 @@
+"""
+This module defines the point-to-point generator, which sweeps the latency and bandwidth of the
+send and receive functions over message sizes.
+
+For every send function, its receive function and every datatype constant a ping-pong test and
+a streaming test are generated, which run with two ranks. The ping-pong test bounces a message
+between the ranks and measures half the round trip time, the streaming test sends a window of
+messages which is acknowledged by the receiver and measures the bandwidth.
+"""
+
+import logging
+from typing import Iterable, MutableSet, Optional, Sequence, Tuple
+
+from lemonspotter.core.test import Test, TestType, TestOutcome
+from lemonspotter.core.database import Database
+from lemonspotter.core.constant import Constant
+from lemonspotter.core.function import Function
+from lemonspotter.core.sample import FunctionSample
+from lemonspotter.core.sampler import Sampler
+from lemonspotter.core.variable import Variable
+from lemonspotter.core.statement import (MainDefinitionStatement,
+                                         BlockStatement,
+                                         ConditionStatement,
+                                         FunctionStatement,
+                                         LoopStatement,
+                                         ReturnStatement)
+from lemonspotter.core.profiler import profiled
+from lemonspotter.generators.sweep import SweepGenerator, SWEEP
+
+
+class PointToPointGenerator(SweepGenerator):
+    """
+    Source code generator for latency and bandwidth sweeps of point-to-point communication.
+    """
+
+    # send function, receive function and the function completing requests, if nonblocking
+    families: Sequence[Tuple[str, str, Optional[str]]] = (('MPI_Send', 'MPI_Recv', None),
+                                                          ('MPI_Ssend', 'MPI_Recv', None),
+                                                          ('MPI_Isend', 'MPI_Irecv', 'MPI_Wait'))
+    # number of messages in flight of the streaming test
+    window: int = 16
+
+    @profiled('generate')
+    def generate(self, sampler: Sampler) -> Iterable[Test]:
+        """
+        Generate the ping-pong and streaming tests of every present send and receive function
+        with every present datatype constant.
+        """
+
+        tests: MutableSet[Test] = set()
+
+        frame = self._frame_functions()
+        if frame is None:
+            logging.warning('no present initiator and finalizer, skip point-to-point tests.')
+            return tests
+
+        start, end = frame
+
+        datatypes = self._datatypes()
+
+        for names in self.families:
+            if not all(self._present(name) for name in names if name is not None):
+                logging.info('%s is not present, skip point-to-point tests.', names)
+                continue
+
+            send = Database().get_function(names[0])
+
+            for datatype in datatypes:
+                for streaming in (False, True):
+                    # samples are rewritten when generating their source
+                    samples = [self._first_sample(f, sampler) for f in (start, end)]
+
+                    if None in samples:
+                        logging.warning('no samples of %s and %s, skip point-to-point tests.',
+                                        start, end)
+                        return tests
+
+                    tests.add(self._gen_sweep(names, send, datatype, streaming,
+                                              *samples))  # type: ignore
+
+        return tests
+
+    def _gen_sweep(self,
+                   names: Tuple[str, str, Optional[str]],
+                   send: Function,
+                   datatype: Constant,
+                   streaming: bool,
+                   start: FunctionSample,
+                   end: FunctionSample) -> Test:
+        """
+        Generate the C source code of the ping-pong or streaming sweep of the send function with
+        the datatype between the initiator and finalizer.
+        """
+
+        source = self._generate_source_frame()
+
+        block_main = MainDefinitionStatement()
+        source.add_at_start(block_main)
+
+        start.generate_source(block_main, 'initialization for point-to-point test')
+
+        block_main.add_at_start(FunctionStatement(None,
+                                                  f'MPI_Request lemonspotter_requests'
+                                                  f'[{self.window}];'))
+
+        if streaming:
+            curve = Variable(SWEEP, 'lemonspotter_bandwidth')
+            value = (f'(double) lemonspotter_size * {self.window} * lemonspotter_iterations / '
+                     f'lemonspotter_elapsed')
+
+        else:
+            curve = Variable(SWEEP, 'lemonspotter_latency')
+            value = 'lemonspotter_elapsed / (2.0 * lemonspotter_iterations)'
+
+        def exchange(block: BlockStatement) -> None:
+            self._generate_exchange(block, names, datatype.name, streaming)
+
+        # every nonblocking message in flight has a buffer of its own
+        buffer_size = self._max_size
+        if streaming and names[2] is not None:
+            buffer_size *= self.window
+
+        self._generate_sweep(block_main, curve, datatype.name, buffer_size,
+                             ('lemonspotter_buffer',), exchange, value)
+
+        end.generate_source(block_main, 'finalization for point-to-point test')
+
+        block_main.add_at_end(ReturnStatement('0'))
+
+        kind = 'bandwidth' if streaming else 'pingpong'
+        test = Test(f'{kind}_{send.name}_{datatype.name}', TestType.BUILD_AND_RUN, source,
+                    processes=2)
+
+        def run_success():
+            values = None
+            if start.evaluator() and end.evaluator():
+                values = self.parse_sweep(curve.value)
+
+            if values is None:
+                test.run_outcome = TestOutcome.FAILED
+                logging.warning('%s test failed', test.name)
+
+            else:
+                test.run_outcome = TestOutcome.SUCCESS
+
+                key = 'bandwidth_curve' if streaming else 'latency_curve'
+                send.properties.setdefault(key, {})[datatype.name] = values
+
+        test.run_success_function = run_success
+
+        return test
+
+    def _generate_exchange(self,
+                           block: BlockStatement,
+                           names: Tuple[str, str, Optional[str]],
+                           datatype: str,
+                           streaming: bool) -> None:
+        """
+        Generates a single iteration of the ping-pong or streaming exchange between the first
+        two ranks. Messages are sent from the first rank to the second, the second rank returns
+        the message in the ping-pong and an empty acknowledgement when streaming. Nonblocking
+        messages in flight at the same time use consecutive slices of the buffer.
+        """
+
+        send, receive, complete = names
+
+        def operation(function: str, peer: int, count: str, request: str,
+                      buffer: str = 'lemonspotter_buffer') -> str:
+            arguments = f'{buffer}, {count}, {datatype}, {peer}, 0, MPI_COMM_WORLD'
+
+            if complete is not None:
+                return f'{function}({arguments}, &lemonspotter_requests[{request}]);'
+
+            if function == receive:
+                return f'{function}({arguments}, MPI_STATUS_IGNORE);'
+
+            return f'{function}({arguments});'
+
+        def transfer(target: BlockStatement, function: str, peer: int, count: str) -> None:
+            if streaming and count != '0':
+                messages = LoopStatement('lemonspotter_message', str(self.window))
+
+                buffer = 'lemonspotter_buffer'
+                if complete is not None:
+                    buffer += f' + {messages.counter} * lemonspotter_size'
+
+                messages.add_at_start(FunctionStatement(function,
+                                                        operation(function, peer, count,
+                                                                  messages.counter, buffer)))
+                target.add_at_start(messages)
+
+                if complete is not None:
+                    completion = LoopStatement('lemonspotter_message', str(self.window))
+                    completion.add_at_start(FunctionStatement(complete,
+                                                              f'{complete}(&lemonspotter_requests'
+                                                              f'[{completion.counter}], '
+                                                              f'MPI_STATUS_IGNORE);'))
+                    target.add_at_start(completion)
+
+            else:
+                target.add_at_start(FunctionStatement(function,
+                                                      operation(function, peer, count, '0')))
+
+                if complete is not None:
+                    target.add_at_start(FunctionStatement(complete,
+                                                          f'{complete}(&lemonspotter_requests[0]'
+                                                          f', MPI_STATUS_IGNORE);'))
+
+        reply = '0' if streaming else 'lemonspotter_count'
+
+        sender = ConditionStatement('lemonspotter_self == 0')
+        transfer(sender, send, 1, 'lemonspotter_count')
+        transfer(sender, receive, 1, reply)
+        block.add_at_start(sender)
+
+        receiver = ConditionStatement('lemonspotter_self == 1')
+        transfer(receiver, receive, 0, 'lemonspotter_count')
+        transfer(receiver, send, 0, reply)
+        block.add_at_start(receiver)
@@ -12,6 +12,7 @@ from lemonspotter.core.sample import FunctionSample
 from lemonspotter.core.testgenerator import TestGenerator
 from lemonspotter.core.sampler import Sampler
 from lemonspotter.core.statement import MainDefinitionStatement, ReturnStatement
+from lemonspotter.core.profiler import profiled
 
 
 class StartEndGenerator(TestGenerator):
@@ -24,19 +25,18 @@ class StartEndGenerator(TestGenerator):
 
         self.elements_generated = 0
 
+    @profiled('generate')
     def generate(self, sampler: Sampler) -> Iterable[Test]:
         """
         Generate all possible C programs for all initiators and finalizers.
         """
 
         # determine all start functions
-        starts = list(filter(lambda f: (not (f.needs_all or f.needs_any) and
-                             (f.leads_any or f.leads_all)) and f.present,
+        starts = list(filter(lambda f: self.start(f) and f.present,
                              Database().get_functions()))
 
         # determine all end points
-        ends = list(filter(lambda f: (not (f.leads_all or f.leads_any) and
-                           (f.needs_any or f.needs_all)) and f.present,
+        ends = list(filter(lambda f: self.end(f) and f.present,
                            Database().get_functions()))
 
         # for all combinations
@@ -46,12 +46,31 @@ class StartEndGenerator(TestGenerator):
             for end in ends:
                 # generate individual test
                 logging.debug('generating tests for %s-%s with %s', start, end, sampler)
-                for test in self._gen_tests(start, end, sampler):
+                for test in self.generate_pair(start, end, sampler):
                     tests.add(test)
 
         return tests
 
-    def _gen_tests(self, start: Function, end: Function, sampler: Sampler) -> Iterable[Test]:
+    @staticmethod
+    def start(function: Function) -> bool:
+        """
+        Checks whether the function is an initiator, it needs no function and leads to others.
+        """
+
+        return (not (function.needs_all or function.needs_any) and
+                bool(function.leads_any or function.leads_all))
+
+    @staticmethod
+    def end(function: Function) -> bool:
+        """
+        Checks whether the function is a finalizer, it needs other functions and leads to none.
+        """
+
+        return (not (function.leads_all or function.leads_any) and
+                bool(function.needs_any or function.needs_all))
+
+    @profiled('generate')
+    def generate_pair(self, start: Function, end: Function, sampler: Sampler) -> Iterable[Test]:
         """
         Using the functions selected and the given sampler generate a test
         for each argument set extracted from sampler.
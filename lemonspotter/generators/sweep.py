@@ -0,0 +1,221 @@
+"""
+This module defines the base of the generators which sweep the performance of communication
+over message sizes.
+
+Every message size of the sweep is measured in a single program. The messages of each size are
+exchanged in a warmup loop and a timed loop, the outcome of all sizes is captured as a single
+frame of size:value pairs once the sweep is finished, so that printing does not disturb the
+timing. Only the first rank reports its measurements.
+"""
+
+import logging
+from typing import Callable, Dict, Optional, Sequence
+
+from lemonspotter.core.database import Database
+from lemonspotter.core.constant import Constant
+from lemonspotter.core.type import Type
+from lemonspotter.core.variable import Variable
+from lemonspotter.core.statement import (ArrayDeclarationStatement,
+                                         BlockStatement,
+                                         ConditionStatement,
+                                         FunctionStatement,
+                                         LoopStatement,
+                                         RankDefinitionStatement)
+from lemonspotter.generators.performance import PerformanceGenerator
+
+
+# the outcome of every message size, captured as whitespace separated size:value pairs
+SWEEP = Type({'name': 'char[]',
+              'abstract_type': 'SWEEP',
+              'base_type': True,
+              'language_type': 'char',
+              'print_specifier': 's',
+              'default': ''})
+
+
+class SweepGenerator(PerformanceGenerator):
+    """
+    This class is the base of the generators sweeping the powers of two from a smallest to a
+    largest message size.
+    """
+
+    # messages larger than this are repeated proportionally fewer times
+    large_message: int = 64 * 1024
+    # the largest message, whose element count still fits an int for any datatype
+    max_message: int = 1024**3
+
+    def __init__(self,
+                 warmup: int = 10,
+                 repetitions: int = 100,
+                 min_size: int = 1,
+                 max_size: int = 64 * 1024**2) -> None:
+        """
+        Constructs the generator. The message sizes are the powers of two from min_size to
+        max_size bytes, sizes smaller than a datatype are skipped. Messages larger than 64KiB are
+        sent proportionally fewer times than warmup and repetitions, at least once.
+        """
+
+        super().__init__(warmup, repetitions)
+
+        for size in (min_size, max_size):
+            if size < 1 or size & (size - 1):
+                raise ValueError(f'Message size needs to be a power of two, not {size}.')
+
+        if min_size > max_size or max_size > self.max_message:
+            raise ValueError(f'Message sizes need to be ascending up to {self.max_message}, '
+                             f'not from {min_size} to {max_size}.')
+
+        self._min_size = min_size
+        self._max_size = max_size
+
+    @property
+    def sizes(self) -> Sequence[int]:
+        """This property provides the message sizes of the sweep in bytes."""
+
+        return tuple(self._min_size << step
+                     for step in range((self._max_size // self._min_size).bit_length()))
+
+    @staticmethod
+    def _present(name: str) -> bool:
+        """
+        Checks whether the function or constant of the given name is in the database and present.
+        """
+
+        if Database().has_function(name):
+            return Database().get_function(name).present
+
+        if Database().has_constant(name):
+            return Database().get_constant(name).present
+
+        return False
+
+    @staticmethod
+    def _datatypes() -> Sequence[Constant]:
+        """
+        Provides the present datatype constants by name.
+        """
+
+        return sorted((constant for constant in Database().get_constants()
+                       if constant.present and constant.type.abstract_type == 'DATATYPE'),
+                      key=lambda constant: constant.name)
+
+    def _generate_sweep(self,
+                        block: BlockStatement,
+                        curve: Variable,
+                        datatype: str,
+                        buffer_size: int,
+                        buffers: Sequence[str],
+                        exchange: Callable[[BlockStatement], None],
+                        value: str,
+                        synchronization: Optional[str] = None) -> None:
+        """
+        Generates the sweep into the block. The buffers of buffer_size bytes are allocated, at
+        every message size the exchange generates a single iteration into the loops, using the
+        element count lemonspotter_count of the datatype. The value of a size is the C
+        expression computed from lemonspotter_elapsed, lemonspotter_iterations and
+        lemonspotter_size, it is captured into the curve. The synchronization statement is
+        executed before the timing starts and ends, if given.
+        """
+
+        block.add_at_start(FunctionStatement(RankDefinitionStatement.function,
+                                             f'int lemonspotter_self = '
+                                             f'{RankDefinitionStatement.function}();'))
+        block.add_at_start(FunctionStatement(None, 'int lemonspotter_type_size = 0;'))
+        block.add_at_start(FunctionStatement('MPI_Type_size',
+                                             f'MPI_Type_size({datatype}, '
+                                             f'&lemonspotter_type_size);'))
+
+        for buffer in buffers:
+            block.add_at_start(FunctionStatement('malloc',
+                                                 f'char *{buffer} = malloc({buffer_size});'))
+
+        name = curve.name
+        block.add_at_start(ArrayDeclarationStatement(curve, 64 * len(self.sizes),
+                                                     'size:value pairs of the sweep'))
+        block.add_at_start(FunctionStatement(None, f'{name}[0] = \'\\0\';'))
+        block.add_at_start(FunctionStatement(None, f'int {name}_length = 0;'))
+
+        sweep = LoopStatement('lemonspotter_step', str(len(self.sizes)))
+        sweep.add_at_start(FunctionStatement(None,
+                                             f'long lemonspotter_size = {self._min_size}L << '
+                                             f'{sweep.counter};'))
+        sweep.add_at_start(FunctionStatement(None,
+                                             'int lemonspotter_count = (int) '
+                                             '(lemonspotter_size / lemonspotter_type_size);'))
+        sweep.add_at_start(FunctionStatement(None,
+                                             f'long lemonspotter_scale = lemonspotter_size > '
+                                             f'{self.large_message} ? lemonspotter_size / '
+                                             f'{self.large_message} : 1;'))
+        sweep.add_at_start(FunctionStatement(None,
+                                             f'long lemonspotter_warmups = ({self._warmup} + '
+                                             f'lemonspotter_scale - 1) / lemonspotter_scale;'))
+        sweep.add_at_start(FunctionStatement(None,
+                                             f'long lemonspotter_iterations = '
+                                             f'({self._repetitions} + lemonspotter_scale - 1) / '
+                                             f'lemonspotter_scale;'))
+
+        measured = ConditionStatement('lemonspotter_count > 0 && lemonspotter_type_size > 0')
+        sweep.add_at_start(measured)
+
+        warmup = LoopStatement('lemonspotter_warmup', 'lemonspotter_warmups')
+        exchange(warmup)
+        measured.add_at_start(warmup)
+
+        if synchronization is not None:
+            measured.add_at_start(FunctionStatement(None, synchronization))
+
+        measured.add_at_start(FunctionStatement('MPI_Wtime',
+                                                'double lemonspotter_start = MPI_Wtime();'))
+
+        timed = LoopStatement('lemonspotter_iteration', 'lemonspotter_iterations')
+        exchange(timed)
+        measured.add_at_start(timed)
+
+        if synchronization is not None:
+            measured.add_at_start(FunctionStatement(None, synchronization))
+
+        measured.add_at_start(FunctionStatement('MPI_Wtime',
+                                                'double lemonspotter_elapsed = '
+                                                'MPI_Wtime() - lemonspotter_start;'))
+
+        measured.add_at_start(FunctionStatement('snprintf',
+                                                f'{name}_length += snprintf({name} + '
+                                                f'{name}_length, sizeof({name}) - '
+                                                f'{name}_length, "%ld:%.9e ", '
+                                                f'lemonspotter_size, {value});'))
+
+        block.add_at_start(sweep)
+
+        # capture frame of rank, name, type and all sizes, only the first rank measures
+        output = ConditionStatement('lemonspotter_self == 0')
+        output.add_at_start(FunctionStatement('printf',
+                                              f'printf("\\x1e%d|{name}|{curve.type.abstract_type}'
+                                              f'|%{curve.type.print_specifier}\\x1f\\n", '
+                                              f'lemonspotter_self, {name});'))
+        block.add_at_start(output)
+
+        for buffer in buffers:
+            block.add_at_start(FunctionStatement('free', f'free({buffer});'))
+
+    @staticmethod
+    def parse_sweep(value: Optional[str]) -> Optional[Dict[str, float]]:
+        """
+        Parses the captured size:value pairs into the value of every message size, None is
+        provided if the capture is missing or malformed.
+        """
+
+        if value is None:
+            return None
+
+        values: Dict[str, float] = {}
+
+        try:
+            for pair in value.split():
+                size, measured = pair.split(':')
+                values[str(int(size))] = float(measured)
+
+        except ValueError:
+            logging.warning('malformed sweep captured: %r', value)
+            return None
+
+        return values
@@ -0,0 +1,241 @@
+"""
+The HeaderParser parses the output of a single preprocessor pass over a header, which includes
+the macro definitions (-E -dD), into macros, enumerators and declared functions.
+"""
+
+import ast
+import re
+import sys
+import logging
+from typing import Dict, Optional, Set, AbstractSet
+
+
+class HeaderParser:
+    """
+    This class extracts the macros, enumerators and function declarations of a preprocessed
+    header and derives integer values of macros and enumerators where possible.
+    """
+
+    max_expansion_depth: int = 16
+    # largest C int, larger literals are unsigned or long in C and are evaluated at runtime
+    max_int: int = 2**31 - 1
+
+    _define = re.compile(r'#\s*define\s+([A-Za-z_]\w*)(\(?)\s*(.*)$')
+    _undefine = re.compile(r'#\s*undef\s+([A-Za-z_]\w*)')
+    _enumeration = re.compile(r'\benum\s*[A-Za-z_]?\w*\s*\{([^{}]*)\}')
+    _call = re.compile(r'\b([A-Za-z_]\w*)\s*\(')
+    _identifier = re.compile(r'\b[A-Za-z_]\w*\b')
+    _integer = re.compile(r'\b(0[xX][0-9a-fA-F]+|\d+)[uUlL]*\b')
+
+    def __init__(self) -> None:
+        self._macros: Dict[str, str] = {}
+        self._function_macros: Set[str] = set()
+        self._enumerators: Dict[str, Optional[int]] = {}
+        self._declarations: Set[str] = set()
+
+    def __call__(self, preprocessed: str) -> None:
+        self.parse(preprocessed)
+
+    @property
+    def declarations(self) -> AbstractSet[str]:
+        """
+        This property provides the names of all functions which are declared. Note that this is
+        a superset, it includes any identifier which is followed by parentheses.
+        """
+
+        return self._declarations
+
+    def defines(self, name: str) -> bool:
+        """
+        Checks whether the name is defined as a macro or an enumerator.
+        """
+
+        return (name in self._macros or
+                name in self._function_macros or
+                name in self._enumerators)
+
+    def parse(self, preprocessed: str) -> None:
+        """
+        Parses the preprocessed header.
+        """
+
+        code = []
+
+        for line in preprocessed.splitlines():
+            stripped = line.strip()
+
+            if not stripped.startswith('#'):
+                code.append(line)
+                continue
+
+            define = self._define.match(stripped)
+            if define:
+                name, function_like, body = define.groups()
+
+                if function_like:
+                    self._function_macros.add(name)
+                    self._macros.pop(name, None)
+
+                else:
+                    self._macros[name] = body
+                    self._function_macros.discard(name)
+
+                continue
+
+            undefine = self._undefine.match(stripped)
+            if undefine:
+                self._macros.pop(undefine.group(1), None)
+                self._function_macros.discard(undefine.group(1))
+
+            # line markers and pragmas are ignored
+
+        text = '\n'.join(code)
+
+        for enumeration in self._enumeration.finditer(text):
+            self._parse_enumeration(enumeration.group(1))
+
+        self._declarations.update(self._call.findall(text))
+
+        logging.debug('parsed %i macros, %i function macros, %i enumerators',
+                      len(self._macros), len(self._function_macros), len(self._enumerators))
+
+    def _parse_enumeration(self, body: str) -> None:
+        """
+        Parses the body of an enumeration, values follow the previous enumerator if not given.
+        """
+
+        previous: Optional[int] = -1
+
+        for enumerator in body.split(','):
+            name, _, expression = enumerator.partition('=')
+            name = name.strip()
+
+            if not name:
+                continue
+
+            if expression.strip():
+                value = self._evaluate(expression, 0)
+
+            else:
+                value = previous + 1 if previous is not None else None
+
+            self._enumerators[name] = value
+            previous = value
+
+    def value(self, name: str) -> Optional[int]:
+        """
+        Provides the integer value of a macro or enumerator, if it can be derived statically.
+        """
+
+        return self._value(name, 0)
+
+    def _value(self, name: str, depth: int) -> Optional[int]:
+        if name in self._enumerators:
+            return self._enumerators[name]
+
+        if name in self._macros:
+            return self._evaluate(self._macros[name], depth + 1)
+
+        return None
+
+    def _evaluate(self, expression: str, depth: int) -> Optional[int]:
+        """
+        Evaluates an integer constant expression, expanding macros and enumerators.
+        """
+
+        if depth > self.max_expansion_depth:
+            return None
+
+        unresolved = []
+
+        def substitute(match) -> str:
+            value = self._value(match.group(0), depth)
+
+            if value is None:
+                unresolved.append(match.group(0))
+                return '0'
+
+            return f'({value})'
+
+        # remove integer suffixes and convert octal literals before identifiers are replaced
+        def literal(match) -> str:
+            number = match.group(1)
+
+            if len(number) > 1 and number.startswith('0') and number.isdigit():
+                value = int(number, 8)
+
+            else:
+                value = int(number, 0)
+
+            if value > self.max_int:
+                unresolved.append(number)
+
+            return str(value)
+
+        expression = self._integer.sub(literal, expression.strip())
+        expression = self._identifier.sub(substitute, expression)
+
+        if unresolved or not expression:
+            return None
+
+        try:
+            tree = ast.parse(expression, mode='eval')
+
+        except SyntaxError:
+            return None
+
+        return _evaluate_node(tree.body)
+
+
+_binary_operators = {
+    ast.Add: lambda a, b: a + b,
+    ast.Sub: lambda a, b: a - b,
+    ast.Mult: lambda a, b: a * b,
+    ast.Div: lambda a, b: int(a / b),
+    ast.Mod: lambda a, b: a - b * int(a / b),
+    ast.LShift: lambda a, b: a << b,
+    ast.RShift: lambda a, b: a >> b,
+    ast.BitOr: lambda a, b: a | b,
+    ast.BitAnd: lambda a, b: a & b,
+    ast.BitXor: lambda a, b: a ^ b,
+}
+
+_unary_operators = {
+    ast.USub: lambda a: -a,
+    ast.UAdd: lambda a: a,
+    ast.Invert: lambda a: ~a,
+}
+
+
+def _evaluate_node(node: ast.AST) -> Optional[int]:
+    """
+    Evaluates an integer arithmetic expression tree, any other construct evaluates to None.
+    """
+
+    # numbers are parsed into ast.Num before Python 3.8
+    if sys.version_info < (3, 8):
+        if isinstance(node, ast.Num) and isinstance(node.n, int):
+            return node.n
+
+    elif isinstance(node, ast.Constant) and isinstance(node.value, int):
+        return node.value
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _unary_operators:
+        operand = _evaluate_node(node.operand)
+
+        return _unary_operators[type(node.op)](operand) if operand is not None else None
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _binary_operators:
+        left = _evaluate_node(node.left)
+        right = _evaluate_node(node.right)
+
+        if left is None or right is None:
+            return None
+
+        try:
+            return _binary_operators[type(node.op)](left, right)
+
+        except (ZeroDivisionError, ValueError):
+            return None
+
+    return None
@@ -1,5 +1,6 @@
 from pathlib import Path
 import json
+import hashlib
 from typing import Mapping, Any, Sequence
 import logging
 
@@ -7,12 +8,28 @@ from lemonspotter.core.database import Database
 from lemonspotter.core.function import Function
 from lemonspotter.core.type import Type
 from lemonspotter.core.constant import Constant
+from lemonspotter.core.profiler import profiled
 
 
 class MPIParser:
     def __call__(self, database_path: Path) -> None:
         self.parse(database_path)
 
+    @staticmethod
+    def fingerprint(database_path: Path) -> str:
+        """
+        Provides a short hash of the database files, their paths and contents.
+        """
+
+        digest = hashlib.sha256()
+
+        for path in sorted(database_path.glob('**/*.json')):
+            digest.update(str(path.relative_to(database_path)).encode() + b'\0')
+            digest.update(path.read_bytes() + b'\0')
+
+        return digest.hexdigest()[:16]
+
+    @profiled('parse')
     def parse(self, database_path: Path) -> None:
         self.parse_types(database_path)
         self.parse_constants(database_path)
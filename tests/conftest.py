@@ -0,0 +1,135 @@
+from collections import Counter
+from threading import Lock
+import time
+
+from pytest import fixture
+
+from lemonspotter.core.database import Database
+from lemonspotter.executors.capture import Capture
+from lemonspotter.executors.mpiexecutor import MPIExecutor, BuildResult, RunResult
+
+
+class FakeExecutor(MPIExecutor):
+    """
+    This executor builds and runs tests without a toolchain. Sources mentioning the rejected
+    name and tests named after it fail to build, or fail to run if failing_run is set. Builds
+    of tests in missing raise as if the compiler was missing. A run captures the value for every
+    variable of the test, the value is either a string or a function of the test and the name
+    of the variable.
+
+    Compiles and launches of tests whose name starts with a prefix in build_delays or run_delays
+    take the given seconds. Executions, compiles, launches and evaluations are recorded in
+    events in the order they finish, and the peak number of processes running at the same time
+    is kept.
+    """
+
+    def __init__(self,
+                 rejected=None,
+                 failing_run=False,
+                 value='0',
+                 build_delays={},
+                 run_delays={},
+                 missing=(),
+                 jobs=4,
+                 cores=4,
+                 **options) -> None:
+        super().__init__('mpicc', 'mpiexec', jobs=jobs, cores=cores, precompiled_header=False,
+                         **options)
+
+        self._rejected = rejected
+        self._failing_run = failing_run
+        self._value = value
+        self._build_delays = build_delays
+        self._run_delays = run_delays
+        self._missing = missing
+
+        self._lock = Lock()
+        self.events = []
+        self.compiled = Counter()
+        self.launched = []
+        self.in_use = 0
+        self.peak = 0
+
+    @staticmethod
+    def _delay(delays, name):
+        return next((delay for prefix, delay in delays.items() if name.startswith(prefix)), 0)
+
+    def _rejects(self, name, source):
+        return self._rejected is not None and (self._rejected in name or
+                                               self._rejected in source)
+
+    def prepare(self):
+        return []
+
+    def execute(self, tests):
+        tests = list(tests)
+        self.events.append(('execute', len(tests)))
+
+        super().execute(tests)
+
+    def compile_source(self, name, source, arguments=[], executable=None):
+        time.sleep(self._delay(self._build_delays, name))
+
+        with self._lock:
+            self.events.append(('compile', name))
+            self.compiled[name] += 1
+
+        if name in self._missing:
+            raise FileNotFoundError('mpicc')
+
+        if self._rejects(name, source) and not self._failing_run:
+            return BuildResult(self.test_directory / name, '',
+                               f'error: {self._rejected} undeclared')
+
+        return BuildResult(self.test_directory / name, '', '')
+
+    def launch_test(self, test, arguments=[]):
+        with self._lock:
+            self.launched.append(test.name)
+
+            self.in_use += test.processes
+            self.peak = max(self.peak, self.in_use)
+
+        time.sleep(self._delay(self._run_delays, test.name))
+
+        with self._lock:
+            self.events.append(('launch', test.name))
+            self.in_use -= test.processes
+
+        # workers launch tests without their source
+        source = test._source
+
+        if self._failing_run and self._rejects(test.name, repr(source)):
+            return RunResult(1, '', 'Segmentation fault')
+
+        variables = source.variables(test.entry) if source is not None else {}
+
+        return RunResult(0, '', '', False,
+                         tuple(Capture(0, name, variable.type.abstract_type,
+                                       self._value(test, name) if callable(self._value) else
+                                       self._value)
+                               for name, variable in variables.items()))
+
+    def evaluate_build(self, test, result):
+        self.events.append(('build', test.name))
+        super().evaluate_build(test, result)
+
+    def evaluate_run(self, test, result):
+        self.events.append(('run', test.name))
+        super().evaluate_run(test, result)
+
+
+@fixture
+def database():
+    """Provides the database, which is cleared before and after the test."""
+
+    Database().clear()
+    yield Database()
+    Database().clear()
+
+
+@fixture
+def fake_executor():
+    """Provides the fake executor class, tests construct it with their options."""
+
+    return FakeExecutor
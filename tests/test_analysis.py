@@ -0,0 +1,77 @@
+from pytest import raises
+
+import numpy as np
+
+from lemonspotter.core.analysis import Analysis
+
+
+class TestAnalysis:
+    def test_invalid_confidence(self) -> None:
+        with raises(ValueError):
+            Analysis(confidence=1.0)
+
+        with raises(ValueError):
+            Analysis(resamples=0)
+
+    def test_warmup(self) -> None:
+        noise = np.random.default_rng(1).normal(1.0, 0.01, 90)
+        samples = np.concatenate((np.linspace(10.0, 2.0, 10), noise))
+
+        assert 8 <= Analysis.warmup(samples) <= 12
+        assert Analysis.warmup(noise) <= 10
+        assert Analysis.warmup([3.0, 2.0, 1.0]) == 0
+
+    def test_reject_outliers(self) -> None:
+        samples = [1.0, 1.1, 0.9, 1.0, 1.05, 0.95, 100.0]
+
+        assert list(Analysis().reject_outliers(samples)) == samples[:-1]
+        assert list(Analysis().reject_outliers([2.0, 2.0, 2.0])) == [2.0, 2.0, 2.0]
+
+    def test_interval(self) -> None:
+        samples = np.random.default_rng(2).normal(5.0, 0.1, 200)
+
+        low, high = Analysis().interval(samples)
+
+        assert low < 5.0 < high
+        assert Analysis().interval(samples) == (low, high)
+
+        with raises(ValueError):
+            Analysis().interval([])
+
+    def test_additional_repetitions(self) -> None:
+        generator = np.random.default_rng(3)
+        analysis = Analysis(precision=0.01)
+
+        assert analysis.additional_repetitions(generator.normal(1.0, 0.001, 100)) == 0
+        assert analysis.additional_repetitions(generator.normal(1.0, 0.5, 100)) > 100
+
+    def test_summarize(self) -> None:
+        samples = [20.0] + [1.0, 2.0, 3.0] * 10
+
+        summary = Analysis().summarize(samples)
+
+        assert summary['median'] == 2.0
+        assert summary['samples'] == 31
+        assert summary['warmup'] + summary['outliers'] == 1
+        assert summary['p5'] <= summary['median'] <= summary['p95']
+        assert Analysis().summarize([]) is None
+
+    def test_exceeds(self) -> None:
+        samples = np.random.default_rng(4).normal(1.0, 0.1, 100)
+
+        assert Analysis().exceeds(samples, 0.5)
+        assert not Analysis().exceeds(samples, 1.0)
+        assert not Analysis().exceeds([], 0.0)
+
+    def test_compare(self) -> None:
+        generator = np.random.default_rng(5)
+        reference = generator.normal(1.0, 0.1, 100)
+
+        slower = Analysis().compare(reference, generator.normal(1.5, 0.1, 100))
+        assert slower['significant']
+        assert slower['interval'][0] > 0.3
+
+        same = Analysis().compare(reference, generator.normal(1.0, 0.1, 100))
+        assert not same['significant']
+
+        assert Analysis().compare([], reference) is None
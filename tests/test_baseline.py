@@ -0,0 +1,31 @@
+from lemonspotter.core.baseline import BaselineStore
+
+
+class TestBaselineStore:
+    def test_save_and_load(self, tmp_path) -> None:
+        store = BaselineStore(tmp_path / 'baselines')
+
+        assert store.fingerprints == ()
+        assert store.load('fingerprint') is None
+
+        store.save('fingerprint', {'MPI_Init': {'latency_samples': [1.0, 2.0]}}, 'mpicc 1.0')
+        store.save('fingerprint', {'MPI_Finalize': {'latency_samples': [3.0]}})
+
+        baseline = store.load('fingerprint')
+
+        assert baseline['fingerprint'] == 'fingerprint'
+        assert baseline['description'] == 'mpicc 1.0'
+        assert baseline['functions'] == {'MPI_Init': {'latency_samples': [1.0, 2.0]},
+                                         'MPI_Finalize': {'latency_samples': [3.0]}}
+
+    def test_resolve(self, tmp_path) -> None:
+        store = BaselineStore(tmp_path)
+
+        store.save('abc123', {})
+        store.save('abd456', {})
+
+        assert store.fingerprints == ('abc123', 'abd456')
+        assert store.resolve('abc') == 'abc123'
+        assert store.resolve('abd456') == 'abd456'
+        assert store.resolve('ab') is None
+        assert store.resolve('x') is None
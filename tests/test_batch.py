@@ -0,0 +1,75 @@
+from lemonspotter.core.test import Test, TestType, TestOutcome
+from lemonspotter.executors.batch import BatchExecutor
+
+
+def fake_launcher(tmp_path) -> str:
+    # a launcher which executes the executable once, whatever the number of processes
+    launcher = tmp_path / 'mpiexec'
+    launcher.write_text('#!/bin/sh\nshift 2\nexec "$@"\n')
+    launcher.chmod(0o755)
+
+    return str(launcher)
+
+
+def generate_tests(tmp_path, programs, processes=None):
+    tests = []
+    for idx, program in enumerate(programs):
+        executable = tmp_path / f'test_{idx}'
+        executable.write_text('#!/bin/sh\n' + program + '\n')
+        executable.chmod(0o755)
+
+        test = Test(f'test_{idx}', TestType.BUILD_AND_RUN,
+                    processes=processes[idx] if processes else 1)
+        test.executable = executable
+        tests.append(test)
+
+    return tests
+
+
+class TestBatchExecutor:
+    def test_waves_fit_allocation(self, tmp_path) -> None:
+        executor = BatchExecutor('mpicc', 'mpiexec', cores=4)
+        tests = generate_tests(tmp_path, [''] * 6, processes=[1, 4, 2, 3, 2, 1])
+
+        waves = executor.waves(tests)
+
+        assert all(sum(test.processes for _, test in wave) <= 4 for wave in waves)
+        assert sorted(index for wave in waves for index, _ in wave) == list(range(6))
+        assert len(waves) == 4
+
+    def test_local_submission(self, tmp_path) -> None:
+        executor = BatchExecutor('mpicc', fake_launcher(tmp_path),
+                                 submit=['sh'],
+                                 test_directory=tmp_path,
+                                 cores=2,
+                                 run_timeout=1)
+
+        executor.kill_after = 1
+
+        tests = generate_tests(tmp_path, ['exit 0', 'exit 3', 'sleep 10',
+                                          r'printf "\036""0|value|INT|5\037\n"; echo output',
+                                          'trap "" TERM; sleep 10'])
+
+        results = executor.run_allocation(tests)
+
+        assert results[tests[0]].returncode == 0
+        assert results[tests[1]].returncode == 3
+        assert results[tests[2]].timed_out
+        assert results[tests[4]].timed_out
+        assert results[tests[3]].stdout == 'output\n'
+        assert [tuple(capture) for capture in results[tests[3]].captures] == [(0, 'value',
+                                                                              'INT', '5')]
+
+        executor.run_tests(tests[:3])
+
+        assert tests[0].run_outcome is TestOutcome.SUCCESS
+        assert tests[1].run_outcome is TestOutcome.FAILED
+        assert tests[2].run_outcome is TestOutcome.TIMEOUT
+
+    def test_missing_results_fail(self, tmp_path) -> None:
+        executor = BatchExecutor('mpicc', 'mpiexec', submit=['true'], test_directory=tmp_path)
+        tests = generate_tests(tmp_path, ['exit 0'])
+
+        executor.run_tests(tests)
+
+        assert tests[0].run_outcome is TestOutcome.FAILED
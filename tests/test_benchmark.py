@@ -0,0 +1,79 @@
+import json
+
+from lemonspotter.core.benchmark import SyntheticDatabase, BenchmarkSuite
+from lemonspotter.parsers.mpiparser import MPIParser
+
+
+class TestSyntheticDatabase:
+    def test_write(self, tmp_path, database) -> None:
+        synthetic = SyntheticDatabase(20)
+        synthetic.write(tmp_path)
+
+        assert synthetic.pairs == 3
+        assert len(list((tmp_path / 'functions').glob('*.json'))) == 20
+
+        MPIParser()(tmp_path)
+
+        assert len(database.get_functions()) == 20
+        assert database.get_function('START_0').leads_all
+        assert database.get_function('END_0').needs_all
+
+    def test_reproducible(self) -> None:
+        assert SyntheticDatabase(20).functions() == SyntheticDatabase(20).functions()
+        assert SyntheticDatabase(20).functions() != SyntheticDatabase(20, seed=1).functions()
+
+
+class TestBenchmarkSuite:
+    def test_run_scale(self) -> None:
+        results = BenchmarkSuite().run_scale(20)
+
+        assert tuple(results) == BenchmarkSuite.stages
+        assert all(seconds > 0 for seconds in results.values())
+
+    def test_regressions(self) -> None:
+        suite = BenchmarkSuite(threshold=0.5)
+
+        previous = {'100': {'parse': 1.0, 'generate': 1.0, 'report': 0.001}}
+        results = {'100': {'parse': 1.4, 'generate': 2.0, 'report': 0.009},
+                   '1000': {'parse': 10.0}}
+
+        regressions = suite.regressions(previous, results)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith('generate at scale 100')
+
+    def test_exponents(self) -> None:
+        results = {'10': {'parse': 1.0, 'generate': 1.0},
+                   '100': {'parse': 10.0, 'generate': 100.0}}
+
+        exponents = BenchmarkSuite.exponents(results)
+
+        assert abs(exponents['parse'] - 1) < 1e-9
+        assert abs(exponents['generate'] - 2) < 1e-9
+        assert BenchmarkSuite.exponents({'10': {'parse': 1.0}}) == {}
+
+    def test_record(self, tmp_path) -> None:
+        suite = BenchmarkSuite()
+        history = tmp_path / 'logs' / 'benchmarks.jsonl'
+
+        assert suite.record(history, {'100': {'parse': 1.0}}) == []
+        assert len(suite.record(history, {'100': {'parse': 2.0}})) == 1
+
+        records = [json.loads(line) for line in history.read_text().splitlines()]
+        assert [record['results']['100']['parse'] for record in records] == [1.0, 2.0]
+
+    def test_record_against_recent_best(self, tmp_path) -> None:
+        suite = BenchmarkSuite()
+        history = tmp_path / 'benchmarks.jsonl'
+
+        suite.record(history, {'100': {'parse': 1.0}})
+
+        # the slow run does not become the baseline of the next one
+        assert len(suite.record(history, {'100': {'parse': 2.0}})) == 1
+        assert len(suite.record(history, {'100': {'parse': 2.0}})) == 1
+
+        # the fast run falls out of the window after enough records
+        for _ in range(BenchmarkSuite.history_window - 2):
+            suite.record(history, {'100': {'parse': 2.0}})
+
+        assert suite.record(history, {'100': {'parse': 2.0}}) == []
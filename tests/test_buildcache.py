@@ -0,0 +1,33 @@
+from lemonspotter.executors.buildcache import BuildCache
+
+
+class TestBuildCache:
+    def test_key_separates_parts(self) -> None:
+        assert BuildCache.key(['ab', 'c']) != BuildCache.key(['a', 'bc'])
+        assert BuildCache.key(['a', 'b']) == BuildCache.key(['a', 'b'])
+
+    def test_store_and_load(self, tmp_path) -> None:
+        cache = BuildCache(tmp_path / 'cache', 1024**2)
+
+        built = tmp_path / 'built'
+        built.write_text('binary')
+
+        cache.store('success', built, '', '')
+        cache.store('failure', None, '', 'error: undeclared')
+
+        placed = tmp_path / 'placed'
+        assert cache.load('success', placed) == ('', '')
+        assert placed.read_text() == 'binary'
+
+        assert cache.load('failure', tmp_path / 'missing') == ('', 'error: undeclared')
+        assert not (tmp_path / 'missing').exists()
+
+        assert cache.load('unknown', placed) is None
+
+    def test_prune_evicts_to_size(self, tmp_path) -> None:
+        cache = BuildCache(tmp_path / 'cache', 0)
+        cache.store('failure', None, '', 'error')
+
+        cache.prune()
+
+        assert cache.load('failure', tmp_path / 'placed') is None
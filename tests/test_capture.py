@@ -0,0 +1,45 @@
+from lemonspotter.executors.capture import Capture, CaptureParser, BoundedOutput
+
+
+def parse(pieces, **options):
+    captures = []
+    output = []
+
+    parser = CaptureParser(captures.append, output.append, **options)
+    for piece in pieces:
+        parser.feed(piece)
+
+    return captures, ''.join(output)
+
+
+class TestCaptureParser:
+    def test_values_with_separators(self) -> None:
+        captures, output = parse(['before\n\x1e1|name|STRING|a value | with bars\x1f\nafter\n'])
+
+        assert captures == [Capture(1, 'name', 'STRING', 'a value | with bars')]
+        assert output == 'before\nafter\n'
+
+    def test_frames_split_across_pieces(self) -> None:
+        text = '\x1e0|first|INT|1\x1f\n\x1e0|second|INT|2\x1f\n'
+        captures, output = parse(text)
+
+        assert captures == [Capture(0, 'first', 'INT', '1'), Capture(0, 'second', 'INT', '2')]
+        assert output == ''
+
+    def test_oversized_and_cut_off_frames_are_discarded(self) -> None:
+        captures, output = parse(['\x1e0|large|STRING|' + 'x' * 100 + '\x1f\n',
+                                  '\x1e0|cut|IN',
+                                  '\x1e0|kept|INT|3\x1f\n'],
+                                 max_frame_length=64)
+
+        assert captures == [Capture(0, 'kept', 'INT', '3')]
+
+
+class TestBoundedOutput:
+    def test_drops_beyond_maximum(self) -> None:
+        output = BoundedOutput(4)
+        output.append('abc')
+        output.append('def')
+
+        assert str(output).startswith('abcd')
+        assert '2 characters dropped' in str(output)
@@ -0,0 +1,20 @@
+from pytest import raises
+
+from lemonspotter.generators.collective import CollectiveGenerator
+
+
+class TestCollectiveGenerator:
+    def test_ranks(self) -> None:
+        assert CollectiveGenerator(1).ranks == (1,)
+        assert CollectiveGenerator(4).ranks == (1, 2, 4)
+        assert CollectiveGenerator(6).ranks == (1, 2, 4)
+
+    def test_invalid_ranks(self) -> None:
+        with raises(ValueError):
+            CollectiveGenerator(0)
+
+    def test_default_sizes(self) -> None:
+        generator = CollectiveGenerator(2)
+
+        assert generator.sizes[0] == 1
+        assert generator.sizes[-1] == 1024**2
@@ -0,0 +1,93 @@
+from collections import Counter
+
+from lemonspotter.core.benchmark import SyntheticDatabase
+from lemonspotter.core.database import Database
+from lemonspotter.core.runtime import Runtime
+from lemonspotter.generators.constantpresence import ConstantPresenceGenerator
+from lemonspotter.parsers.headerparser import HeaderParser
+from lemonspotter.parsers.mpiparser import MPIParser
+
+
+def presence(tmp_path, executor, batch):
+    Database().clear()
+    SyntheticDatabase(8).write(tmp_path)
+
+    runtime = Runtime(tmp_path, executor)
+    runtime.presence_testing(constant_batch=batch)
+
+    constants = {constant.name: (constant.properties['present'],
+                                 constant.properties.get('value'))
+                 for constant in Database().get_constants()}
+    logged = {test.name: (test.build_outcome, test.run_outcome)
+              for test in runtime.reporter.tests
+              if test.name.startswith('constant_presence_')}
+
+    Database().clear()
+
+    return constants, logged
+
+
+class TestConstantBatches:
+    def test_rejected_constant_matches_unbatched(self, tmp_path, fake_executor) -> None:
+        unbatched = presence(tmp_path, fake_executor('CONSTANT_3', value='7'), 1)
+
+        for batch in (2, 4, 16):
+            assert presence(tmp_path, fake_executor('CONSTANT_3', value='7'), batch) == unbatched
+
+        constants, logged = unbatched
+
+        assert [name for name, (present, _) in constants.items() if not present] == \
+            ['CONSTANT_3']
+        assert constants['CONSTANT_0'] == (True, '7')
+        assert len(logged) == len(constants)
+
+    def test_failed_run_matches_unbatched(self, tmp_path, fake_executor) -> None:
+        unbatched = presence(tmp_path, fake_executor('CONSTANT_3', True, '7'), 1)
+        batched = presence(tmp_path, fake_executor('CONSTANT_3', True, '7'), 4)
+
+        assert batched == unbatched
+        assert all(present for present, _ in batched[0].values())
+
+    def test_members_built_once(self, tmp_path, monkeypatch, fake_executor) -> None:
+        calls = Counter()
+
+        class CountingGenerator(ConstantPresenceGenerator):
+            def generate_test(self, constant):
+                test = super().generate_test(constant)
+                build_success = test.build_success_function
+
+                def counted():
+                    calls[constant.name] += 1
+                    build_success()
+
+                test.build_success_function = counted
+
+                return test
+
+        monkeypatch.setattr('lemonspotter.core.runtime.ConstantPresenceGenerator',
+                            CountingGenerator)
+
+        # the batch of all constants builds, but is bisected down to the failing run
+        presence(tmp_path, fake_executor('CONSTANT_3', True, '7'), 16)
+
+        assert len(calls) == 9
+        assert set(calls.values()) == {1}
+
+
+class TestIntrospection:
+    def test_values_out_of_range_evaluated_at_runtime(self, tmp_path, database) -> None:
+        SyntheticDatabase(8).write(tmp_path)
+        MPIParser()(tmp_path)
+
+        header = HeaderParser()
+        header('#define CONSTANT_0 7\n'
+               '#define CONSTANT_1 (1U << 31)\n'
+               '#define CONSTANT_2 0xFFFFFFFF\n')
+
+        assert ConstantPresenceGenerator().introspect(header) == 1
+
+        resolved = {constant.name: constant.properties.get('value')
+                    for constant in database.get_constants()
+                    if constant.properties.get('presence_tested', False)}
+
+        assert resolved == {'CONSTANT_0': '7'}
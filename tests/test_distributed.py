@@ -0,0 +1,116 @@
+from pytest import raises
+
+from threading import Thread, Timer
+import time
+
+from lemonspotter.core.source import Source
+from lemonspotter.core.test import Test, TestType, TestOutcome
+from lemonspotter.executors.distributed import DistributedExecutor, Worker, parse_address
+from lemonspotter.executors.mpiexecutor import MPIExecutor
+from lemonspotter.executors.toolchain import Toolchain
+
+
+def start_worker(address: str, executor: MPIExecutor, name: str, slots: int = 2) -> Thread:
+    worker = Worker(address, executor, slots=slots, name=name)
+    thread = Thread(target=worker.run, daemon=True)
+    thread.start()
+
+    return thread
+
+
+def worker_executor(fake_executor, directory, delay=0):
+    return fake_executor('fails', run_delays={'': delay}, test_directory=directory,
+                         jobs=2, cores=2)
+
+
+def generate_tests(names):
+    return [Test(name, TestType.BUILD_AND_RUN, Source()) for name in names]
+
+
+class TestAddress:
+    def test_tcp(self) -> None:
+        family, location = parse_address('localhost:4000')
+
+        assert location == ('localhost', 4000)
+
+    def test_unix(self) -> None:
+        family, location = parse_address('unix:/tmp/coordinator')
+
+        assert location == '/tmp/coordinator'
+
+
+class TestDistributedExecutor:
+    def test_workers_execute_all_tests(self, tmp_path, fake_executor) -> None:
+        coordinator = DistributedExecutor('127.0.0.1:0', Toolchain('mpicc', 'mpiexec'))
+
+        executors = [worker_executor(fake_executor, tmp_path / str(idx), 0.01)
+                     for idx in range(2)]
+        threads = [start_worker(coordinator.address, executor, f'worker_{idx}')
+                   for idx, executor in enumerate(executors)]
+
+        tests = generate_tests([f'test_{idx}' for idx in range(20)] + ['test_fails'])
+        coordinator.execute(tests)
+        coordinator.close()
+
+        for thread in threads:
+            thread.join(timeout=10)
+
+        assert all(test.outcome is TestOutcome.SUCCESS for test in tests[:-1])
+        assert tests[-1].build_outcome is TestOutcome.FAILED
+        assert tests[-1].run_outcome is TestOutcome.FAILED
+
+        launched = executors[0].launched + executors[1].launched
+        assert sorted(set(launched)) == sorted(test.name for test in tests[:-1])
+
+    def test_slow_worker_task_is_handed_out_again(self, tmp_path, fake_executor) -> None:
+        coordinator = DistributedExecutor(f'unix:{tmp_path / "socket"}',
+                                          Toolchain('mpicc', 'mpiexec'))
+
+        slow = worker_executor(fake_executor, tmp_path / 'slow', 5)
+        start_worker(coordinator.address, slow, 'slow', slots=1)
+
+        # the slow worker takes the first task before the fast one connects
+        tests = generate_tests([f'test_{idx}' for idx in range(4)])
+        executing = Thread(target=coordinator.execute, args=(tests,))
+        executing.start()
+
+        while not slow.launched:
+            time.sleep(0.01)
+
+        fast = worker_executor(fake_executor, tmp_path / 'fast')
+        start_worker(coordinator.address, fast, 'fast')
+
+        start = time.monotonic()
+        executing.join(timeout=10)
+
+        assert time.monotonic() - start < 4
+        assert all(test.outcome is TestOutcome.SUCCESS for test in tests)
+        assert sorted(fast.launched) == sorted(test.name for test in tests)
+
+        coordinator.close()
+
+    def test_no_worker_times_out(self, tmp_path) -> None:
+        coordinator = DistributedExecutor('127.0.0.1:0', Toolchain('mpicc', 'mpiexec'),
+                                          timeout=0.2)
+
+        tests = generate_tests(['test_0'])
+
+        with raises(ConnectionError):
+            coordinator.execute(tests)
+
+        with raises(ConnectionError):
+            coordinator.cores
+
+        assert tests[0].build_outcome is None
+
+        coordinator.close()
+
+    def test_cores_wait_for_worker(self, tmp_path, fake_executor) -> None:
+        coordinator = DistributedExecutor('127.0.0.1:0', Toolchain('mpicc', 'mpiexec'))
+
+        executor = worker_executor(fake_executor, tmp_path)
+        Timer(0.2, start_worker, args=(coordinator.address, executor, 'late')).start()
+
+        assert coordinator.cores == 2
+
+        coordinator.close()
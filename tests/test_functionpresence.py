@@ -0,0 +1,72 @@
+from lemonspotter.core.benchmark import SyntheticDatabase
+from lemonspotter.executors.toolchain import Toolchain
+from lemonspotter.generators.functionpresence import FunctionPresenceGenerator
+from lemonspotter.parsers.mpiparser import MPIParser
+
+
+SYMBOLS = '''
+libmpi.so:
+0000000000001000 T START_0@@MPI_1.0
+0000000000001100 W END_1
+0000000000001200 T PEND_0
+0000000000001300 D FUNCTION_0
+0000000000001400 i FUNCTION_1
+                 U FUNCTION_2
+'''
+
+
+def fake_toolchain(tmp_path, nm=True):
+    # a compiler wrapper linking against libmpi.so, whose symbols are listed by nm
+    (tmp_path / 'libmpi.so').write_text('')
+
+    compiler = tmp_path / 'mpicc'
+    compiler.write_text('#!/bin/sh\n'
+                        f'if [ "$1" = "-show" ]; then echo "cc -L{tmp_path} -lmpi"; '
+                        'else echo "${1#-print-file-name=}"; fi\n')
+    compiler.chmod(0o755)
+
+    lister = tmp_path / 'nm'
+    if nm:
+        (tmp_path / 'symbols').write_text(SYMBOLS)
+        lister.write_text(f'#!/bin/sh\ncat {tmp_path / "symbols"}\n')
+        lister.chmod(0o755)
+
+    return Toolchain(str(compiler), 'mpiexec', str(lister))
+
+
+def parse_database(tmp_path):
+    directory = tmp_path / 'database'
+    SyntheticDatabase(8).write(directory)
+    MPIParser()(directory)
+
+
+class TestSymbolPresence:
+    def test_exported_functions(self, tmp_path) -> None:
+        toolchain = fake_toolchain(tmp_path)
+
+        assert toolchain.libraries == ((tmp_path / 'libmpi.so').resolve(),)
+        assert toolchain.exported_functions() == {'START_0', 'END_1', 'PEND_0', 'FUNCTION_1'}
+
+    def test_probe_symbols(self, tmp_path, database) -> None:
+        parse_database(tmp_path)
+        generator = FunctionPresenceGenerator()
+
+        assert generator.probe_symbols(fake_toolchain(tmp_path).exported_functions()) == 3
+
+        present = {function.name for function in database.get_functions()
+                   if function.properties.get('present')}
+        tested = {test.name for test in generator.generate()}
+
+        assert present == {'START_0', 'END_1', 'FUNCTION_1'}
+        # only exported by the profiling layer, tested by compilation
+        assert 'function_presence_END_0' in tested
+        assert len(tested) == len(database.get_functions()) - 3
+
+    def test_missing_nm_falls_back(self, tmp_path, database) -> None:
+        parse_database(tmp_path)
+        generator = FunctionPresenceGenerator()
+
+        toolchain = fake_toolchain(tmp_path, nm=False)
+
+        assert generator.probe_symbols(toolchain.exported_functions()) == 0
+        assert len(generator.generate()) == len(database.get_functions())
@@ -0,0 +1,55 @@
+from lemonspotter.parsers.headerparser import HeaderParser
+
+
+PREPROCESSED = '''# 1 "<stdin>"
+#define MPI_SUCCESS 0
+#define MPI_ERR_LASTCODE (MPI_ERR_BASE + 0x10UL)
+#define MPI_ERR_BASE 020
+#define MPI_COMM_WORLD OMPI_PREDEFINED_GLOBAL( MPI_Comm, ompi_mpi_comm_world)
+#define OMPI_PREDEFINED_GLOBAL(type, global) ((type) ((void *) &(global)))
+enum {
+  MPI_THREAD_SINGLE,
+  MPI_THREAD_FUNNELED = 4,
+  MPI_THREAD_MULTIPLE
+};
+__attribute__((visibility("default"))) int MPI_Send(const void *buf, int count);
+'''
+
+
+class TestHeaderParser:
+    def test_macro_values(self) -> None:
+        header = HeaderParser()
+        header(PREPROCESSED)
+
+        assert header.value('MPI_SUCCESS') == 0
+        assert header.value('MPI_ERR_LASTCODE') == 32
+
+        assert header.defines('MPI_COMM_WORLD')
+        assert header.value('MPI_COMM_WORLD') is None
+
+        assert not header.defines('MPI_NONEXISTENT')
+
+    def test_large_literals_unresolved(self) -> None:
+        header = HeaderParser()
+        header('#define MPI_LARGE 0xFFFFFFFF\n'
+               '#define MPI_DERIVED (MPI_LARGE >> 4)\n'
+               '#define MPI_SHIFTED (1U << 31)\n')
+
+        assert header.value('MPI_LARGE') is None
+        assert header.value('MPI_DERIVED') is None
+        assert header.value('MPI_SHIFTED') == 2**31
+
+    def test_enumerators(self) -> None:
+        header = HeaderParser()
+        header(PREPROCESSED)
+
+        assert header.value('MPI_THREAD_SINGLE') == 0
+        assert header.value('MPI_THREAD_FUNNELED') == 4
+        assert header.value('MPI_THREAD_MULTIPLE') == 5
+
+    def test_declarations(self) -> None:
+        header = HeaderParser()
+        header(PREPROCESSED)
+
+        assert 'MPI_Send' in header.declarations
+        assert 'MPI_Recv' not in header.declarations
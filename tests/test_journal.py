@@ -0,0 +1,87 @@
+from lemonspotter.core.journal import Journal
+from lemonspotter.core.source import Source
+from lemonspotter.core.statement import CommentStatement
+from lemonspotter.core.test import Test, TestType
+
+
+class TestJournal:
+    def test_resume_records(self, tmp_path) -> None:
+        path = tmp_path / 'journal.jsonl'
+        test = Test('test', TestType.BUILD_AND_RUN, Source())
+
+        journal = Journal(path)
+        journal.record(test, 'build', {'stdout': '', 'stderr': ''})
+        journal.close()
+
+        # a record truncated by a crash
+        with path.open('a') as journal_file:
+            journal_file.write('{"test": "test", "phase": "ru')
+
+        journal = Journal(path, resume=True)
+
+        assert journal.lookup(test, 'build') is not None
+        assert journal.lookup(test, 'run') is None
+
+        journal.record(test, 'run', {'returncode': 0})
+        journal.close()
+
+        journal = Journal(path, resume=True)
+
+        assert journal.lookup(test, 'run')['returncode'] == 0
+
+    def test_changed_source_is_not_resumed(self, tmp_path) -> None:
+        path = tmp_path / 'journal.jsonl'
+        test = Test('test', TestType.BUILD_ONLY, Source())
+
+        journal = Journal(path)
+        journal.record(test, 'build', {'stdout': '', 'stderr': ''})
+        journal.close()
+
+        test.source = Source()
+        test.source.add_at_end(CommentStatement('changed'))
+
+        journal = Journal(path, resume=True)
+
+        assert journal.lookup(test, 'build') is None
+
+    def test_source_hashed_once(self, tmp_path) -> None:
+        renders = []
+
+        class CountingSource(Source):
+            def __repr__(self):
+                renders.append(self)
+                return super().__repr__()
+
+        test = Test('test', TestType.BUILD_AND_RUN, CountingSource())
+
+        journal = Journal(tmp_path / 'journal.jsonl')
+        store = Journal(tmp_path / 'store.jsonl', resume=True)
+
+        for current in (journal, store):
+            assert current.lookup(test, 'build') is None
+            current.record(test, 'build', {'stdout': '', 'stderr': ''})
+            current.record(test, 'run', {'returncode': 0})
+
+        assert len(renders) == 1
+
+        # a replaced source is hashed again
+        test.source = CountingSource()
+        journal.lookup(test, 'build')
+
+        assert len(renders) == 2
+
+    def test_synced_in_batches(self, tmp_path, monkeypatch) -> None:
+        syncs = []
+        monkeypatch.setattr('os.fsync', syncs.append)
+
+        journal = Journal(tmp_path / 'journal.jsonl')
+        for index in range(Journal.sync_interval * 2 + 1):
+            journal.record(Test(f'test_{index}', TestType.BUILD_ONLY, Source()), 'build', {})
+
+        assert len(syncs) == 2
+
+        journal.close()
+        journal.close()
+
+        assert len(syncs) == 3
+        assert len((tmp_path / 'journal.jsonl').read_text().splitlines()) == 129
@@ -0,0 +1,227 @@
+from pathlib import Path
+import signal
+import time
+
+from pytest import raises
+
+from lemonspotter.core.source import Source
+from lemonspotter.core.test import Test, TestType, TestOutcome
+from lemonspotter.executors.mpiexecutor import MPIExecutor
+
+
+def generate_tests(processes):
+    tests = []
+    for idx, count in enumerate(processes):
+        test = Test(f'test_{idx}', TestType.BUILD_AND_RUN, processes=count)
+        test.executable = Path(test.name)
+        tests.append(test)
+
+    return tests
+
+
+class TestRunScheduling:
+    def test_packs_within_core_budget(self, fake_executor) -> None:
+        executor = fake_executor(cores=4, run_delays={'': 0.01})
+        tests = generate_tests([1, 4, 2, 1, 3, 2, 1, 1])
+
+        executor.run_tests(tests)
+
+        assert executor.peak <= 4
+        assert all(test.run_outcome is TestOutcome.SUCCESS for test in tests)
+
+    def test_oversized_test_fails(self, fake_executor) -> None:
+        executor = fake_executor(cores=2)
+        tests = generate_tests([1, 3])
+
+        executor.run_tests(tests)
+
+        assert tests[0].run_outcome is TestOutcome.SUCCESS
+        assert tests[1].run_outcome is TestOutcome.FAILED
+
+
+def evaluated(executor):
+    return [name for event, name in executor.events if event == 'build']
+
+
+class TestBuildScheduling:
+    def test_builds_evaluated_in_submission_order(self, fake_executor) -> None:
+        # later tests finish compiling first
+        tests = [Test(f'test_{idx}', TestType.BUILD_ONLY, Source()) for idx in range(6)]
+        executor = fake_executor(build_delays={test.name: 0.05 * (6 - idx)
+                                               for idx, test in enumerate(tests)})
+
+        executor.build_tests(tests)
+
+        assert list(executor.compiled) != evaluated(executor)
+        assert evaluated(executor) == [test.name for test in tests]
+        assert all(test.build_outcome is TestOutcome.SUCCESS for test in tests)
+
+    def test_shared_source_built_once(self, fake_executor) -> None:
+        source = Source()
+        tests = [Test(f'test_{idx}', TestType.BUILD_ONLY, source) for idx in range(3)]
+        executor = fake_executor()
+
+        executor.build_tests(tests)
+
+        assert list(executor.compiled) == ['test_0']
+        assert evaluated(executor) == ['test_0', 'test_1', 'test_2']
+
+    def test_missing_compiler_cancels_builds(self, fake_executor) -> None:
+        tests = [Test(f'test_{idx}', TestType.BUILD_ONLY, Source()) for idx in range(40)]
+        executor = fake_executor(build_delays={test.name: 0.05 for test in tests[1:]},
+                                 missing={'test_0'})
+
+        with raises(FileNotFoundError):
+            executor.build_tests(tests)
+
+        # builds which had not started when the first failed are cancelled
+        assert len(executor.compiled) < len(tests)
+        assert evaluated(executor) == []
+
+
+class TestTimeout:
+    def test_run_timeout_kills_process_group(self, tmp_path) -> None:
+        # a launcher which leaves a child behind holding the output pipes
+        launcher = tmp_path / 'mpiexec'
+        launcher.write_text('#!/bin/sh\nsleep 30 &\nsleep 30\n')
+        launcher.chmod(0o755)
+
+        executor = MPIExecutor('mpicc', str(launcher), test_directory=tmp_path, run_timeout=0.5)
+        tests = generate_tests([1])
+
+        start = time.monotonic()
+        executor.run_tests(tests)
+
+        assert time.monotonic() - start < 10
+        assert tests[0].run_outcome is TestOutcome.TIMEOUT
+
+
+class TestResourceLimits:
+    def test_limits_applied_to_launch(self, tmp_path) -> None:
+        # a launcher which reports the limits it was started with
+        launcher = tmp_path / 'mpiexec'
+        launcher.write_text('#!/bin/sh\nulimit -t\nulimit -v\n')
+        launcher.chmod(0o755)
+
+        executor = MPIExecutor('mpicc', str(launcher), test_directory=tmp_path,
+                               cpu_limit=7, memory_limit=512 * 1024**2)
+
+        result = executor.launch_test(generate_tests([1])[0])
+
+        assert result.returncode == 0
+        assert result.stdout == '7\n524288\n'
+
+    def test_missing_command_with_limits(self, tmp_path) -> None:
+        executor = MPIExecutor('mpicc', str(tmp_path / 'missing'), test_directory=tmp_path,
+                               cpu_limit=7)
+
+        assert executor.launch_test(generate_tests([1])[0]) is None
+
+
+def fake_compiler(tmp_path):
+    # a compiler which copies its input, a file or standard input, to the output
+    compiler = tmp_path / 'mpicc'
+    compiler.write_text('#!/bin/sh\n'
+                        'eval output=\\${$#}\n'
+                        'if [ "$1" = "-x" ]; then cat > "$output"; else cp "$1" "$output"; fi\n')
+    compiler.chmod(0o755)
+
+    return str(compiler)
+
+
+class TestArtifacts:
+    def test_in_memory_build_reads_standard_input(self, tmp_path) -> None:
+        executor = MPIExecutor(fake_compiler(tmp_path), 'mpiexec',
+                               test_directory=tmp_path / 'tests',
+                               precompiled_header=False,
+                               in_memory=True,
+                               keep=False)
+        executor.scratch_root = tmp_path
+
+        executor.prepare()
+        result = executor.compile_source('test', 'int main() {}\n')
+
+        assert result.built
+        assert result.executable.read_text() == 'int main() {}\n'
+        assert result.executable.parent != executor.test_directory
+        assert not (executor.test_directory / 'test.c').exists()
+
+        executor.close()
+
+        assert not result.executable.parent.exists()
+
+    def test_large_source_written_to_standard_input(self, tmp_path) -> None:
+        executor = MPIExecutor(fake_compiler(tmp_path), 'mpiexec',
+                               test_directory=tmp_path / 'tests',
+                               precompiled_header=False,
+                               in_memory=True)
+        executor.scratch_root = tmp_path
+
+        # larger than the buffer of a pipe
+        source = '/* padding */\n' * 100000 + 'int main() {}\n'
+
+        executor.prepare()
+        result = executor.compile_source('test', source)
+
+        assert result.built
+        assert result.executable.read_text() == source
+
+        executor.close()
+
+    def test_artifacts_removed_unless_kept(self, tmp_path) -> None:
+        for keep in (False, True):
+            directory = tmp_path / str(keep)
+            executor = MPIExecutor(fake_compiler(tmp_path), 'mpiexec',
+                                   test_directory=directory,
+                                   precompiled_header=False,
+                                   keep=keep)
+
+            executor.prepare()
+            result = executor.compile_source('test', 'int main() {}\n')
+            executor.close()
+
+            assert result.executable.exists() is keep
+            assert (directory / 'test.c').exists() is keep
+
+
+class TestResourceUsage:
+    def test_build_and_run_usage(self, tmp_path) -> None:
+        # a launcher which spends some CPU time in a child it waits for
+        launcher = tmp_path / 'mpiexec'
+        launcher.write_text('#!/bin/sh\nsh -c \'i=0; while [ $i -lt 20000 ]; do i=$((i+1)); '
+                            'done\'\n')
+        launcher.chmod(0o755)
+
+        executor = MPIExecutor(fake_compiler(tmp_path), str(launcher),
+                               test_directory=tmp_path / 'tests',
+                               precompiled_header=False)
+        executor.prepare()
+
+        test = Test('test', TestType.BUILD_AND_RUN, Source())
+
+        executor.build_test(test)
+        executor.run_test(test)
+
+        assert test.build_usage.wall > 0
+        assert test.run_usage.wall > 0
+        assert test.run_usage.user + test.run_usage.system > 0
+        assert test.run_usage.max_rss > 0
+
+    def test_returncode_of_signaled_launch(self, tmp_path) -> None:
+        launcher = tmp_path / 'mpiexec'
+        launcher.write_text('#!/bin/sh\necho output\nkill -TERM $$\n')
+        launcher.chmod(0o755)
+
+        executor = MPIExecutor('mpicc', str(launcher), test_directory=tmp_path)
+        result = executor.launch_test(generate_tests([1])[0])
+
+        assert result.returncode == -signal.SIGTERM
+        assert result.stdout == 'output\n'
+        assert result.usage is not None
+
+    def test_usage_of_record(self) -> None:
+        usage = MPIExecutor.usage({'usage': [1.0, 0.5, 0.25, 1024]})
+
+        assert usage.wall == 1.0
+        assert usage.max_rss == 1024
+        assert MPIExecutor.usage({}) is None
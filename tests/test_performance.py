@@ -0,0 +1,111 @@
+import random
+import re
+
+from pytest import raises
+
+from lemonspotter.core.benchmark import SyntheticDatabase
+from lemonspotter.core.runtime import Runtime
+from lemonspotter.generators.performance import PerformanceGenerator
+
+
+class TestPerformanceGenerator:
+    def test_invalid_repetitions(self) -> None:
+        with raises(ValueError):
+            PerformanceGenerator(repetitions=0)
+
+        with raises(ValueError):
+            PerformanceGenerator(repetitions=PerformanceGenerator.max_repetitions + 1)
+
+        with raises(ValueError):
+            PerformanceGenerator(warmup=-1)
+
+    def test_parse_timings(self) -> None:
+        generator = PerformanceGenerator(repetitions=3)
+
+        assert generator.parse_timings('1.0e-06 2.0e-06 3.0e-06 ') == [1e-6, 2e-6, 3e-6]
+
+    def test_parse_incomplete_timings(self) -> None:
+        generator = PerformanceGenerator(repetitions=3)
+
+        assert generator.parse_timings(None) is None
+        assert generator.parse_timings('1.0e-06 2.0e-06') is None
+        assert generator.parse_timings('1.0e-06 2.0e-06 nonsense') is None
+
+    def test_corrected(self) -> None:
+        generator = PerformanceGenerator(repetitions=3)
+
+        assert generator.corrected([3.0, 1.0, 2.0], [0.5, 0.5, 1.5]) == [2.5, 0.5, 1.5]
+        assert generator.corrected(None, [1.0]) is None
+
+    def test_summarize(self) -> None:
+        latency = PerformanceGenerator().summarize([2.5, 0.5, 1.5])
+
+        assert latency['median'] == 1.5
+        assert latency['latency'] == 1.5
+        assert latency['minimum'] == 0.5
+        assert latency['maximum'] == 2.5
+        assert latency['repetitions'] == 3
+        assert latency['interval'][0] <= 1.5 <= latency['interval'][1]
+
+    def test_summarize_overhead_exceeding_timings(self) -> None:
+        generator = PerformanceGenerator()
+        latency = generator.summarize(generator.corrected([1.0], [2.0]))
+
+        assert latency['latency'] == 0.0
+        assert latency['stdev'] == 0.0
+        assert generator.summarize(None) is None
+
+
+def noisy_timings(generator):
+    """Provides uniformly distributed timings of every repetition, and zero for other values."""
+
+    def value(test, name):
+        if name not in ('lemonspotter_timings', 'lemonspotter_overhead'):
+            return '0'
+
+        repetitions = int(re.search(r'lemonspotter_timings\[(\d+)\]',
+                                    repr(test.source)).group(1))
+
+        return ' '.join(f'{generator.uniform(1, 3):e}' for _ in range(repetitions))
+
+    return value
+
+
+class TestPerformanceTesting:
+    def test_no_retest_after_last_round(self, tmp_path, monkeypatch, database,
+                                        fake_executor) -> None:
+        executor = fake_executor(value=noisy_timings(random.Random(0)))
+        events = executor.events
+        generate_function = PerformanceGenerator.generate_function
+
+        def recorded(self, function, sampler):
+            events.append(('generate', self.repetitions))
+            return generate_function(self, function, sampler)
+
+        monkeypatch.setattr(PerformanceGenerator, 'generate_function', recorded)
+
+        SyntheticDatabase(8).write(tmp_path)
+        runtime = Runtime(tmp_path, executor)
+
+        for function in database.get_functions():
+            function.properties['present'] = True
+
+        for constant in database.get_constants():
+            constant.properties.update(present=True, value='0')
+
+        runtime.performance_testing(warmup=1, repetitions=8, rounds=1)
+
+        # noisy functions are timed again once, the last round is not followed by retests
+        phases = [event for event in events if event[0] in ('generate', 'execute')]
+
+        assert [event[0] for event in phases].count('execute') == 2
+        assert phases[-1][0] == 'execute'
+        assert any(event[0] == 'generate' and event[1] != 8 for event in phases)
+
+        events.clear()
+        runtime.performance_testing(warmup=1, repetitions=8, rounds=0)
+
+        phases = [event for event in events if event[0] in ('generate', 'execute')]
+
+        assert [event[0] for event in phases].count('execute') == 1
+        assert phases[-1][0] == 'execute'
@@ -0,0 +1,97 @@
+from lemonspotter.core.benchmark import SyntheticDatabase
+from lemonspotter.core.pipeline import Pipeline
+from lemonspotter.core.test import TestOutcome
+from lemonspotter.generators.constantpresence import ConstantPresenceGenerator
+from lemonspotter.generators.functionpresence import FunctionPresenceGenerator
+from lemonspotter.parsers.mpiparser import MPIParser
+from lemonspotter.samplers.valid import ValidSampler
+
+
+def run_pipeline(tmp_path, executor, constant_batch=1, group_size=1):
+    SyntheticDatabase(8).write(tmp_path)
+    MPIParser()(tmp_path)
+
+    pipeline = Pipeline(executor, ValidSampler(), group_size)
+    pipeline.execute(ConstantPresenceGenerator(), FunctionPresenceGenerator(), constant_batch)
+
+    return pipeline
+
+
+def index(events, event):
+    return events.index(event)
+
+
+class TestPipeline:
+    def test_pairs_spawned_once_both_are_known(self, tmp_path, database, fake_executor) -> None:
+        executor = fake_executor('END_1', build_delays={'function_presence_END_0': 0.2},
+                                 run_delays={'function_presence_END_0': 0.2})
+        pipeline = run_pipeline(tmp_path, executor)
+
+        pairs = [test.name for test in pipeline.tests['start_end']]
+
+        assert pairs
+        assert {name.rsplit('_', 1)[0] for name in pairs} == {'START_0_END_0', 'START_1_END_0'}
+
+        for name in pairs:
+            start = name[:len('START_0')]
+
+            assert (index(executor.events, ('compile', name)) >
+                    index(executor.events, ('build', 'function_presence_END_0')))
+            assert (index(executor.events, ('compile', name)) >
+                    index(executor.events, ('build', f'function_presence_{start}')))
+
+    def test_dependent_runs_wait_for_constants(self, tmp_path, database, fake_executor) -> None:
+        executor = fake_executor(build_delays={'constant_presence_': 0.2},
+                                 run_delays={'constant_presence_': 0.2})
+        pipeline = run_pipeline(tmp_path, executor)
+
+        constants = [index(executor.events, ('run', test.name))
+                     for test in pipeline.tests['constants']]
+        dependent = pipeline.tests['independent'] + pipeline.tests['start_end']
+
+        assert dependent
+
+        for test in dependent:
+            # launched while constants are still running, evaluated after all of them
+            assert index(executor.events, ('launch', test.name)) < max(constants)
+            assert index(executor.events, ('run', test.name)) > max(constants)
+
+    def test_shared_source_built_once(self, tmp_path, database, fake_executor) -> None:
+        executor = fake_executor()
+        pipeline = run_pipeline(tmp_path, executor, group_size=None)
+
+        tests = [test for tests in pipeline.tests.values() for test in tests]
+        sources = {id(test.source) for test in tests}
+
+        assert len(sources) < len(tests)
+        assert sum(executor.compiled.values()) == len(sources)
+        assert set(executor.compiled.values()) == {1}
+
+    def test_batches_bisected_to_failing_constant(self, tmp_path, database, fake_executor) -> None:
+        executor = fake_executor('CONSTANT_3')
+        pipeline = run_pipeline(tmp_path, executor, constant_batch=4)
+
+        absent = [constant.name for constant in database.get_constants()
+                  if not constant.properties['present']]
+        batches = [name for name in executor.compiled
+                   if name.startswith('constant_presence_batch_')]
+
+        assert absent == ['CONSTANT_3']
+        assert 'constant_presence_batch_CONSTANT_3_1' in batches
+        assert {test.name for test in pipeline.tests['constants']} == \
+            {f'constant_presence_{constant.name}' for constant in database.get_constants()}
+
+    def test_failed_group_split(self, tmp_path, database, fake_executor) -> None:
+        executor = fake_executor('lemonspotter_FUNCTION_0_3')
+        pipeline = run_pipeline(tmp_path, executor, group_size=None)
+
+        tests = [test for test in pipeline.tests['independent']
+                 if test.name.startswith('FUNCTION_0_')]
+
+        assert len(tests) > 1
+        assert executor.compiled[tests[0].name] == 2
+
+        for test in tests:
+            assert test.entry is None
+            assert test.build_outcome is TestOutcome.SUCCESS
+            assert test.run_outcome is TestOutcome.SUCCESS
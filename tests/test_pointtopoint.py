@@ -0,0 +1,53 @@
+from pytest import raises
+
+from lemonspotter.core.benchmark import SyntheticDatabase
+from lemonspotter.core.statement import MainDefinitionStatement
+from lemonspotter.generators.pointtopoint import PointToPointGenerator
+from lemonspotter.parsers.mpiparser import MPIParser
+
+
+class TestPointToPointGenerator:
+    def test_sizes(self) -> None:
+        generator = PointToPointGenerator(min_size=1, max_size=8)
+
+        assert generator.sizes == (1, 2, 4, 8)
+        assert PointToPointGenerator(min_size=64, max_size=64).sizes == (64,)
+
+    def test_invalid_sizes(self) -> None:
+        with raises(ValueError):
+            PointToPointGenerator(min_size=3)
+
+        with raises(ValueError):
+            PointToPointGenerator(min_size=16, max_size=8)
+
+        with raises(ValueError):
+            PointToPointGenerator(max_size=2 * PointToPointGenerator.max_message)
+
+    def test_parse_sweep(self) -> None:
+        values = PointToPointGenerator.parse_sweep('4:1.5e-06 8:2.0e-06 ')
+
+        assert values == {'4': 1.5e-6, '8': 2e-6}
+        assert PointToPointGenerator.parse_sweep('') == {}
+
+    def test_parse_malformed_sweep(self) -> None:
+        assert PointToPointGenerator.parse_sweep(None) is None
+        assert PointToPointGenerator.parse_sweep('4:1.5e-06 8') is None
+        assert PointToPointGenerator.parse_sweep('4:fast') is None
+
+    def test_nonblocking_window_buffers(self, tmp_path, database) -> None:
+        SyntheticDatabase(8).write(tmp_path)
+        MPIParser()(tmp_path)
+
+        def exchange(names):
+            block = MainDefinitionStatement()
+            PointToPointGenerator()._generate_exchange(block, names, 'MPI_INT', True)
+
+            return block.express(0)
+
+        nonblocking = exchange(('MPI_Isend', 'MPI_Irecv', 'MPI_Wait'))
+        blocking = exchange(('MPI_Send', 'MPI_Recv', None))
+
+        offset = 'lemonspotter_buffer + lemonspotter_message * lemonspotter_size'
+        assert f'MPI_Irecv({offset}, lemonspotter_count' in nonblocking
+        assert f'MPI_Isend({offset}, lemonspotter_count' in nonblocking
+        assert offset not in blocking
@@ -0,0 +1,62 @@
+from lemonspotter.executors.precompiledheader import PrecompiledHeader
+from lemonspotter.executors.toolchain import Toolchain
+
+
+def fake_compiler(tmp_path, header_error=False):
+    # a GCC style compiler which logs its invocations, precompiled headers are reported by -H
+    log = tmp_path / 'invocations'
+    compiler = tmp_path / 'mpicc'
+    compiler.write_text('#!/bin/sh\n'
+                        f'echo "$*" >> {log}\n'
+                        'eval output=\\${$#}\n'
+                        'case "$*" in\n'
+                        '  --version) echo "fake 1.0" ;;\n'
+                        '  *c-header*) ' +
+                        ('echo "frame.h:1: error" >&2; exit 1 ;;\n' if header_error else
+                         'echo precompiled > "$output" ;;\n') +
+                        '  *-H) echo "! $2.gch" >&2 ;;\n'
+                        'esac\n')
+    compiler.chmod(0o755)
+
+    return Toolchain(str(compiler), 'mpiexec'), log
+
+
+class TestPrecompiledHeader:
+    def test_precompiled_once(self, tmp_path) -> None:
+        toolchain, log = fake_compiler(tmp_path)
+
+        header = PrecompiledHeader(toolchain, tmp_path / 'precompiled', ['stdio.h', 'mpi.h'])
+        arguments = header.prepare()
+
+        assert arguments == ['-include', str(header.header)]
+        assert header.header.read_text() == '#include <stdio.h>\n#include <mpi.h>\n'
+        assert (header.header.parent / 'frame.h.gch').exists()
+
+        # a later run reuses the precompiled header
+        again = PrecompiledHeader(toolchain, tmp_path / 'precompiled', ['stdio.h', 'mpi.h'])
+
+        assert again.prepare() == arguments
+        assert sum('c-header' in line for line in log.read_text().splitlines()) == 1
+
+    def test_headers_change_directory(self, tmp_path) -> None:
+        toolchain, _ = fake_compiler(tmp_path)
+
+        first = PrecompiledHeader(toolchain, tmp_path, ['mpi.h'])
+        second = PrecompiledHeader(toolchain, tmp_path, ['stdio.h', 'mpi.h'])
+
+        assert first.header != second.header
+
+    def test_failing_header_falls_back(self, tmp_path) -> None:
+        toolchain, log = fake_compiler(tmp_path, header_error=True)
+
+        header = PrecompiledHeader(toolchain, tmp_path / 'precompiled', ['mpi.h'])
+
+        assert header.prepare() == []
+        assert not list(header.header.parent.glob('frame.h.*'))
+        # both compiler styles were tried
+        assert sum('c-header' in line for line in log.read_text().splitlines()) == 2
+
+    def test_missing_compiler_falls_back(self, tmp_path) -> None:
+        toolchain = Toolchain(str(tmp_path / 'missing'), 'mpiexec')
+
+        assert PrecompiledHeader(toolchain, tmp_path, ['mpi.h']).prepare() == []
@@ -0,0 +1,44 @@
+import json
+
+from lemonspotter.core.profiler import Profiler, profiled
+
+
+class Profiled:
+    @profiled('call')
+    def call(self, depth: int) -> int:
+        return self.call(depth - 1) if depth > 0 else 0
+
+
+class TestProfiler:
+    def test_phases(self, tmp_path) -> None:
+        profiler = Profiler()
+        profiler.enable()
+
+        try:
+            with profiler.phase('phase'):
+                pass
+
+            with profiler.phase('phase'):
+                pass
+
+            # nested calls of the same phase are timed once
+            Profiled().call(3)
+
+        finally:
+            profiler.disable()
+
+        with profiler.phase('disabled'):
+            pass
+
+        phases = profiler.summary()['phases']
+
+        assert phases['phase']['calls'] == 2
+        assert phases['call Profiled']['calls'] == 1
+        assert 'disabled' not in phases
+
+        assert 'call Profiled' in profiler.table()
+
+        profiler.write(tmp_path / 'profile.json')
+        written = json.loads((tmp_path / 'profile.json').read_text())
+
+        assert written['phases']['phase']['calls'] == 2
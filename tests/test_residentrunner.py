@@ -0,0 +1,128 @@
+from pathlib import Path
+import signal
+
+from lemonspotter.core.benchmark import SyntheticDatabase
+from lemonspotter.core.source import Source
+from lemonspotter.core.statement import FunctionStatement
+from lemonspotter.core.test import Test, TestType
+from lemonspotter.executors.capture import Capture
+from lemonspotter.executors.mpiexecutor import MPIExecutor, RunResult
+from lemonspotter.executors.residentrunner import ResidentRunner
+from lemonspotter.executors.toolchain import Toolchain
+from lemonspotter.parsers.mpiparser import MPIParser
+
+
+def generate_tests(directory, count):
+    tests = []
+    for idx in range(count):
+        test = Test(f'test_{idx}', TestType.BUILD_AND_RUN)
+        test.executable = directory / f'{test.name}.so'
+        tests.append(test)
+
+    return tests
+
+
+def marker(runner, event, value):
+    return f'\x1e0|{runner.marker}|{event}|{value}\x1f\n'
+
+
+class TestResidentOutput:
+    def test_outcomes_per_test(self, tmp_path) -> None:
+        runner = ResidentRunner(Toolchain('mpicc', 'mpiexec'), tmp_path)
+        tests = generate_tests(tmp_path, 3)
+
+        Path(f'{tmp_path}/tests_test_0_3.list.1.stderr').write_text('error\n')
+
+        stdout = (marker(runner, 'begin', 0) +
+                  '\x1e0|MPI_SUCCESS|ERRORCODE|0\x1f\n' +
+                  marker(runner, 'end', '0 0') +
+                  marker(runner, 'begin', 1) +
+                  'output\n' +
+                  marker(runner, 'end', '1 0') +
+                  marker(runner, 'begin', 2) +
+                  marker(runner, 'end', f'-1 {int(signal.SIGALRM)}'))
+
+        output = runner.output(tests, 1024)
+        # output arrives in arbitrary pieces
+        for idx in range(0, len(stdout), 7):
+            output.feed(stdout[idx:idx + 7])
+
+        results = output.results(RunResult)
+
+        assert results[tests[0]] == RunResult(0, '', '', False,
+                                              (Capture(0, 'MPI_SUCCESS', 'ERRORCODE', '0'),))
+        assert results[tests[1]] == RunResult(1, 'output\n', 'error\n', False)
+        assert results[tests[2]].timed_out
+
+    def test_missing_outcome_fails(self, tmp_path) -> None:
+        runner = ResidentRunner(Toolchain('mpicc', 'mpiexec'), tmp_path)
+        tests = generate_tests(tmp_path, 2)
+
+        output = runner.output(tests, 1024)
+        output.feed(marker(runner, 'begin', 0))
+
+        results = output.results(RunResult)
+
+        assert results[tests[0]].returncode == -1
+        assert results[tests[1]].returncode == -1
+
+
+def fake_toolchain(tmp_path):
+    # a compiler which creates its outputs and a launcher which acts as the runner, writing
+    # error output for every test
+    compiler = tmp_path / 'mpicc'
+    compiler.write_text('#!/bin/sh\n'
+                        'while [ $# -gt 0 ]; do\n'
+                        '  if [ "$1" = "-o" ]; then touch "$2"; fi\n'
+                        '  shift\n'
+                        'done\n')
+    compiler.chmod(0o755)
+
+    launcher = tmp_path / 'mpiexec'
+    launcher.write_text('#!/bin/sh\n'
+                        'eval listing=\\${$#}\n'
+                        'index=0\n'
+                        'while read -r line; do\n'
+                        '  printf "\\0360|@runner|begin|%d\\037\\n" $index\n'
+                        '  echo warning > "$listing.$index.stderr"\n'
+                        '  printf "\\0360|@runner|end|0 0\\037\\n"\n'
+                        '  index=$((index + 1))\n'
+                        'done < "$listing"\n')
+    launcher.chmod(0o755)
+
+    return str(compiler), str(launcher)
+
+
+class TestResidentExecution:
+    def test_files_removed_unless_kept(self, tmp_path) -> None:
+        mpicc, mpiexec = fake_toolchain(tmp_path)
+
+        for keep in (False, True):
+            directory = tmp_path / str(keep)
+            executor = MPIExecutor(mpicc, mpiexec,
+                                   test_directory=directory,
+                                   precompiled_header=False,
+                                   resident=True,
+                                   keep=keep)
+            executor.prepare()
+
+            tests = generate_tests(directory, 2)
+            results = executor.launch_resident(tests)
+
+            assert [results[test].stderr for test in tests] == ['warning\n', 'warning\n']
+            assert bool(list((directory / 'runner').glob('tests_*'))) is keep
+
+    def test_tests_calling_functions_launched_individually(self, tmp_path, database) -> None:
+        SyntheticDatabase(8).write(tmp_path)
+        MPIParser()(tmp_path)
+
+        executor = MPIExecutor('mpicc', 'mpiexec', test_directory=tmp_path, resident=True)
+
+        calling = Test('calling', TestType.BUILD_AND_RUN, Source())
+        calling.source.add_at_start(FunctionStatement('FUNCTION_0', 'FUNCTION_0();'))
+
+        printing = Test('printing', TestType.BUILD_AND_RUN, Source())
+        printing.source.add_at_start(FunctionStatement('printf', 'printf("0");'))
+
+        assert not executor._resident(calling)
+        assert executor._resident(printing)
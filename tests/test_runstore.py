@@ -0,0 +1,45 @@
+from pathlib import Path
+
+from lemonspotter.core.runstore import RunStore
+from lemonspotter.core.source import Source
+from lemonspotter.core.test import Test, TestType, TestOutcome
+from lemonspotter.executors.executor import BuildResult, RunResult
+from lemonspotter.executors.mpiexecutor import MPIExecutor
+from lemonspotter.parsers.mpiparser import MPIParser
+
+
+class TestRunStore:
+    def test_outcomes_are_reused(self, tmp_path) -> None:
+        store = RunStore(tmp_path / 'runs')
+        fingerprint = RunStore.fingerprint('toolchain', 'database')
+
+        executor = MPIExecutor('mpicc', 'mpiexec', store=store.open(fingerprint))
+        test = Test('test', TestType.BUILD_AND_RUN, Source())
+
+        executor.evaluate_build(test, BuildResult(Path('test'), '', ''))
+        executor.evaluate_run(test, RunResult(0, '', ''))
+
+        assert not test.reused
+
+        executor = MPIExecutor('mpicc', 'mpiexec', store=store.open(fingerprint))
+        test = Test('test', TestType.BUILD_AND_RUN, Source())
+        changed = Test('changed', TestType.BUILD_AND_RUN, Source())
+
+        assert executor.resume(test)
+        assert test.reused
+        assert test.outcome is TestOutcome.SUCCESS
+
+        assert not executor.resume(changed)
+
+    def test_database_fingerprint(self, tmp_path) -> None:
+        (tmp_path / 'functions').mkdir()
+        (tmp_path / 'constants.json').write_text('[]')
+        (tmp_path / 'functions' / 'MPI_Init.json').write_text('{}')
+
+        fingerprint = MPIParser.fingerprint(tmp_path)
+
+        assert MPIParser.fingerprint(tmp_path) == fingerprint
+
+        (tmp_path / 'functions' / 'MPI_Init.json').write_text('{"name": "MPI_Init"}')
+
+        assert MPIParser.fingerprint(tmp_path) != fingerprint
@@ -4,6 +4,9 @@ from pytest import raises
 from lemonspotter.core.statement import Statement
 from lemonspotter.core.statement import BlockStatement
 from lemonspotter.core.statement import ReturnStatement
+from lemonspotter.core.statement import FunctionStatement
+from lemonspotter.core.statement import ConditionStatement
+from lemonspotter.core.statement import LoopStatement
 
 
 class TestStatement:
@@ -28,7 +31,27 @@ class TestBlockStatement:
 
         assert comment.strip() == statement.comment
 
+    def test_called_functions(self) -> None:
+        block = BlockStatement()
+        condition = ConditionStatement('flag')
+
+        block.add_at_start(FunctionStatement('MPI_Init', 'MPI_Init(NULL, NULL);'))
+        block.add_at_end(condition)
+        condition.add_at_start(FunctionStatement('MPI_Abort', 'MPI_Abort(MPI_COMM_WORLD, 1);'))
+
+        assert block.called_functions() == {'MPI_Init', 'MPI_Abort'}
+        assert block.get_definition('main') is None
+
 # class DeclarationStatement:
 #     @given(comment=st.text())
 #     def test_instantiation(self, variable, comment):
 #         statement = DeclarationStatement(variable, comment)
+
+
+class TestLoopStatement:
+    def test_express(self) -> None:
+        loop = LoopStatement('index', '10')
+        loop.add_at_start(FunctionStatement('MPI_Wtime', 'MPI_Wtime();'))
+
+        assert loop.express(0) == 'for(int index = 0; index < 10; index++)\n{\n\tMPI_Wtime();\n}'
+        assert loop.called_functions() == {'MPI_Wtime'}
@@ -0,0 +1,30 @@
+from lemonspotter.executors.toolchain import Toolchain
+
+
+def fake_command(tmp_path, name, output):
+    command = tmp_path / name
+    command.write_text(f'#!/bin/sh\necho "{output}"\n')
+    command.chmod(0o755)
+
+    return str(command)
+
+
+class TestToolchain:
+    def test_fingerprint(self, tmp_path) -> None:
+        mpicc = fake_command(tmp_path, 'mpicc', 'cc 1.0')
+        mpiexec = fake_command(tmp_path, 'mpiexec', '')
+
+        fingerprint = Toolchain(mpicc, mpiexec).fingerprint
+
+        assert fingerprint is not None
+        assert fingerprint == Toolchain(mpicc, mpiexec).fingerprint
+        assert fingerprint != Toolchain(fake_command(tmp_path, 'other', 'cc 2.0'),
+                                        mpiexec).fingerprint
+
+    def test_unidentified_fingerprint(self, tmp_path) -> None:
+        mpicc = fake_command(tmp_path, 'mpicc', 'cc 1.0')
+        mpiexec = fake_command(tmp_path, 'mpiexec', '')
+
+        assert Toolchain(str(tmp_path / 'missing'), mpiexec).fingerprint is None
+        assert Toolchain(mpicc, str(tmp_path / 'missing')).fingerprint is None
+        assert Toolchain(fake_command(tmp_path, 'silent', ''), mpiexec).fingerprint is None